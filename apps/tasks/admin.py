@@ -1,10 +1,69 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from config.paginator import EstimatedCountPaginator
 from .models import Task
+from .search import search_tasks
+
+
+class UserFilter(admin.SimpleListFilter):
+    # Filtro por usuário digitado (id ou e-mail). O filtro padrão de FK listaria todos os usuários na barra lateral.
+    title = 'usuário'
+    parameter_name = 'user'
+    template = 'admin/tasks/user_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(user_id=int(value))
+        # O e-mail é único e indexado: um seek em users_user e depois o índice de tarefas por usuário.
+        return queryset.filter(user__email=value)
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'display': 'Todos',
+            'parameter_name': self.parameter_name,
+            'value': self.value(),
+            'hidden_params': [(name, value) for name, value in changelist.params.items() if name != self.parameter_name],
+        }
+
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'due_date', 'completed', 'created_at')
-    list_filter = ('completed', 'user', 'created_at', 'due_date')
+    # Evita uma consulta por linha para exibir o usuário.
+    list_select_related = ('user',)
+    list_filter = ('completed', UserFilter, 'created_at', 'due_date')
+    # Mantido para exibir a caixa de busca; a busca em si usa o índice textual (get_search_results).
     search_fields = ('title', 'description')
-    date_hierarchy = 'created_at'
-    ordering = ('completed', 'due_date')
+    # Sem date_hierarchy: ela agrega datas distintas da tabela inteira. O filtro por `created_at` cobre o caso.
+    ordering = ('-created_at', '-id')  # Segue o índice task_created_at_idx.
+    autocomplete_fields = ('user',)
+    actions = ('mark_completed', 'mark_pending')
+    # Sem o COUNT(*) extra da tabela inteira ao filtrar, e contagem estimada quando não há filtro.
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_search_results(self, request, queryset, search_term):
+        # Em vez de `icontains` em cada campo (varredura da tabela), usa o FTS5/tsvector da busca.
+        if not search_term.strip():
+            return queryset, False
+        return search_tasks(queryset, search_term), False
+
+    @admin.action(description='Marcar tarefas selecionadas como concluídas')
+    def mark_completed(self, request, queryset):
+        count = queryset.set_completed(True)
+        self.message_user(request, f'{count} tarefa(s) marcada(s) como concluída(s).', messages.SUCCESS)
+
+    @admin.action(description='Marcar tarefas selecionadas como pendentes')
+    def mark_pending(self, request, queryset):
+        count = queryset.set_completed(False)
+        self.message_user(request, f'{count} tarefa(s) marcada(s) como pendente(s).', messages.SUCCESS)
@@ -0,0 +1,351 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.generic import View
+
+from .cache import bump_task_list_version, get_task_list_last_modified, task_list_etag
+from .events import publish_task_event
+from .forms import TaskForm, partial_task_form
+from .models import Task, TaskCounters
+from .pagination import InvalidCursor, paginate_ranked, paginate_tasks
+from .rendering import row_payload
+from .search import search_tasks
+from .serializers import form_errors, serialize_counters, serialize_task
+from .sync import InvalidSyncCursor, SyncCursorExpired, changes_since
+
+# Campos que a API aceita em criações e atualizações (os mesmos do TaskForm).
+TASK_FIELDS = tuple(TaskForm.Meta.fields)
+
+# Lotes até este tamanho publicam um evento `batch` com as linhas alteradas; maiores, um `resync`.
+BATCH_EVENT_MAX_ITEMS = 100
+
+
+def publish(request, event_type, **data):
+    # Os clientes conectados ao stream SSE (apps/tasks/events.py) também atualizam os contadores.
+    counters = serialize_counters(TaskCounters.objects.for_user(request.user.pk))
+    publish_task_event(request.user.pk, event_type, counters=counters, **data)
+    return counters
+
+
+class APIError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _failure(index, code, errors, **extra):
+    # Item recusado de um lote. `code` é estável para os clientes (ex: "not_found"); `errors` traz as mensagens.
+    return {'index': index, **extra, 'success': False, 'code': code, 'errors': errors}
+
+
+def _completed_errors(payload):
+    # Como a TaskPatchView: `completed` só como booleano JSON (o form aceitaria "yes" ou 1).
+    if 'completed' in payload and not isinstance(payload['completed'], bool):
+        return {'completed': 'Must be true or false.'}
+    return None
+
+
+class APIView(View):
+    """
+    Base das views JSON da API v1. Usa a sessão do Django (e portanto CSRF) como as demais views,
+    mas responde 401 em JSON em vez de redirecionar para o login.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except APIError as e:
+            return JsonResponse({'error': e.message}, status=e.status)
+
+    def parse_json(self, request, expected=dict):
+        try:
+            payload = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            raise APIError('Invalid JSON body.')
+        if not isinstance(payload, expected):
+            raise APIError(f'Expected a JSON {"object" if expected is dict else "array"}.')
+        return payload
+
+    def get_task(self, pk):
+        try:
+            return Task.objects.get(pk=pk, user=self.request.user)
+        except Task.DoesNotExist:
+            # 404 também para tarefas de outros usuários (isolamento seguro).
+            raise APIError('Not Found', status=404)
+
+
+def _api_list_etag(request, *args, **kwargs):
+    return task_list_etag(request)
+
+
+def _api_list_last_modified(request, *args, **kwargs):
+    return get_task_list_last_modified(request.user.pk)
+
+
+class TaskCollectionAPIView(APIView):
+    @method_decorator(condition(etag_func=_api_list_etag, last_modified_func=_api_list_last_modified))
+    @method_decorator(cache_control(private=True, no_cache=True))
+    def get(self, request, *args, **kwargs):
+        queryset = Task.objects.filter(user=request.user).filter_completed(request.GET.get('completed'))
+        search = request.GET.get('q', '').strip()
+        try:
+            if search:
+                tasks, next_cursor = paginate_ranked(
+                    search_tasks(queryset, search), request.GET.get('cursor'), settings.TASK_LIST_PAGE_SIZE,
+                )
+            else:
+                tasks, next_cursor = paginate_tasks(queryset, request.GET.get('cursor'), settings.TASK_LIST_PAGE_SIZE)
+        except InvalidCursor as e:
+            raise APIError(str(e))
+        return JsonResponse({'results': [serialize_task(task) for task in tasks], 'next_cursor': next_cursor})
+
+    def post(self, request, *args, **kwargs):
+        form = TaskForm(data=self.parse_json(request))
+        if not form.is_valid():
+            return JsonResponse({'errors': form_errors(form)}, status=400)
+        task = form.save(commit=False)
+        task.user = request.user
+        task.save()
+        data = serialize_task(task)
+        publish(request, 'created', task=data, **row_payload(task))
+        return JsonResponse({'task': data}, status=201)
+
+
+class TaskDetailAPIView(APIView):
+    def get(self, request, pk, *args, **kwargs):
+        return JsonResponse({'task': serialize_task(self.get_task(pk))})
+
+    def patch(self, request, pk, *args, **kwargs):
+        payload = self.parse_json(request)
+        errors = _completed_errors(payload)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+        if payload.keys() == {'completed'}:
+            # Alternância de conclusão: um único UPDATE ... RETURNING, sem SELECT prévio.
+            tasks = Task.objects.filter(pk=pk, user=request.user).set_completed_returning(payload['completed'])
+            if not tasks:
+                # Nenhuma linha alterada: inexistente, de outro usuário ou já no estado pedido.
+                return JsonResponse({'task': serialize_task(self.get_task(pk))})
+            data = serialize_task(tasks[0])
+            publish(request, 'updated', task=data, **row_payload(tasks[0]))
+            return JsonResponse({'task': data})
+        task = self.get_task(pk)
+        fields = tuple(field for field in TASK_FIELDS if field in payload)
+        if not fields:
+            raise APIError(f'Send at least one of: {", ".join(TASK_FIELDS)}.')
+        form = partial_task_form(fields)(data=payload, instance=task)
+        if not form.is_valid():
+            return JsonResponse({'errors': form_errors(form)}, status=400)
+        task = form.save(commit=False)
+        # update_fields só atualiza campos auto_now se estiverem na lista.
+        task.save(update_fields=fields + ('updated_at',))
+        data = serialize_task(task)
+        publish(request, 'updated', task=data, **row_payload(task))
+        return JsonResponse({'task': data})
+
+    def delete(self, request, pk, *args, **kwargs):
+        task = self.get_task(pk)
+        task_id = task.pk
+        task.delete()
+        publish(request, 'deleted', id=task_id)
+        return HttpResponse(status=204)
+
+
+class TaskSyncAPIView(APIView):
+    """
+    Sincronização incremental: GET ?cursor=<valor> devolve as tarefas criadas ou alteradas e os
+    tombstones das excluídas desde o cursor, além do próximo cursor e dos contadores. Sem cursor, todas
+    as tarefas. Com ?rows=1, cada tarefa vem com o item da lista renderizado (a cópia local do tasks.js).
+    Um cursor mais antigo que a retenção dos tombstones recebe 410 e exige sincronização completa.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            changes = changes_since(request.user, request.GET.get('cursor'))
+        except InvalidSyncCursor as e:
+            raise APIError(str(e))
+        except SyncCursorExpired as e:
+            return JsonResponse({'error': str(e), 'reset': True}, status=410)
+        if request.GET.get('rows') == '1':
+            changed = [{**serialize_task(task), **row_payload(task)} for task in changes['changed']]
+        else:
+            changed = [serialize_task(task) for task in changes['changed']]
+        return JsonResponse({
+            'changed': changed,
+            'deleted': [
+                {'id': tombstone.task_id, 'deleted_at': tombstone.deleted_at.isoformat()}
+                for tombstone in changes['deleted']
+            ],
+            'cursor': changes['cursor'],
+            'has_more': changes['has_more'],
+            'counters': serialize_counters(TaskCounters.objects.for_user(request.user.pk)),
+        })
+
+
+class TaskBulkAPIView(APIView):
+    """
+    Aplica criações, atualizações parciais e exclusões em lote numa única transação:
+        {"create": [{...}], "update": [{"id": 1, ...}], "delete": [1, 2]}
+    Itens inválidos não interrompem o lote; o resultado de cada item é devolvido na mesma ordem do envio,
+    com os contadores do usuário após o lote. É o destino da fila de alterações do tasks.js.
+    """
+
+    def post(self, request, *args, **kwargs):
+        payload = self.parse_json(request)
+        operations = {}
+        for operation in ('create', 'update', 'delete'):
+            items = payload.get(operation, [])
+            if not isinstance(items, list):
+                raise APIError(f'"{operation}" must be a list.')
+            operations[operation] = items
+        total = sum(len(items) for items in operations.values())
+        if total > settings.TASK_API_BULK_MAX_ITEMS:
+            raise APIError(f'At most {settings.TASK_API_BULK_MAX_ITEMS} items per request.', status=413)
+
+        self.saved_tasks = []
+        with transaction.atomic():
+            results = {
+                'create': self.bulk_create(operations['create']),
+                'update': self.bulk_update(operations['update']),
+                'delete': self.bulk_delete(operations['delete']),
+            }
+            # bulk_create/bulk_update não disparam os sinais que invalidam o cache da lista.
+            bump_task_list_version(request.user.pk)
+        if total > BATCH_EVENT_MAX_ITEMS:
+            # Um lote grande pode alterar muitas linhas: os clientes conectados recarregam a lista.
+            counters = publish(request, 'resync')
+        else:
+            # Lote pequeno (ex: a fila do tasks.js): cada aba troca só os itens alterados.
+            counters = publish(
+                request, 'batch',
+                changed=[
+                    {'task': serialize_task(task), **row_payload(task)}
+                    for task in self.saved_tasks
+                ],
+                deleted=[result['id'] for result in results['delete'] if result['success']],
+            )
+        return JsonResponse({**results, 'counters': counters})
+
+    def bulk_create(self, items):
+        results = [None] * len(items)
+        tasks = []
+        for index, item in enumerate(items):
+            form = TaskForm(data=item) if isinstance(item, dict) else None
+            if form is None or not form.is_valid():
+                errors = form_errors(form) if form else {'__all__': 'Expected a JSON object.'}
+                results[index] = _failure(index, 'invalid', errors)
+                continue
+            task = form.save(commit=False)
+            task.user = self.request.user
+            tasks.append((index, task))
+
+        Task.objects.bulk_create([task for _, task in tasks], batch_size=settings.TASK_BULK_BATCH_SIZE)
+        for index, task in tasks:
+            results[index] = {'index': index, 'success': True, 'task': serialize_task(task)}
+        self.saved_tasks.extend(task for _, task in tasks)
+        return results
+
+    def bulk_update(self, items):
+        results = [None] * len(items)
+        seen, toggles, lookups = set(), {True: [], False: []}, []
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if not _is_id(pk):
+                results[index] = _failure(index, 'invalid_id', {'id': 'A numeric id is required.'}, id=pk)
+            elif pk in seen:
+                results[index] = _failure(index, 'duplicate_id', {'id': 'Duplicate id in this request.'}, id=pk)
+            elif item.keys() == {'id', 'completed'} and isinstance(item['completed'], bool):
+                seen.add(pk)
+                toggles[item['completed']].append((index, pk))
+            else:
+                seen.add(pk)
+                lookups.append((index, pk, item))
+
+        # Itens que só alternam `completed` (a fila do tasks.js): como o PATCH, um UPDATE ... RETURNING por
+        # valor, sem ler as tarefas antes. As que não voltam (inexistentes ou já no estado pedido) são lidas abaixo.
+        for completed, entries in toggles.items():
+            if not entries:
+                continue
+            changed = {
+                task.pk: task for task in Task.objects.filter(user=self.request.user, pk__in=[pk for _, pk in entries])
+                .set_completed_returning(completed)
+            }
+            for index, pk in entries:
+                if pk in changed:
+                    results[index] = {'index': index, 'id': pk, 'success': True, 'task': serialize_task(changed[pk])}
+                    self.saved_tasks.append(changed[pk])
+                else:
+                    lookups.append((index, pk, None))
+
+        # Linhas bloqueadas até o fim da transação: os campos lidos não mudam antes do UPDATE.
+        existing = Task.objects.select_for_update().filter(user=self.request.user).order_by().in_bulk(
+            [pk for _, pk, _ in lookups]
+        ) if lookups else {}
+        tasks = []
+        for index, pk, item in lookups:
+            fields = tuple(field for field in TASK_FIELDS if field in item) if item is not None else ()
+            if pk not in existing:
+                results[index] = _failure(index, 'not_found', {'id': 'Not Found'}, id=pk)
+                continue
+            if item is None:
+                # Alternância para o estado em que a tarefa já estava: nada a gravar.
+                results[index] = {'index': index, 'id': pk, 'success': True, 'task': serialize_task(existing[pk])}
+                continue
+            if not fields:
+                errors = {'__all__': f'Send at least one of: {", ".join(TASK_FIELDS)}.'}
+            elif _completed_errors(item):
+                errors = _completed_errors(item)
+            else:
+                form = partial_task_form(fields)(data=item, instance=existing[pk])
+                if form.is_valid():
+                    tasks.append((index, fields, form.save(commit=False)))
+                    continue
+                errors = form_errors(form)
+            results[index] = _failure(index, 'invalid', errors, id=pk)
+
+        # Um bulk_update por conjunto de campos: cada tarefa grava só os campos enviados no seu item.
+        groups = {}
+        # bulk_update não chama pre_save, então o auto_now de updated_at é aplicado aqui.
+        now = timezone.now()
+        for _, fields, task in tasks:
+            task.updated_at = now
+            groups.setdefault(fields, []).append(task)
+        for fields, group in groups.items():
+            Task.objects.bulk_update(group, [*fields, 'updated_at'], batch_size=settings.TASK_BULK_BATCH_SIZE)
+        for index, _, task in tasks:
+            results[index] = {'index': index, 'id': task.pk, 'success': True, 'task': serialize_task(task)}
+        self.saved_tasks.extend(task for _, _, task in tasks)
+        return results
+
+    def bulk_delete(self, ids):
+        valid_ids = [pk for pk in ids if _is_id(pk)]
+        existing = set(
+            Task.objects.filter(user=self.request.user, pk__in=valid_ids).order_by().values_list('pk', flat=True)
+        )
+        if existing:
+            Task.objects.filter(user=self.request.user, pk__in=existing).delete()
+
+        results = []
+        for index, pk in enumerate(ids):
+            # Validado antes do `in`: listas e dicts não são hasheáveis e True == 1 acharia a tarefa 1.
+            if not _is_id(pk):
+                results.append(_failure(index, 'invalid_id', {'id': 'A numeric id is required.'}, id=pk))
+            elif pk in existing:
+                results.append({'index': index, 'id': pk, 'success': True})
+                existing.discard(pk)  # Ids repetidos só contam como excluídos uma vez.
+            else:
+                results.append(_failure(index, 'not_found', {'id': 'Not Found'}, id=pk))
+        return results
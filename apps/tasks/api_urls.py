@@ -0,0 +1,11 @@
+from django.urls import path
+from .api import TaskBulkAPIView, TaskCollectionAPIView, TaskDetailAPIView, TaskSyncAPIView
+
+app_name = 'tasks_api'
+
+urlpatterns = [
+    path('', TaskCollectionAPIView.as_view(), name='task_list'),
+    path('bulk/', TaskBulkAPIView.as_view(), name='task_bulk'),
+    path('sync/', TaskSyncAPIView.as_view(), name='task_sync'),
+    path('<int:pk>/', TaskDetailAPIView.as_view(), name='task_detail'),
+]
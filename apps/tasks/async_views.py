@@ -0,0 +1,175 @@
+"""
+Versões assíncronas das views de listagem, criação, edição e exclusão de tarefas, montadas nas mesmas
+URLs quando TASK_ASYNC_VIEWS está ativo (o padrão em config/asgi.py). Usam o ORM assíncrono (aget,
+acreate, async for): enquanto o banco responde, o worker ASGI atende outras requisições. Templates,
+respostas JSON e regras de negócio são os das views síncronas de views.py.
+"""
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import aget_object_or_404, redirect
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.generic import View
+
+from .cache import get_fragment
+from .events import apublish_task_event, sse_stream
+from .forms import TaskForm, partial_task_form
+from .models import Task, TaskCounters
+from .pagination import apaginate_ranked, apaginate_tasks
+from .rendering import list_rows, row_payload
+from .search import search_tasks
+from .serializers import form_errors, serialize_counters, serialize_task
+from .views import (
+    TASK_LIST_CACHING, build_fragment, fragment_response, invalid_cursor_response, invalid_patch_response,
+    local_list_requested, patch_payload, render_task_page, task_list_fragment_key,
+)
+
+
+def is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+async def arender_task_list(request, queryset, completed_filter=None, cursor=None, search=''):
+    # Como render_task_list; num acerto do cache de fragmentos também não há consulta às tarefas.
+    key = task_list_fragment_key(request, completed_filter, cursor, search)
+    fragment = get_fragment(key)
+    if fragment is None:
+        if search:
+            tasks, next_cursor = await apaginate_ranked(
+                list_rows(search_tasks(queryset, search)), cursor, settings.TASK_LIST_PAGE_SIZE,
+            )
+        else:
+            tasks, next_cursor = await apaginate_tasks(list_rows(queryset), cursor, settings.TASK_LIST_PAGE_SIZE)
+        fragment = build_fragment(request, key, tasks, next_cursor)
+    return fragment
+
+
+async def atask_counters(request):
+    return serialize_counters(await TaskCounters.objects.afor_user(request.user.pk))
+
+
+class AsyncLoginRequiredMixin:
+    """
+    LoginRequiredMixin para views assíncronas. O usuário é carregado com `request.auser()` e guardado em
+    `request.user`, então o código síncrono seguinte (ETag, CSRF, templates) não consulta o banco.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncTaskListView(AsyncLoginRequiredMixin, View):
+    async def get(self, request, *args, **kwargs):
+        # No Django 5.1 o method_decorator envolve o handler numa função síncrona e a view deixaria de
+        # ser assíncrona; os decorators de cache HTTP da TaskListView são aplicados aqui, na mesma ordem.
+        handler = self.list_tasks
+        for decorator in reversed(TASK_LIST_CACHING):
+            handler = decorator(handler)
+        return await handler(request, *args, **kwargs)
+
+    async def list_tasks(self, request, *args, **kwargs):
+        cursor = request.GET.get('cursor')
+        search = request.GET.get('q', '').strip()
+        error = invalid_cursor_response(cursor, search, is_ajax(request))
+        if error:
+            return error
+
+        if not is_ajax(request) and local_list_requested(request, cursor, search):
+            return render_task_page(request, TaskForm(), None, await TaskCounters.objects.afor_user(request.user.pk))
+
+        completed = request.GET.get('completed')
+        queryset = Task.objects.filter(user=request.user).filter_completed(completed)
+        fragment = await arender_task_list(request, queryset, completed, cursor, search)
+        if is_ajax(request):
+            return fragment_response(fragment)
+        counters = await TaskCounters.objects.afor_user(request.user.pk)
+        return render_task_page(request, TaskForm(), fragment, counters, search)
+
+
+class AsyncTaskCreateView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, *args, **kwargs):
+        form = TaskForm(request.POST)
+        if form.is_valid():
+            task = await Task.objects.acreate(user=request.user, **form.cleaned_data)
+            data, row, counters = serialize_task(task), row_payload(task), await atask_counters(request)
+            await apublish_task_event(request.user.pk, 'created', task=data, counters=counters, **row)
+            if is_ajax(request):
+                return JsonResponse({'success': True, 'task': data, 'counters': counters, **row}, status=201)
+            return redirect('tasks:task_list')
+        if is_ajax(request):
+            return JsonResponse({'success': False, 'errors': form_errors(form)}, status=400)
+        fragment = await arender_task_list(request, Task.objects.filter(user=request.user))
+        return render_task_page(request, form, fragment, await TaskCounters.objects.afor_user(request.user.pk))
+
+
+class AsyncTaskUpdateView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk, *args, **kwargs):
+        task = await aget_object_or_404(Task, pk=pk, user=request.user)
+        form = TaskForm(request.POST, instance=task)
+        if form.is_valid():
+            # form.save() chamaria o save() síncrono; a instância já recebeu os dados validados.
+            task = form.save(commit=False)
+            await task.asave()
+            data, row, counters = serialize_task(task), row_payload(task), await atask_counters(request)
+            await apublish_task_event(request.user.pk, 'updated', task=data, counters=counters, **row)
+            if is_ajax(request):
+                return JsonResponse({'success': True, 'task': data, 'counters': counters, **row})
+            return redirect('tasks:task_list')
+        if is_ajax(request):
+            return JsonResponse({'success': False, 'errors': form_errors(form)}, status=400)
+        return redirect('tasks:task_list')
+
+
+class AsyncTaskPatchView(AsyncLoginRequiredMixin, View):
+    http_method_names = ['patch']
+
+    async def patch(self, request, pk, *args, **kwargs):
+        payload = patch_payload(request)
+        error = invalid_patch_response(payload)
+        if error:
+            return error
+        if payload.keys() == {'completed'}:
+            tasks = await Task.objects.filter(pk=pk, user=request.user).aset_completed_returning(payload['completed'])
+            task = tasks[0] if tasks else await aget_object_or_404(Task, pk=pk, user=request.user)
+            changed = bool(tasks)
+        else:
+            task = await aget_object_or_404(Task, pk=pk, user=request.user)
+            fields = tuple(field for field in TaskForm.Meta.fields if field in payload)
+            form = partial_task_form(fields)(data=payload, instance=task)
+            if not form.is_valid():
+                return JsonResponse({'success': False, 'errors': form_errors(form)}, status=400)
+            task = form.save(commit=False)
+            await task.asave(update_fields=fields + ('updated_at',))
+            changed = True
+        data, row, counters = serialize_task(task), row_payload(task), await atask_counters(request)
+        if changed:
+            await apublish_task_event(request.user.pk, 'updated', task=data, counters=counters, **row)
+        return JsonResponse({'success': True, 'task': data, 'counters': counters, **row})
+
+
+class AsyncTaskDeleteView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk, *args, **kwargs):
+        task = await aget_object_or_404(Task, pk=pk, user=request.user)
+        task_id = task.pk
+        await task.adelete()
+        counters = await atask_counters(request)
+        await apublish_task_event(request.user.pk, 'deleted', id=task_id, counters=counters)
+        if is_ajax(request):
+            return JsonResponse({'success': True, 'counters': counters})
+        return redirect('tasks:task_list')
+
+
+class TaskEventsView(AsyncLoginRequiredMixin, View):
+    """
+    Stream SSE (text/event-stream) com as alterações das tarefas do usuário, publicadas pelas views em
+    apps/tasks/events.py. A conexão fica aberta sem ocupar uma thread: só existe sob ASGI.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(sse_stream(request.user.pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Proxies como o nginx não devem acumular o stream antes de repassá-lo.
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,284 @@
+"""
+Benchmark das views de tarefas. Mede latência (p50/p95/p99), vazão e número de consultas SQL por
+endpoint, pelo cliente de testes do Django (no mesmo processo) ou por HTTP contra um servidor local
+(ex: gunicorn). O resultado é um JSON estável, para comparar versões com `diff`. Por HTTP, as
+requisições podem ser enviadas em paralelo, para comparar a capacidade dos modos WSGI e ASGI.
+`run_list_render_benchmark` compara, por 10 mil linhas, a leitura e a renderização da listagem pelo
+caminho rápido (values() e template de linha) com o caminho anterior (instâncias de Task e o motor de
+templates).
+"""
+import http.cookiejar
+import json
+import math
+import platform
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache import bump_task_list_version
+from .models import Task
+from .rendering import list_rows, render_rows
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+LIST_FILTERS = {'list_all': {}, 'list_pending': {'completed': 'false'}, 'list_completed': {'completed': 'true'}}
+
+
+def percentile(sorted_values, p):
+    # Método nearest-rank: sempre um valor observado, sem interpolação.
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample['ms'] for sample in samples)
+    queries = [sample['queries'] for sample in samples if sample['queries'] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample['status'] >= 400),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+class ClientTransport:
+    """Requisições pelo cliente de testes do Django, no mesmo processo, contando as consultas SQL."""
+
+    name = 'client'
+
+    def __init__(self, user):
+        # O cliente usa o host 'testserver', que fora dos testes não está em ALLOWED_HOSTS.
+        host = next((h for h in settings.ALLOWED_HOSTS if h and h != '*' and not h.startswith('.')), 'localhost')
+        self.client = Client(SERVER_NAME=host)
+        self.client.force_login(user)
+
+    def request(self, method, path, data=None, headers=None):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(path, data or {}, headers=headers)
+            ms = (time.perf_counter() - started) * 1000
+        body = response.content if not response.streaming else b''.join(response.streaming_content)
+        return {'status': response.status_code, 'ms': ms, 'queries': len(queries), 'body': body}
+
+
+class HTTPTransport:
+    """
+    Requisições HTTP reais contra `base_url` (ex: gunicorn local usando o mesmo banco). A sessão é
+    criada diretamente no banco/cache compartilhados; as consultas SQL não são visíveis daqui.
+    """
+
+    name = 'http'
+
+    def __init__(self, user, base_url):
+        self.base_url = base_url.rstrip('/')
+        login_client = Client()
+        login_client.force_login(user)
+        host = urllib.parse.urlsplit(self.base_url).hostname
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies),
+            # Redirecionamentos (ex: sessão inválida → login) contam como resposta, não são seguidos.
+            type('NoRedirect', (urllib.request.HTTPRedirectHandler,), {'redirect_request': lambda *args: None})(),
+        )
+        self._set_cookie(host, settings.SESSION_COOKIE_NAME, login_client.cookies[settings.SESSION_COOKIE_NAME].value)
+        # A primeira página define o cookie CSRF usado nos POSTs.
+        self.request('get', reverse('tasks:task_list'))
+        self.csrftoken = next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+
+    def _set_cookie(self, host, name, value):
+        self.cookies.set_cookie(http.cookiejar.Cookie(
+            0, name, value, None, False, host, False, False, '/', True, False, None, False, None, None, {},
+        ))
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        url = self.base_url + path
+        body = None
+        if method == 'get' and data:
+            url += '?' + urllib.parse.urlencode(data)
+        elif method == 'post':
+            body = urllib.parse.urlencode(data or {}).encode()
+            headers.update({'Content-Type': 'application/x-www-form-urlencoded', 'X-CSRFToken': self.csrftoken})
+        req = urllib.request.Request(url, data=body, headers=headers, method=method.upper())
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        ms = (time.perf_counter() - started) * 1000
+        return {'status': status, 'ms': ms, 'queries': None, 'body': content}
+
+
+def run_benchmark(user, requests=50, warmup=5, cold=False, transport=None, concurrency=1, label=None):
+    """
+    Executa o benchmark como `user` e devolve o relatório (dict serializável em JSON).
+    Listagem: página completa com cada filtro e o partial AJAX. Escrita: `requests` criações, depois
+    a atualização e a exclusão das tarefas criadas, então o banco volta ao estado inicial.
+    Com `cold`, a versão do cache do usuário é trocada antes de cada leitura (sempre cache miss); com
+    HTTPTransport, só vale se o servidor usa o mesmo cache (o comando exige REDIS_URL nesse caso).
+    Com `concurrency` > 1, as requisições medidas de cada endpoint são enviadas por esse número de
+    threads ao mesmo tempo; a vazão passa a indicar a capacidade do servidor sob carga concorrente.
+    """
+    transport = transport or ClientTransport(user)
+    list_url = reverse('tasks:task_list')
+    endpoints = {}
+
+    def send(call):
+        method, path, data, headers = call
+        if cold and method == 'get':
+            bump_task_list_version(user.pk)
+        return transport.request(method, path, data, headers)
+
+    def measure(name, calls):
+        # Devolve também as respostas do aquecimento, que não entram nas métricas.
+        warm = [transport.request(method, path, data, headers) for method, path, data, headers in calls[:warmup]]
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = list(pool.map(send, calls[warmup:]))
+        else:
+            samples = [send(call) for call in calls[warmup:]]
+        endpoints[name] = summarize(samples, time.perf_counter() - started)
+        return warm + samples
+
+    for name, params in LIST_FILTERS.items():
+        measure(name, [('get', list_url, params, None)] * (warmup + requests))
+    measure('list_partial', [('get', list_url, {}, AJAX)] * (warmup + requests))
+
+    # As requisições de aquecimento também criam tarefas; todas são atualizadas e excluídas depois.
+    created = measure('create', [
+        ('post', reverse('tasks:task_create'), {'title': f'Benchmark {i}', 'description': 'benchmark'}, AJAX)
+        for i in range(warmup + requests)
+    ])
+    task_ids = [json.loads(sample['body'])['task']['id'] for sample in created if sample['status'] == 201]
+    measure('update', [
+        ('post', reverse('tasks:task_update', args=[pk]), {'title': f'Benchmark {pk}', 'completed': 'on'}, AJAX)
+        for pk in task_ids
+    ])
+    measure('delete', [('post', reverse('tasks:task_delete', args=[pk]), {}, AJAX) for pk in task_ids])
+
+    return {
+        'meta': {
+            'transport': transport.name,
+            'label': label,
+            'concurrency': concurrency,
+            'requests_per_endpoint': requests,
+            'warmup': warmup,
+            'cache': 'cold' if cold else 'warm',
+            'user_tasks': user.tasks.count(),
+            'database': connection.vendor,
+            'cache_backend': settings.CACHES['default']['BACKEND'],
+            'page_size': settings.TASK_LIST_PAGE_SIZE,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'endpoints': endpoints,
+    }
+
+
+# Caminho anterior da listagem, como referência: instâncias completas de Task (com a descrição inteira)
+# renderizadas item a item pelo motor de templates, com a mesma marcação do template de linha.
+ORM_LIST_TEMPLATE = """{% for task in tasks %}
+<li class="task-item" id="task-item-{{ task.id }}" data-due-date="{{ task.due_date|date:"Y-m-d" }}">
+    <div class="task-view" id="task-view-{{ task.id }}">
+        <div class="task-main">
+            <div class="task-checkbox-wrapper">
+                <input type="checkbox" {% if task.completed %}checked{% endif %} data-task-id="{{ task.id }}" class="task-checkbox task-completed-toggle" id="checkbox-{{ task.id }}">
+                <label for="checkbox-{{ task.id }}" class="checkbox-custom"></label>
+            </div>
+            <div class="task-content">
+                <span class="task-title {% if task.completed %}task-completed{% endif %}">{{ task.title }}</span>
+                {% if task.due_date %}<span class="task-due-date">Prazo: {{ task.due_date|date:"d/m/Y" }}</span>{% endif %}
+                <p class="task-description{% if not task.description %} task-description-empty{% endif %}">{{ task.description|default:"Sem descrição." }}</p>
+            </div>
+        </div>
+        <div class="task-actions">
+            <button data-task-id="{{ task.id }}" class="btn btn-edit edit-task-button">Editar</button>
+            <form action="{% url 'tasks:task_delete' task.id %}" method="post" class="delete-task-form" style="display:inline;">
+                {% csrf_token %}
+                <button type="submit" data-task-id="{{ task.id }}" class="btn btn-delete">Excluir</button>
+            </form>
+        </div>
+    </div>
+</li>
+{% endfor %}"""
+
+
+def run_list_render_benchmark(user, rows=10000, repeat=3):
+    """
+    Lê e renderiza até `rows` tarefas de `user` pelos dois caminhos da listagem e devolve, por caminho,
+    CPU e tempo total (melhor de `repeat` execuções), pico de memória alocada (tracemalloc, numa execução
+    separada, pois o rastreamento deixa o código mais lento) só na leitura das linhas e na leitura mais a
+    renderização, e o tamanho do HTML, normalizados para 10 mil linhas.
+    """
+    queryset = Task.objects.filter(user=user)
+    request = RequestFactory().get('/')
+    request.user = user
+    get_token(request)
+    orm_template = engines['django'].from_string(ORM_LIST_TEMPLATE)
+    # Cada caminho: (leitura das linhas, renderização das linhas lidas).
+    paths_under_test = {
+        'orm': (lambda: list(queryset[:rows]), lambda tasks: orm_template.render({'tasks': tasks}, request)),
+        'fast': (lambda: list(list_rows(queryset)[:rows]), lambda tasks: render_rows(request, tasks)),
+    }
+
+    measured = min(rows, queryset.count())
+    scale = 10000 / measured if measured else 0
+    paths = {}
+    for name, (fetch, render) in paths_under_test.items():
+        cpu, wall = [], []
+        for _ in range(repeat):
+            cpu_started, wall_started = time.process_time(), time.perf_counter()
+            html = render(fetch())
+            cpu.append(time.process_time() - cpu_started)
+            wall.append(time.perf_counter() - wall_started)
+        tracemalloc.start()
+        fetched = fetch()
+        rows_peak = tracemalloc.get_traced_memory()[1]
+        render(fetched)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        paths[name] = {
+            'cpu_ms_per_10k': round(min(cpu) * 1000 * scale, 1),
+            'wall_ms_per_10k': round(min(wall) * 1000 * scale, 1),
+            'rows_peak_kb_per_10k': round(rows_peak / 1024 * scale),
+            'peak_kb_per_10k': round(peak / 1024 * scale),
+            'html_kb_per_10k': round(len(html.encode()) / 1024 * scale),
+        }
+    return {
+        'meta': {
+            'rows': measured,
+            'repeat': repeat,
+            'description_length': settings.TASK_LIST_DESCRIPTION_LENGTH,
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+        },
+        'paths': paths,
+        'fast_vs_orm': {
+            metric: round(paths['fast'][metric] / paths['orm'][metric], 3) if paths['orm'][metric] else None
+            for metric in paths['orm']
+        },
+    }
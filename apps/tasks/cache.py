@@ -0,0 +1,95 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Fragmentos ficam no cache até serem despejados; a troca de versão os torna inalcançáveis.
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+VERSION_KEY = 'tasks:list-version:{user_id}'
+FRAGMENT_KEY = 'tasks:list-fragment:{user_id}:{version}:{variant}'
+STATS_KEYS = {
+    'hits': 'tasks:list-fragment:hits',
+    'misses': 'tasks:list-fragment:misses',
+}
+
+
+def get_task_list_version(user_id):
+    """
+    Versão atual da lista de tarefas do usuário. É um timestamp em nanossegundos, então uma
+    chave despejada do cache (ou um cache reiniciado) nunca volta a uma versão já usada.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_task_list_last_modified(user_id):
+    # A versão é um timestamp, então também serve como data da última alteração da lista.
+    return datetime.fromtimestamp(get_task_list_version(user_id) / 1e9, tz=timezone.utc)
+
+
+def task_list_etag(request, *parts):
+    """
+    ETag de uma resposta da lista do usuário, calculada apenas a partir da versão em cache:
+    responder 304 não exige consultar a tabela de tarefas. `parts` distingue as variantes da resposta.
+    """
+    version = get_task_list_version(request.user.pk)
+    raw = ':'.join(str(part) for part in (version, request.get_full_path(), *parts))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _bump(user_id):
+    key = VERSION_KEY.format(user_id=user_id)
+    current = cache.get(key) or 0
+    cache.set(key, max(time.time_ns(), current + 1), timeout=None)
+
+
+def bump_task_list_version(user_id):
+    """
+    Invalida os fragmentos do usuário. A versão é trocada imediatamente e de novo após o commit:
+    uma leitura concorrente que viu a nova versão antes do commit não deixa um fragmento antigo no cache.
+    """
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def fragment_cache_key(user_id, *parts):
+    variant = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return FRAGMENT_KEY.format(user_id=user_id, version=get_task_list_version(user_id), variant=variant)
+
+
+def _count(stat):
+    key = STATS_KEYS[stat]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave foi despejada entre o add e o incr.
+        cache.set(key, 1, timeout=None)
+
+
+def get_fragment(key):
+    fragment = cache.get(key)
+    _count('misses' if fragment is None else 'hits')
+    return fragment
+
+
+def set_fragment(key, fragment):
+    cache.set(key, fragment, timeout=FRAGMENT_TIMEOUT)
+
+
+def fragment_stats():
+    stats = {stat: cache.get(key, 0) for stat, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / total, 4) if total else None
+    return stats
+
+
+def reset_fragment_stats():
+    cache.delete_many(list(STATS_KEYS.values()))
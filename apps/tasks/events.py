@@ -0,0 +1,197 @@
+"""
+Eventos de alteração das tarefas de cada usuário, entregues às abas e dispositivos conectados ao endpoint
+SSE (`TaskEventsView`, em /tasks/events/). As views publicam com `publish_task_event` no broker do
+processo; o backend vem de TASK_EVENTS_BACKEND:
+
+*   `LocalBroker`: entrega só aos assinantes do mesmo processo (desenvolvimento, um único worker ASGI).
+*   `PostgresBroker`: publica com NOTIFY e cada processo escuta com LISTEN, então o evento chega a todos
+    os workers e servidores que usam o mesmo banco.
+
+Eventos: {"type": "created" | "updated", "task": {...}, "counters": {...}}, {"type": "deleted", "id": 1,
+"counters": {...}} e {"type": "resync"}, que pede ao cliente para recarregar a lista (alterações em lote
+ou eventos perdidos).
+"""
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Um comentário SSE a cada intervalo mantém a conexão aberta em proxies que encerram conexões ociosas.
+KEEPALIVE_SECONDS = 15
+# Espera do EventSource antes de reconectar, enviada no início do stream.
+RETRY_MILLISECONDS = 3000
+# Eventos pendentes por conexão; um cliente que não os consome a tempo recebe um `resync`.
+QUEUE_SIZE = 100
+
+
+def publish_task_event(user_id, event_type, **data):
+    """
+    Publica um evento para as conexões SSE do usuário após o commit da transação atual (imediatamente,
+    fora de uma): quem recebe o evento e relê a lista já encontra a alteração no banco.
+    """
+    event = {'type': event_type, **data}
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
+
+
+async def apublish_task_event(user_id, event_type, **data):
+    # O PostgresBroker usa a conexão síncrona do Django (NOTIFY), então a publicação roda numa thread.
+    await sync_to_async(publish_task_event)(user_id, event_type, **data)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.TASK_EVENTS_BACKEND)()
+
+
+def format_sse(event):
+    # O JSON não tem quebras de linha, então cabe num único campo `data:`.
+    return f"event: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def sse_stream(user_id, broker=None):
+    """Corpo da resposta SSE: assina os eventos do usuário e os repassa até o cliente desconectar."""
+    subscription = (broker or get_broker()).subscribe(user_id)
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        # O Django cancela o gerador quando o cliente desconecta.
+        subscription.close()
+
+
+class Subscription:
+    """Fila de eventos de uma conexão SSE, ligada ao loop de eventos que a criou."""
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def push(self, event):
+        # Chamado de qualquer thread (views síncronas, sync_to_async, listener do Postgres).
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Loop encerrado: a conexão já terminou.
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: os eventos acumulados são trocados por um pedido de recarga da lista.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Distribui os eventos entre as conexões SSE abertas neste processo."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, user_id, event):
+        self.dispatch(user_id, event)
+
+    def dispatch(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    def broadcast(self, event):
+        with self.lock:
+            subscriptions = [s for group in self.subscriptions.values() for s in group]
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Publica com NOTIFY (entregue pelo Postgres no commit) e, em cada processo, um listener assíncrono
+    com LISTEN repassa as notificações às conexões SSE locais. Se a conexão do listener cair, ele
+    reconecta e envia `resync` a todos, pois notificações emitidas no intervalo se perderam.
+    """
+
+    channel = 'tasks_events'
+    # O payload do NOTIFY é limitado a 8000 bytes; eventos maiores viram `resync`.
+    max_payload_bytes = 7900
+    reconnect_seconds = 5
+
+    def __init__(self, using='default'):
+        super().__init__()
+        self.using = using
+        self.listener = None
+
+    def publish(self, user_id, event):
+        payload = json.dumps({'user_id': user_id, 'event': event}, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > self.max_payload_bytes:
+            payload = json.dumps({'user_id': user_id, 'event': {'type': 'resync', 'counters': event.get('counters')}})
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def subscribe(self, user_id):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+        return super().subscribe(user_id)
+
+    def conninfo(self):
+        from psycopg.conninfo import make_conninfo
+
+        db = settings.DATABASES[self.using]
+        params = {'dbname': db['NAME'], 'user': db['USER'], 'password': db['PASSWORD'], 'host': db['HOST'], 'port': db['PORT']}
+        return make_conninfo(**{key: value for key, value in params.items() if value})
+
+    async def listen(self):
+        import psycopg
+
+        reconnecting = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo(), autocommit=True) as conn:
+                    await conn.execute(f'LISTEN {self.channel}')
+                    if reconnecting:
+                        self.broadcast({'type': 'resync'})
+                    async for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self.dispatch(message['user_id'], message['event'])
+            except (psycopg.Error, OSError):
+                logger.warning('Conexão LISTEN de eventos de tarefas perdida; reconectando.', exc_info=True)
+            reconnecting = True
+            await asyncio.sleep(self.reconnect_seconds)
@@ -1,6 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from datetime import date
+from functools import lru_cache
 from .models import Task
 
 class TaskForm(forms.ModelForm):
@@ -21,3 +22,18 @@ class TaskForm(forms.ModelForm):
         if due_date and due_date < date.today():
             raise ValidationError('A data de vencimento não pode ser no passado.')
         return due_date
+
+
+@lru_cache(maxsize=None)
+def partial_task_form(fields):
+    """
+    TaskForm restrito aos campos enviados (atualização parcial / PATCH).
+    As validações de um campo, como `clean_due_date`, só rodam se o campo vier no payload.
+    """
+    return forms.modelform_factory(Task, form=TaskForm, fields=fields)
+
+
+class HistoricalTaskForm(TaskForm):
+    # Importação de dados antigos (`import_tasks --allow-past-due-dates`): aceita prazos no passado.
+    def clean_due_date(self):
+        return self.cleaned_data.get('due_date')
@@ -0,0 +1,76 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from apps.tasks.benchmark import ClientTransport, HTTPTransport, run_benchmark, run_list_render_benchmark
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede latência (p50/p95/p99), vazão e consultas SQL da listagem (todos os filtros), criação, '
+        'atualização e exclusão de tarefas. Saída em JSON, para comparar versões.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='E-mail do usuário do benchmark (padrão: o usuário com mais tarefas).')
+        parser.add_argument('--requests', type=int, default=50, help='Requisições medidas por endpoint.')
+        parser.add_argument('--warmup', type=int, default=5, help='Requisições de aquecimento por endpoint (não medidas).')
+        parser.add_argument('--cold', action='store_true', help='Invalida o cache da lista antes de cada leitura.')
+        parser.add_argument(
+            '--base-url',
+            help='Mede por HTTP um servidor já em execução com o mesmo banco (ex: http://127.0.0.1:8000). '
+                 'Sem esta opção, usa o cliente de testes do Django no próprio processo.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Requisições simultâneas por endpoint (exige --base-url). Use para comparar servidores WSGI e ASGI.',
+        )
+        parser.add_argument(
+            '--list-render', action='store_true',
+            help='Em vez dos endpoints, compara CPU e memória da leitura e renderização da listagem '
+                 '(caminho rápido com values() x instâncias de Task), por 10 mil linhas.',
+        )
+        parser.add_argument('--rows', type=int, default=10000, help='Tarefas lidas e renderizadas com --list-render.')
+        parser.add_argument('--label', help='Identificação gravada no relatório (ex: wsgi, asgi).')
+        parser.add_argument('--output', help='Arquivo onde gravar o JSON (padrão: saída padrão).')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError('--requests deve ser positivo e --warmup não pode ser negativo.')
+        if options['rows'] < 1:
+            raise CommandError('--rows deve ser positivo.')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency deve ser positivo.')
+        if options['concurrency'] > 1 and not options['base_url']:
+            # O cliente de testes atende uma requisição por vez, no próprio processo.
+            raise CommandError('--concurrency maior que 1 exige --base-url.')
+        if options['cold'] and options['base_url'] and settings.CACHES['default']['BACKEND'].endswith('.LocMemCache'):
+            # A invalidação troca a versão da lista só no cache em memória deste processo, não no do servidor.
+            raise CommandError('--cold com --base-url exige um cache compartilhado com o servidor (defina REDIS_URL).')
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+        else:
+            user = User.objects.annotate(task_count=Count('tasks')).order_by('-task_count', 'pk').first()
+        if user is None:
+            raise CommandError('Usuário não encontrado. Gere dados com `python manage.py seed_tasks`.')
+
+        if options['list_render']:
+            report = run_list_render_benchmark(user, options['rows'])
+        else:
+            transport = HTTPTransport(user, options['base_url']) if options['base_url'] else ClientTransport(user)
+            report = run_benchmark(
+                user, options['requests'], options['warmup'], options['cold'], transport,
+                concurrency=options['concurrency'], label=options['label'],
+            )
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}.'))
+        else:
+            self.stdout.write(output)
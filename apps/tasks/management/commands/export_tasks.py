@@ -0,0 +1,66 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.models import Task
+from apps.tasks.transfer import EXPORT_COLUMNS, FORMATS, RowWriter, detect_format, open_stream
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta tarefas em CSV ou JSONL, em ordem de id, lendo o banco em blocos (iterator) sem carregar '
+        'a tabela em memória.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Arquivo de saída (padrão: '-', a saída padrão).")
+        parser.add_argument('--format', choices=FORMATS, help='Formato da saída (padrão: pela extensão; .jsonl ou csv).')
+        parser.add_argument('--user', help='Exporta apenas as tarefas deste e-mail.')
+        parser.add_argument('--chunk-size', type=int, default=settings.TASK_EXPORT_CHUNK_SIZE, help='Linhas lidas do banco por vez.')
+        parser.add_argument(
+            '--after-id', type=int, default=0,
+            help='Exporta apenas ids maiores que este, acrescentando ao arquivo existente (retomada).',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser positivo.')
+        queryset = Task.objects.filter(id__gt=options['after_id']).order_by('id')
+        if options['user']:
+            user_id = User.objects.filter(email=options['user']).values_list('pk', flat=True).first()
+            if user_id is None:
+                raise CommandError(f'Usuário {options["user"]} não encontrado.')
+            queryset = queryset.filter(user_id=user_id)
+
+        path = options['path']
+        # Na retomada o arquivo já tem o cabeçalho e as linhas até --after-id.
+        resuming = options['after_id'] > 0
+        stream = open_stream(path, 'a' if resuming else 'w') or nullcontext(sys.stdout)
+        # Com a saída padrão ocupada pelos dados, o relatório vai para stderr.
+        report = self.stdout if path not in ('', '-') else self.stderr
+        exported, last_id = 0, options['after_id']
+        started = time.perf_counter()
+        try:
+            with stream as f:
+                writer = RowWriter(f, detect_format(path, options['format']), header=not resuming)
+                for row in queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=options['chunk_size']):
+                    writer.write(row)
+                    exported += 1
+                    last_id = row[0]
+        except (Exception, KeyboardInterrupt) as e:
+            resume = f'{exported} tarefa(s) já gravada(s). Retome com --after-id {last_id}.'
+            if isinstance(e, KeyboardInterrupt):
+                self.stderr.write(f'Exportação interrompida. {resume}')
+                raise
+            raise CommandError(f'{e} {resume}') from e
+
+        elapsed = time.perf_counter() - started
+        report.write(self.style.SUCCESS(
+            f'{exported} tarefa(s) exportada(s) em {elapsed:.1f}s ({exported / elapsed:.0f} linhas/s).'
+        ))
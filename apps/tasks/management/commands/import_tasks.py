@@ -0,0 +1,134 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.tasks.cache import bump_task_list_version
+from apps.tasks.forms import HistoricalTaskForm, TaskForm
+from apps.tasks.models import Task
+from apps.tasks.serializers import form_errors
+from apps.tasks.transfer import FORMATS, detect_format, open_stream, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa tarefas de um arquivo CSV ou JSONL, validando cada linha como o TaskForm e inserindo '
+        'com bulk_create em transações por bloco. Linhas inválidas são relatadas e ignoradas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo de entrada ('-' para a entrada padrão).")
+        parser.add_argument('--format', choices=FORMATS, help='Formato da entrada (padrão: pela extensão; .jsonl ou csv).')
+        parser.add_argument('--user', help='E-mail do dono das linhas sem a coluna `user`.')
+        parser.add_argument(
+            '--allow-past-due-dates', action='store_true',
+            help='Aceita prazos no passado (dados históricos); as demais validações do TaskForm continuam.',
+        )
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_BULK_BATCH_SIZE, help='Linhas por INSERT.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Linhas por transação.')
+        parser.add_argument(
+            '--start-row', type=int, default=1,
+            help='Primeira linha de dados a importar (1 = início). Usada para retomar uma importação interrompida.',
+        )
+        parser.add_argument('--max-errors', type=int, default=1000, help='Interrompe após este número de linhas inválidas.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['chunk_size'] < 1 or options['start_row'] < 1:
+            raise CommandError('--batch-size, --chunk-size e --start-row devem ser positivos.')
+        self.form_class = HistoricalTaskForm if options['allow_past_due_dates'] else TaskForm
+        self.users = {}
+        self.default_user_id = None
+        if options['user']:
+            self.default_user_id = self.user_id(options['user'])
+            if self.default_user_id is None:
+                raise CommandError(f'Usuário {options["user"]} não encontrado.')
+
+        fmt = detect_format(options['path'], options['format'])
+        stream = open_stream(options['path'], 'r') or nullcontext(sys.stdin)
+        self.imported = self.rejected = 0
+        # Última linha cuja transação foi confirmada: é dela que uma nova execução retoma.
+        self.committed_row = options['start_row'] - 1
+        self.started = time.perf_counter()
+        try:
+            with stream as f:
+                self.run(read_rows(f, fmt), options)
+        except (Exception, KeyboardInterrupt) as e:
+            resume = (
+                f'{self.imported} tarefa(s) já gravada(s). '
+                f'Retome com --start-row {self.committed_row + 1}.'
+            )
+            if isinstance(e, KeyboardInterrupt):
+                self.stderr.write(f'Importação interrompida. {resume}')
+                raise
+            raise CommandError(f'{e} {resume}') from e
+
+        elapsed = time.perf_counter() - self.started
+        rows = self.imported + self.rejected
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.imported} tarefa(s) importada(s), {self.rejected} linha(s) rejeitada(s) em {elapsed:.1f}s '
+            f'({rows / elapsed:.0f} linhas/s).'
+        ))
+
+    def run(self, rows, options):
+        chunk, last_row = [], self.committed_row
+        for number, row in rows:
+            if number < options['start_row']:
+                continue
+            last_row = number
+            task = self.build_task(number, row)
+            if task is None:
+                if self.rejected > options['max_errors']:
+                    raise CommandError(f'Mais de {options["max_errors"]} linha(s) inválida(s).')
+            else:
+                chunk.append(task)
+            if number - self.committed_row >= options['chunk_size']:
+                self.flush(chunk, last_row, options)
+                chunk = []
+        self.flush(chunk, last_row, options)
+
+    def build_task(self, number, row):
+        if '__error__' in row:
+            return self.reject(number, {'__all__': row['__error__']})
+        email = (row.get('user') or '').strip()
+        user_id = self.user_id(email) if email else self.default_user_id
+        if user_id is None:
+            error = f'usuário {email} não encontrado.' if email else 'sem coluna `user` e sem --user.'
+            return self.reject(number, {'user': error})
+        form = self.form_class(data=row)
+        if not form.is_valid():
+            return self.reject(number, form_errors(form))
+        task = form.save(commit=False)
+        task.user_id = user_id
+        return task
+
+    def reject(self, number, errors):
+        self.rejected += 1
+        self.stderr.write(f'Linha {number}: ' + '; '.join(f'{field}: {message}' for field, message in errors.items()))
+        return None
+
+    def user_id(self, email):
+        # Um SELECT por e-mail distinto; o dicionário cresce com o número de usuários, não de linhas.
+        if email not in self.users:
+            self.users[email] = User.objects.filter(email=email).values_list('pk', flat=True).first()
+        return self.users[email]
+
+    def flush(self, chunk, last_row, options):
+        if chunk:
+            with transaction.atomic():
+                Task.objects.bulk_create(chunk, batch_size=options['batch_size'])
+                # bulk_create não dispara os sinais que invalidam o cache da lista.
+                for user_id in {task.user_id for task in chunk}:
+                    bump_task_list_version(user_id)
+            self.imported += len(chunk)
+        self.committed_row = last_row
+        if chunk and options['verbosity'] >= 2:
+            elapsed = time.perf_counter() - self.started
+            self.stdout.write(
+                f'{self.imported} tarefa(s) até a linha {last_row} ({self.imported / elapsed:.0f} linhas/s).'
+            )
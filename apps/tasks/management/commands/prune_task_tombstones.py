@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.tasks.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Remove os tombstones de tarefas excluídas há mais de TASK_TOMBSTONE_RETENTION_DAYS dias.'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(
+            f'{deleted} tombstone(s) removido(s) (retenção: {settings.TASK_TOMBSTONE_RETENTION_DAYS} dias).'
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.models import TaskCounters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula do zero os contadores de tarefas (total, concluídas, atrasadas) por usuário e corrige '
+        'os que divergirem. Use após cargas feitas por fora do ORM ou para verificar a consistência.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help='E-mail de um usuário (repetível). Padrão: todos.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Usuários recalculados por transação.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser positivo.')
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(email__in=options['user'])
+            missing = set(options['user']) - set(users.values_list('email', flat=True))
+            if missing:
+                raise CommandError(f'Usuário(s) não encontrado(s): {", ".join(sorted(missing))}.')
+
+        started = time.perf_counter()
+        checked = fixed = 0
+        batch = []
+        for user_id in users.values_list('pk', flat=True).iterator(chunk_size=options['batch_size']):
+            batch.append(user_id)
+            if len(batch) >= options['batch_size']:
+                fixed += TaskCounters.objects.rebuild(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            fixed += TaskCounters.objects.rebuild(batch)
+            checked += len(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} usuário(s) verificado(s), {fixed} contador(es) corrigido(s) em {elapsed:.1f}s.'
+        ))
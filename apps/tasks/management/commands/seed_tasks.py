@@ -0,0 +1,116 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.tasks.models import Task, TaskCounters
+
+User = get_user_model()
+
+WORDS = (
+    'relatório reunião cliente projeto revisar enviar comprar pagar agendar ligar atualizar planilha '
+    'contrato orçamento apresentação código deploy backup médico mercado academia estudar ler escrever '
+    'documentação fatura entrega viagem equipe feedback proposta lista prazo sprint banco'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Gera usuários e tarefas sintéticos (bulk_create) para reproduzir localmente volumes de produção.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Número de usuários a criar.')
+        parser.add_argument('--tasks-per-user', type=int, default=200, help='Média de tarefas por usuário.')
+        parser.add_argument(
+            '--distribution', choices=('uniform', 'exponential'), default='exponential',
+            help='uniform: todos com a média; exponential: poucos usuários com muitas tarefas, como em produção.',
+        )
+        parser.add_argument('--completed-ratio', type=float, default=0.4, help='Fração de tarefas concluídas (0 a 1).')
+        parser.add_argument('--no-due-date-ratio', type=float, default=0.3, help='Fração de tarefas sem prazo (0 a 1).')
+        parser.add_argument('--due-date-spread', type=int, default=90, help='Prazos sorteados entre hoje-N e hoje+N dias.')
+        parser.add_argument('--description-words', type=int, default=20, help='Média de palavras da descrição (0 = sem descrição).')
+        parser.add_argument('--email-domain', default='seed.example.com', help='Domínio dos e-mails gerados.')
+        parser.add_argument('--password', default='password123', help='Senha de todos os usuários gerados.')
+        parser.add_argument('--seed', type=int, default=None, help='Semente do gerador aleatório (dados reprodutíveis).')
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_BULK_BATCH_SIZE, help='Linhas por INSERT.')
+
+    def handle(self, *args, **options):
+        for ratio in ('completed_ratio', 'no_due_date_ratio'):
+            if not 0 <= options[ratio] <= 1:
+                raise CommandError(f'--{ratio.replace("_", "-")} deve estar entre 0 e 1.')
+        if options['users'] < 1 or options['tasks_per_user'] < 0:
+            raise CommandError('--users deve ser positivo e --tasks-per-user não pode ser negativo.')
+
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        users = self.create_users(options)
+        task_count = self.create_tasks(users, rng, options)
+        # Estatísticas atualizadas para o planejador escolher os índices certos após a carga.
+        with connection.cursor() as cursor:
+            for model in (User, Task):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(users)} usuário(s) e {task_count} tarefa(s) criados em {elapsed:.1f}s '
+            f'({task_count / elapsed:.0f} tarefas/s).'
+        ))
+
+    def create_users(self, options):
+        # Um único hash para todos: o custo do PBKDF2 por usuário dominaria o tempo da carga.
+        password = make_password(options['password'])
+        # O sufixo evita colisão com usuários de execuções anteriores.
+        run = int(time.time())
+        users = [
+            User(email=f'seed-{run}-{i}@{options["email_domain"]}', name=f'Usuário Sintético {i}', password=password)
+            for i in range(options['users'])
+        ]
+        with transaction.atomic():
+            users = User.objects.bulk_create(users, batch_size=options['batch_size'])
+            # bulk_create não dispara o sinal que cria os contadores; o bulk_create das tarefas os ajusta.
+            TaskCounters.objects.bulk_create(
+                [TaskCounters(user=user, overdue_as_of=timezone.localdate()) for user in users], batch_size=options['batch_size'],
+            )
+            return users
+
+    def tasks_for(self, user, rng, options):
+        mean = options['tasks_per_user']
+        if options['distribution'] == 'uniform' or mean == 0:
+            count = mean
+        else:
+            count = int(rng.expovariate(1 / mean))
+        today = timezone.localdate()
+        spread = options['due_date_spread']
+        for _ in range(count):
+            words = options['description_words']
+            description = ' '.join(rng.choices(WORDS, k=rng.randint(1, words * 2))) if words else ''
+            due_date = None
+            if rng.random() >= options['no_due_date_ratio']:
+                due_date = today + timedelta(days=rng.randint(-spread, spread))
+            yield Task(
+                user=user,
+                title=' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+                description=description,
+                due_date=due_date,
+                completed=rng.random() < options['completed_ratio'],
+            )
+
+    def create_tasks(self, users, rng, options):
+        batch_size = options['batch_size']
+        batch, total = [], 0
+        with transaction.atomic():
+            for user in users:
+                for task in self.tasks_for(user, rng, options):
+                    batch.append(task)
+                    if len(batch) >= batch_size:
+                        Task.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+            if batch:
+                Task.objects.bulk_create(batch)
+                total += len(batch)
+        return total
@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.tasks.cache import fragment_stats, reset_fragment_stats
+
+
+class Command(BaseCommand):
+    help = 'Mostra os contadores de acerto/falha do cache de fragmentos da lista de tarefas (JSON).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zera os contadores após exibi-los.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(fragment_stats()))
+        if options['reset']:
+            reset_fragment_stats()
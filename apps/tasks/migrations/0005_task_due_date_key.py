@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-17 17:57
+
+import datetime
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_user_list_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['completed', 'due_date_key', 'created_at', 'id']},
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='due_date_key',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('due_date', models.Value(datetime.date(9999, 12, 31))), output_field=models.DateField()),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'completed', 'due_date_key', 'created_at', 'id'], name='task_user_keyset_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_user_list_idx',
+        ),
+    ]
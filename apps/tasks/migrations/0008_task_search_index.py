@@ -0,0 +1,77 @@
+# Generated by Django 5.1.7 on 2026-10-17 18:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQL congelado nesta migração, sem importar apps.tasks.search nem os modelos atuais: o índice é sempre o
+# que esta migração criou, e o reverso o remove. A expressão do Postgres precisa ser idêntica à que
+# search.search_vector() gera nas consultas (SearchVector('title', 'description', config='portuguese')).
+FORWARD_SQL = {
+    'sqlite': [
+        # Tabela FTS5 de conteúdo externo: guarda só o índice invertido, o texto continua em tasks_task.
+        # remove_diacritics faz "relatorio" encontrar "relatório".
+        "CREATE VIRTUAL TABLE tasks_task_fts USING fts5("
+        "title, description, content='tasks_task', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+        "INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+        "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description ON tasks_task BEGIN "
+        "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        # Indexa as tarefas que já existiam antes da migração.
+        "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+    ],
+    'postgresql': [
+        "CREATE INDEX task_search_idx ON tasks_task USING gin ("
+        "to_tsvector('portuguese'::regconfig, COALESCE(title, '') || ' ' || COALESCE(description, '')))",
+    ],
+}
+REVERSE_SQL = {
+    'sqlite': [
+        'DROP TRIGGER tasks_task_fts_update',
+        'DROP TRIGGER tasks_task_fts_delete',
+        'DROP TRIGGER tasks_task_fts_insert',
+        'DROP TABLE tasks_task_fts',
+    ],
+    'postgresql': [
+        'DROP INDEX task_search_idx',
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    # Como RunSQL, mas só com o SQL do banco em uso; outros bancos ficam sem índice de busca.
+    for sql in FORWARD_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in REVERSE_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_tasktombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchEntry',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tasks.task')),
+                ('document', models.TextField(db_column='tasks_task_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tasks_task_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
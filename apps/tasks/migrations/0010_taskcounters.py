@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def backfill_counters(apps, schema_editor):
+    db = schema_editor.connection.alias
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounters = apps.get_model('tasks', 'TaskCounters')
+    today = timezone.localdate()
+    counts = {
+        row['user_id']: row for row in Task.objects.using(db).order_by().values('user_id').annotate(
+            count_total=Count('pk'),
+            count_completed=Count('pk', filter=Q(completed=True)),
+            count_overdue=Count('pk', filter=Q(completed=False, due_date_key__lt=today)),
+        )
+    }
+    batch = []
+    for user_id in User.objects.using(db).order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000):
+        row = counts.get(user_id, {})
+        batch.append(TaskCounters(
+            user_id=user_id, total=row.get('count_total', 0), completed=row.get('count_completed', 0),
+            overdue=row.get('count_overdue', 0), overdue_as_of=today,
+        ))
+        if len(batch) >= 2000:
+            TaskCounters.objects.using(db).bulk_create(batch)
+            batch = []
+    TaskCounters.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=models.deletion.CASCADE, primary_key=True, related_name='task_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(default=0)),
+                ('overdue_as_of', models.DateField(null=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
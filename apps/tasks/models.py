@@ -1,16 +1,428 @@
-from django.db import models
+from collections import Counter
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models, router, transaction
+from django.db.models import Case, Count, F, Q, Value, When, sql
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.conf import settings # Importar settings para referenciar o modelo User
 
+from .cache import bump_task_list_version
+
+# Tarefas sem prazo são ordenadas depois de todas as outras, igualmente no SQLite e no Postgres.
+NO_DUE_DATE = date(9999, 12, 31)
+# Campos que alteram os contadores de TaskCounters.
+COUNTED_FIELDS = {'user', 'user_id', 'completed', 'due_date'}
+
+
+class CounterDeltas:
+    """
+    Variações dos contadores de cada usuário, acumuladas em Python e aplicadas com um único
+    UPDATE ... F() por usuário. Uma tarefa conta como atrasada se está pendente e o prazo é anterior
+    ao `overdue_as_of` da linha de contadores; como essa data está no banco, a variação de `overdue`
+    é uma expressão CASE avaliada pelo próprio UPDATE.
+    """
+
+    def __init__(self):
+        self.users = {}
+
+    def add(self, user_id, completed, due_date, sign=1):
+        delta = self.users.setdefault(user_id, {'total': 0, 'completed': 0, 'overdue': Counter()})
+        delta['total'] += sign
+        if completed:
+            delta['completed'] += sign
+        elif due_date is not None:
+            delta['overdue'][due_date] += sign
+
+    def change(self, old, new):
+        # `old` e `new` são (user_id, completed, due_date); `old` é None numa criação e `new`, numa exclusão.
+        if old != new:
+            if old is not None:
+                self.add(*old, sign=-1)
+            if new is not None:
+                self.add(*new)
+
+    @staticmethod
+    def overdue_expression(due_dates):
+        # Soma das variações cujo prazo é anterior a overdue_as_of: um CASE com os prazos em ordem
+        # decrescente e a soma acumulada de cada um (o primeiro WHEN verdadeiro já tem o total).
+        cumulative, whens = 0, []
+        for due_date, count in sorted(due_dates.items()):
+            cumulative += count
+            whens.append(When(overdue_as_of__gt=due_date, then=Value(cumulative)))
+        return Case(*reversed(whens), default=Value(0), output_field=models.IntegerField())
+
+    def apply(self, using=None):
+        for user_id, delta in self.users.items():
+            overdue = {due_date: count for due_date, count in delta['overdue'].items() if count}
+            if not (delta['total'] or delta['completed'] or overdue):
+                continue
+            changes = {name: F(name) + delta[name] for name in ('total', 'completed') if delta[name]}
+            if overdue:
+                changes['overdue'] = F('overdue') + self.overdue_expression(overdue)
+            # Sem linha de contadores (usuário anterior à tabela) nada é alterado; ela é criada na leitura.
+            TaskCounters.objects.using(using).filter(user_id=user_id).update(**changes)
+        self.users = {}
+
+class TaskQuerySet(models.QuerySet):
+    def filter_completed(self, value):
+        # Aplica o filtro `?completed=true|false` usado pela listagem e pela API; outros valores não filtram.
+        if value == 'true':
+            return self.filter(completed=True)
+        if value == 'false':
+            return self.filter(completed=False)
+        return self
+
+    def counted_states(self):
+        """
+        Estado contado (user_id, completed, due_date) de cada tarefa, por pk, lido com as linhas bloqueadas
+        (SELECT ... FOR UPDATE) até o fim da transação de quem chama. É a base das variações dos contadores:
+        o estado em memória das instâncias pode já ter sido alterado por outra requisição.
+        """
+        rows = self.select_for_update(of=('self',)).order_by().values_list('pk', 'user_id', 'completed', 'due_date')
+        return {pk: tuple(state) for pk, *state in rows}
+
+    def set_completed(self, completed):
+        """
+        Marca as tarefas como concluídas ou pendentes com um único UPDATE. Só altera as que mudam de
+        estado (updated_at das demais fica intacto para a sincronização). Retorna o número de tarefas alteradas.
+        """
+        return self.filter(completed=not completed).update(completed=completed, updated_at=timezone.now())
+
+    def update_returning(self, **kwargs):
+        """
+        UPDATE com RETURNING (SQLite 3.35+ e PostgreSQL): as linhas alteradas voltam como instâncias de
+        Task na mesma instrução, sem SELECT antes ou depois. Como `update()` do Django, não dispara sinais
+        nem ajusta contadores ou cache; quem chama cuida disso (ver set_completed_returning).
+        """
+        connection = connections[self.db]
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(kwargs)
+        update_sql, params = query.get_compiler(self.db).as_sql()
+        fields = Task._meta.concrete_fields
+        returning = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        # Os mesmos conversores de um SELECT (ex: datas e booleanos vêm como texto e inteiros no SQLite).
+        columns = [field.get_col(Task._meta.db_table) for field in fields]
+        converters = [
+            connection.ops.get_db_converters(column) + column.get_db_converters(connection) for column in columns
+        ]
+        with transaction.mark_for_rollback_on_error(using=self.db), connection.cursor() as cursor:
+            cursor.execute(f'{update_sql} RETURNING {returning}', params)
+            rows = cursor.fetchall()
+        tasks = []
+        for row in rows:
+            values = []
+            for value, column, column_converters in zip(row, columns, converters):
+                for converter in column_converters:
+                    value = converter(value, column, connection)
+                values.append(value)
+            tasks.append(Task.from_db(self.db, [field.attname for field in fields], values))
+        return tasks
+
+    def set_completed_returning(self, completed):
+        """
+        Como set_completed(), mas com um único UPDATE ... RETURNING e sem ler as tarefas antes: o estado
+        devolvido basta para ajustar os contadores (um UPDATE por usuário) e responder. Retorna as tarefas
+        que mudaram de estado; uma tarefa que já estava no estado pedido não é alterada nem devolvida.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            tasks = self.filter(completed=not completed).update_returning(
+                completed=completed, updated_at=timezone.now(),
+            )
+            deltas = CounterDeltas()
+            for task in tasks:
+                deltas.change((task.user_id, not completed, task.due_date), task.counted_state())
+            deltas.apply(self.db)
+        for user_id in {task.user_id for task in tasks}:
+            bump_task_list_version(user_id)
+        return tasks
+
+    async def aset_completed_returning(self, completed):
+        return await sync_to_async(self.set_completed_returning)(completed)
+
+    def update(self, **kwargs):
+        """
+        `update()` não dispara sinais nem passa por `save()`: quando altera um campo contado, ajusta os
+        contadores dos donos (a partir dos estados das linhas afetadas, lidos com as linhas bloqueadas) e
+        invalida o cache da lista deles. O UPDATE se restringe, em lotes, às linhas bloqueadas: uma tarefa
+        criada entre a leitura e o UPDATE seria alterada sem entrar na conta.
+        """
+        if not COUNTED_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+        batch_size = settings.TASK_BULK_BATCH_SIZE
+        with transaction.atomic(using=self.db, savepoint=False):
+            states = self.counted_states()
+            pks, count = list(states), 0
+            for start in range(0, len(pks), batch_size):
+                # _base_manager usa o QuerySet padrão, sem recursão neste método.
+                count += Task._base_manager.using(self.db).filter(pk__in=pks[start:start + batch_size]).update(**kwargs)
+            groups = Counter(states.values())
+            user_ids = {user_id for user_id, *_ in groups}
+            new_user = kwargs.get('user_id', getattr(kwargs.get('user'), 'pk', kwargs.get('user')))
+            if any(hasattr(value, 'resolve_expression') for value in kwargs.values()):
+                # Valores calculados pelo banco (ex: F()): recalcula os donos afetados.
+                TaskCounters.objects.using(self.db).rebuild(user_ids | ({new_user} - {None}))
+            else:
+                deltas = CounterDeltas()
+                for (user_id, completed, due_date), rows in groups.items():
+                    deltas.add(user_id, completed, due_date, sign=-rows)
+                    deltas.add(
+                        new_user if new_user is not None else user_id,
+                        kwargs.get('completed', completed), kwargs.get('due_date', due_date), sign=rows,
+                    )
+                deltas.apply(self.db)
+            for user_id in user_ids | ({new_user} - {None}):
+                bump_task_list_version(user_id)
+        return count
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Contadores ajustados na mesma transação; o cache continua a cargo de quem chama.
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            deltas = CounterDeltas()
+            for obj in objs:
+                deltas.change(None, obj.counted_state())
+            deltas.apply(self.db)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if not COUNTED_FIELDS & set(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            old = Task.objects.using(self.db).filter(pk__in=[obj.pk for obj in objs]).counted_states()
+            # _base_manager: o bulk_update padrão chama update(), e este QuerySet contaria as linhas de novo.
+            count = Task._base_manager.using(self.db).bulk_update(objs, fields, *args, **kwargs)
+            deltas = CounterDeltas()
+            for obj in objs:
+                # Tarefa já excluída (sem linha) não é atualizada nem contada.
+                if obj.pk in old:
+                    deltas.change(old[obj.pk], obj.counted_state(old[obj.pk], fields))
+            deltas.apply(self.db)
+        return count
+
+    def delete(self):
+        """
+        Exclui as tarefas registrando um TaskTombstone para cada uma, para que a sincronização
+        incremental informe as exclusões. Processa em lotes de ids para limitar os parâmetros SQL.
+        Como update(), não dispara sinais: nenhuma relação com Task tem cascata (a busca é DO_NOTHING),
+        então cada lote é um DELETE direto, sem o SELECT das linhas inteiras que o Collector faria para
+        enviar post_delete, e o cache da lista é invalidado uma vez por dono.
+        """
+        batch_size = settings.TASK_BULK_BATCH_SIZE
+        total = 0
+        with transaction.atomic(using=self.db):
+            rows = [(pk, *state) for pk, state in self.counted_states().items()]
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                TaskTombstone.objects.using(self.db).bulk_create(
+                    [TaskTombstone(task_id=pk, user_id=user_id) for pk, user_id, *_ in batch]
+                )
+                deltas = CounterDeltas()
+                for _, *state in batch:
+                    deltas.add(*state, sign=-1)
+                deltas.apply(self.db)
+                # _base_manager usa o QuerySet padrão, sem recursão neste método.
+                total += Task._base_manager.using(self.db).filter(pk__in=[pk for pk, *_ in batch])._raw_delete(self.db)
+            for user_id in {user_id for _, user_id, *_ in rows}:
+                bump_task_list_version(user_id)
+        return total, {Task._meta.label: total} if total else {}
+
+
 class Task(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tasks')
+    # O índice composto abaixo já começa por user_id, então o índice simples da FK seria redundante.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tasks', db_index=False)
     title = models.CharField(max_length=200, null=False, blank=False)
     description = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    # Chave de ordenação sem NULL, calculada pelo banco, que permite a paginação por cursor (keyset).
+    due_date_key = models.GeneratedField(
+        expression=Coalesce('due_date', models.Value(NO_DUE_DATE)),
+        output_field=models.DateField(),
+        db_persist=True,
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['completed', 'due_date_key', 'created_at', 'id']
+        indexes = [
+            # Cobre o filtro por usuário (e opcionalmente por `completed`) da TaskListView
+            # já na ordem de Meta.ordering, evitando ordenação em memória e permitindo
+            # que a paginação por cursor faça seek direto na posição da página.
+            models.Index(fields=['user', 'completed', 'due_date_key', 'created_at', 'id'], name='task_user_keyset_idx'),
+            # Sincronização incremental: alterações do usuário desde o cursor, em ordem de (updated_at, id).
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_sync_idx'),
+            # Changelist do admin: ordenação por criação (mais recentes primeiro) e filtro de data sem ler a tabela toda.
+            models.Index(fields=['created_at', 'id'], name='task_created_at_idx'),
+        ]
+
+    def counted_state(self, old=None, fields=None):
+        # Estado que define os contadores. Com `fields` (update_fields), os campos não salvos mantêm o valor de `old`.
+        state = (self.user_id, self.completed, self.due_date)
+        if fields is None or old is None:
+            return state
+        fields = set(fields)
+        names = ({'user', 'user_id'}, {'completed'}, {'due_date'})
+        return tuple(value if name & fields else previous for value, previous, name in zip(state, old, names))
+
+    def _locked_counted_state(self, using):
+        # Estado contado da linha no banco (None se ela não existe), bloqueada até o fim da transação.
+        return Task.objects.using(using).filter(pk=self.pk).counted_states().get(self.pk)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+            return super().save(*args, **kwargs)
+        # savepoint=False: só garante a transação, sem SAVEPOINT extra dentro de um atomic já aberto.
+        with transaction.atomic(using=using, savepoint=False):
+            # Com pk definido o save() pode ser um UPDATE mesmo numa instância nova: vale o que está no banco.
+            old = None if self.pk is None else self._locked_counted_state(using)
+            super().save(*args, **kwargs)
+            deltas = CounterDeltas()
+            deltas.change(old, self.counted_state(old, update_fields))
+            deltas.apply(using)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            pk, old = self.pk, self._locked_counted_state(using)
+            result = super().delete(*args, **kwargs)
+            # Excluída antes por outra requisição: nada a descontar nem a registrar.
+            if result[1].get(Task._meta.label):
+                TaskTombstone.objects.using(using).create(task_id=pk, user_id=old[0])
+                deltas = CounterDeltas()
+                deltas.change(old, None)
+                deltas.apply(using)
+            return result
+
+    def __str__(self):
+        return self.title
+
+
+class TaskTombstone(models.Model):
+    """
+    Marca a exclusão de uma tarefa para a sincronização incremental. Removido por
+    `prune_task_tombstones` após TASK_TOMBSTONE_RETENTION_DAYS.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_tombstones', db_index=False)
+    task_id = models.IntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['completed', 'due_date', 'created_at']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id'], name='tombstone_user_sync_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'Tarefa {self.task_id} excluída em {self.deleted_at:%d/%m/%Y %H:%M}'
+
+
+class TaskCountersQuerySet(models.QuerySet):
+    def for_user(self, user_id):
+        """
+        Contadores do usuário com os atrasados válidos para hoje. A contagem de atrasados vale até a data
+        `overdue_as_of`; na primeira leitura de um novo dia, só as tarefas pendentes com prazo entre a data
+        anterior e ontem são contadas (seek no índice task_user_keyset_idx) e somadas, com a linha bloqueada.
+        """
+        today = timezone.localdate()
+        counters = self.filter(user_id=user_id).first()
+        if counters is None or counters.overdue_as_of is None or counters.overdue_as_of > today:
+            self.rebuild([user_id])
+            return self.get(user_id=user_id)
+        if counters.overdue_as_of < today:
+            with transaction.atomic(using=self.db):
+                counters = self.select_for_update().get(user_id=user_id)
+                if counters.overdue_as_of < today:
+                    counters.overdue += Task.objects.using(self.db).filter(
+                        user_id=user_id, completed=False,
+                        due_date_key__gte=counters.overdue_as_of, due_date_key__lt=today,
+                    ).count()
+                    counters.overdue_as_of = today
+                    counters.save(update_fields=['overdue', 'overdue_as_of'])
+        return counters
+
+    async def afor_user(self, user_id):
+        # Como os métodos assíncronos do QuerySet: a varredura com SELECT FOR UPDATE roda numa thread.
+        return await sync_to_async(self.for_user)(user_id)
+
+    def rebuild(self, user_ids):
+        """
+        Recalcula do zero, com COUNT(*) agrupado, os contadores dos usuários informados, criando as linhas
+        que faltam. Retorna quantos usuários tinham contadores ausentes ou diferentes do recalculado.
+        """
+        user_ids = list(user_ids)
+        today = timezone.localdate()
+        with transaction.atomic(using=self.db):
+            existing = {
+                row[0]: row[1:] for row in self.select_for_update().filter(user_id__in=user_ids)
+                .values_list('user_id', 'total', 'completed', 'overdue', 'overdue_as_of')
+            }
+            counts = {
+                row['user_id']: row for row in Task.objects.using(self.db).filter(user_id__in=user_ids).order_by()
+                .values('user_id').annotate(
+                    count_total=Count('pk'),
+                    count_completed=Count('pk', filter=Q(completed=True)),
+                    count_overdue=Count('pk', filter=Q(completed=False, due_date_key__lt=today)),
+                )
+            }
+            rows, fixed = [], 0
+            for user_id in user_ids:
+                row = counts.get(user_id, {})
+                counters = TaskCounters(
+                    user_id=user_id, total=row.get('count_total', 0), completed=row.get('count_completed', 0),
+                    overdue=row.get('count_overdue', 0), overdue_as_of=today,
+                )
+                current = existing.get(user_id)
+                if current is None or current[:3] != (counters.total, counters.completed, counters.overdue):
+                    fixed += 1
+                rows.append(counters)
+            self.bulk_create(
+                rows, update_conflicts=True, unique_fields=['user'],
+                update_fields=['total', 'completed', 'overdue', 'overdue_as_of'],
+            )
+        return fixed
+
+
+class TaskCounters(models.Model):
+    """
+    Contadores de tarefas por usuário, desnormalizados para o cabeçalho e os filtros da lista sem COUNT(*).
+    Ajustados na mesma transação de cada alteração (`Task.save`/`delete` e os caminhos em lote do
+    TaskQuerySet) com UPDATE ... F(); `rebuild_task_counters` os recalcula do zero.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='task_counters')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    # Tarefas pendentes com prazo anterior a `overdue_as_of`, data que avança na primeira leitura do dia.
+    overdue = models.IntegerField(default=0)
+    overdue_as_of = models.DateField(null=True)
+
+    objects = TaskCountersQuerySet.as_manager()
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    def __str__(self):
+        return f'{self.total} tarefa(s), {self.pending} pendente(s)'
+
+
+class TaskSearchEntry(models.Model):
+    """
+    Tabela FTS5 `tasks_task_fts` (apenas SQLite), criada com os triggers que a mantêm pela migração 0008.
+    Não é gerenciada pelo Django; serve para a busca fazer o JOIN com as tarefas pelo ORM.
+    """
+    task = models.OneToOneField(Task, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry')
+    # Coluna oculta com o nome da tabela, usada no lado esquerdo do MATCH, e a relevância BM25 do FTS5.
+    document = models.TextField(db_column='tasks_task_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_fts'
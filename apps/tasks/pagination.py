@@ -0,0 +1,136 @@
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from django.db.models import BooleanField, DateField, DateTimeField, F, Field, Func, IntegerField, Value
+
+from .models import NO_DUE_DATE
+
+# Colunas de Task.Meta.ordering, na mesma ordem do índice `task_user_keyset_idx`.
+KEYSET_FIELDS = ('completed', 'due_date_key', 'created_at', 'id')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Row(Func):
+    # Row value SQL: (a, b, c) > (x, y, z). SQLite (3.15+) e Postgres usam a comparação
+    # como limite inferior do índice composto, então a página N custa o mesmo que a página 1.
+    function = ''
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
+def keyset_values(task):
+    # `task` é uma instância de Task ou uma linha de values() (listagem rápida, ver rendering.py).
+    if isinstance(task, dict):
+        completed, due_date, created_at, pk = task['completed'], task['due_date'], task['created_at'], task['id']
+    else:
+        completed, due_date, created_at, pk = task.completed, task.due_date, task.created_at, task.pk
+    return completed, due_date or NO_DUE_DATE, created_at, pk
+
+
+def encode_cursor(task):
+    completed, due_date_key, created_at, pk = keyset_values(task)
+    payload = [completed, due_date_key.isoformat(), created_at.isoformat(), pk]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def position_key(task):
+    """
+    Posição da tarefa na ordenação da lista (KEYSET_FIELDS) como dígitos de largura fixa, em que a ordem
+    das strings é a das tarefas: o tasks.js a compara para inserir uma linha nova no lugar certo. Só
+    inteiros (ordinal do prazo, microssegundos desde 1970), pois é calculada para cada linha da listagem.
+    """
+    completed, due_date_key, created_at, pk = keyset_values(task)
+    return f'{completed:d}{due_date_key.toordinal():07d}{(created_at - EPOCH) // MICROSECOND:017d}{pk:012d}'
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        completed, due_date_key, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            bool(completed),
+            date.fromisoformat(due_date_key),
+            datetime.fromisoformat(created_at),
+            int(pk),
+        )
+    except (ValueError, TypeError):
+        raise InvalidCursor('Cursor de paginação inválido.')
+
+
+def keyset_page(queryset, cursor, page_size):
+    # Uma linha além da página indica se há próxima página.
+    if cursor:
+        completed, due_date_key, created_at, pk = decode_cursor(cursor)
+        queryset = queryset.alias(
+            _keyset=Row(*(F(field) for field in KEYSET_FIELDS)),
+        ).filter(_keyset__gt=Row(
+            Value(completed, output_field=BooleanField()),
+            Value(due_date_key, output_field=DateField()),
+            Value(created_at, output_field=DateTimeField()),
+            Value(pk, output_field=IntegerField()),
+        ))
+    return queryset[:page_size + 1]
+
+
+def keyset_result(tasks, page_size):
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        return tasks, encode_cursor(tasks[-1])
+    return tasks, None
+
+
+def paginate_tasks(queryset, cursor, page_size):
+    """
+    Retorna (tarefas, próximo_cursor) usando paginação por cursor (keyset) em vez de OFFSET.
+    `queryset` deve estar na ordenação padrão de Task; `cursor` é o valor devolvido pela página anterior.
+    """
+    return keyset_result(list(keyset_page(queryset, cursor, page_size)), page_size)
+
+
+async def apaginate_tasks(queryset, cursor, page_size):
+    # Versão assíncrona de paginate_tasks, para as views ASGI (async for no ORM).
+    return keyset_result([task async for task in keyset_page(queryset, cursor, page_size)], page_size)
+
+
+def encode_offset_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode()).decode().rstrip('=')
+
+
+def decode_offset_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))['offset'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('Cursor de paginação inválido.')
+    if offset < 0:
+        raise InvalidCursor('Cursor de paginação inválido.')
+    return offset
+
+
+def paginate_ranked(queryset, cursor, page_size):
+    """
+    Paginação por deslocamento para resultados ordenados por relevância (busca). A relevância não
+    é uma chave de índice e todas as correspondências são pontuadas de qualquer forma, então um
+    cursor keyset não economizaria trabalho. O cursor é opaco, como o de `paginate_tasks`.
+    """
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    return ranked_result(list(queryset[offset:offset + page_size + 1]), offset, page_size)
+
+
+async def apaginate_ranked(queryset, cursor, page_size):
+    # Versão assíncrona de paginate_ranked.
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    return ranked_result([task async for task in queryset[offset:offset + page_size + 1]], offset, page_size)
+
+
+def ranked_result(tasks, offset, page_size):
+    if len(tasks) > page_size:
+        return tasks[:page_size], encode_offset_cursor(offset + page_size)
+    return tasks, None
@@ -0,0 +1,122 @@
+"""
+Caminho rápido da listagem de tarefas. As páginas são lidas com values() (só as colunas exibidas, sem
+instanciar Task) e a descrição já vem truncada pelo banco; o texto completo é buscado pelo tasks.js na
+API quando o usuário expande a tarefa ou abre a edição. Cada linha é preenchida num template de linha
+compilado uma única vez, sem o custo por variável do motor de templates do Django (resolução de variáveis,
+localização de números e um reverse() por linha para a URL de exclusão). O mesmo template gera a linha
+avulsa de uma tarefa (row_payload) devolvida pelas escritas e enviada nos eventos SSE, para o tasks.js
+trocar ou inserir um único <li> sem montar a marcação por conta própria.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models.functions import Length, Substr
+from django.db.models.lookups import GreaterThan
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .pagination import position_key
+
+# Colunas lidas pela listagem; created_at e id também compõem o cursor da próxima página.
+LIST_COLUMNS = ('id', 'title', 'due_date', 'completed', 'created_at')
+
+# Marcação de um item da lista; `data-position` é a chave de ordenação usada pelo tasks.js ao inserir itens.
+ROW_HTML = (
+    '<li class="task-item" id="task-item-{id}" data-due-date="{due_date_iso}" data-position="{position}">'
+    '<div class="task-view" id="task-view-{id}">'
+    '<div class="task-main">'
+    '<div class="task-checkbox-wrapper">'
+    '<input type="checkbox"{checked} data-task-id="{id}" class="task-checkbox task-completed-toggle" id="checkbox-{id}">'
+    '<label for="checkbox-{id}" class="checkbox-custom"></label>'
+    '</div>'
+    '<div class="task-content">'
+    '<span class="task-title{completed_class}">{title}</span>'
+    '{due_date_html}'
+    '<p class="task-description{description_class}">{description}</p>'
+    '{expand_html}'
+    '</div>'
+    '</div>'
+    '<div class="task-actions">'
+    '<button data-task-id="{id}" class="btn btn-edit edit-task-button">Editar</button>'
+    '<form action="{delete_url}" method="post" class="delete-task-form" style="display:inline;">'
+    '{csrf_input}'
+    '<button type="submit" data-task-id="{id}" class="btn btn-delete">Excluir</button>'
+    '</form>'
+    '</div>'
+    '</div>'
+    '</li>'
+)
+EXPAND_HTML = '<button type="button" data-task-id="{id}" class="task-description-expand">Ver mais</button>'
+
+
+def list_rows(queryset):
+    """
+    `queryset` como dicts com LIST_COLUMNS, `description` (os primeiros TASK_LIST_DESCRIPTION_LENGTH
+    caracteres, cortados pelo banco) e `description_truncated`. Mantém os filtros e a ordenação.
+    """
+    length = settings.TASK_LIST_DESCRIPTION_LENGTH
+    return queryset.values(
+        *LIST_COLUMNS,
+        # `description` é um campo do modelo e não pode ser o nome da anotação.
+        description_preview=Substr('description', 1, length),
+        description_truncated=GreaterThan(Length('description'), length),
+    )
+
+
+@lru_cache
+def row_template():
+    # Compilado uma única vez por processo: a URL de exclusão entra já resolvida, com o id como campo.
+    delete_url = escape(reverse('tasks:task_delete', args=[0])).replace('/0/', '/{id}/')
+    return ROW_HTML.replace('{delete_url}', delete_url).format
+
+
+def render_rows(request, rows):
+    """
+    HTML (seguro) dos itens da lista para `rows` de list_rows(). Sem `request` (linhas avulsas, que os
+    eventos SSE levam a outras sessões), o formulário de exclusão vai sem o token CSRF: o tasks.js exclui
+    via AJAX com o token da página no cabeçalho X-CSRFToken.
+    """
+    render_row = row_template()
+    # O mesmo token em todas as linhas, como o {% csrf_token %} de um template.
+    csrf_input = (
+        f'<input type="hidden" name="csrfmiddlewaretoken" value="{escape(get_token(request))}">' if request else ''
+    )
+    html = []
+    for row in rows:
+        due_date, description = row['due_date'], row['description_preview']
+        html.append(render_row(
+            id=row['id'],
+            position=position_key(row),
+            title=escape(row['title']),
+            checked=' checked' if row['completed'] else '',
+            completed_class=' task-completed' if row['completed'] else '',
+            due_date_iso=due_date.isoformat() if due_date else '',
+            due_date_html=f'<span class="task-due-date">Prazo: {due_date:%d/%m/%Y}</span>' if due_date else '',
+            description=escape(description) if description else 'Sem descrição.',
+            description_class=(
+                ' task-description-truncated' if row['description_truncated']
+                else '' if description else ' task-description-empty'
+            ),
+            expand_html=EXPAND_HTML.format(id=row['id']) if row['description_truncated'] else '',
+            csrf_input=csrf_input,
+        ))
+    return mark_safe(''.join(html))
+
+
+def task_row(task):
+    # Uma instância de Task no formato de list_rows(), com a descrição cortada em Python como o SUBSTR.
+    length = settings.TASK_LIST_DESCRIPTION_LENGTH
+    description = task.description or ''
+    row = {column: getattr(task, column) for column in LIST_COLUMNS}
+    row.update(description_preview=description[:length], description_truncated=len(description) > length)
+    return row
+
+
+def row_payload(task):
+    """
+    Item da lista de uma tarefa, renderizado como na listagem, e a sua chave de posição, para as respostas
+    das escritas e os eventos SSE: `{'row': '<li ...>', 'position': '...'}`.
+    """
+    return {'row': render_rows(None, [task_row(task)]), 'position': position_key(task)}
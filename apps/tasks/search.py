@@ -0,0 +1,64 @@
+import re
+
+from django.db import connections
+from django.db.models import F, Lookup
+
+from .models import TaskSearchEntry
+
+# Configuração de texto do Postgres; a expressão do índice GIN (migração 0008) e a das consultas precisam ser idênticas.
+SEARCH_CONFIG = 'portuguese'
+# Termos além deste limite são ignorados: cada termo é mais uma lista de postings a intersectar.
+MAX_TERMS = 8
+TERM_RE = re.compile(r'[^\W_]+')
+
+
+class Fts5Match(Lookup):
+    # <tabela> MATCH <consulta>: usa o índice invertido do FTS5. Como lookup, o JOIN é INNER,
+    # que o FTS5 exige para resolver o MATCH.
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+TaskSearchEntry._meta.get_field('document').register_lookup(Fts5Match)
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector('title', 'description', config=SEARCH_CONFIG)
+
+
+def search_terms(query):
+    return TERM_RE.findall(query or '')[:MAX_TERMS]
+
+
+def search_tasks(queryset, query):
+    """
+    Filtra `queryset` pelas tarefas que contêm todos os termos de `query` (cada termo também como
+    prefixo), anota `search_rank` (maior é mais relevante) e ordena por ele. Usa o FTS5 no SQLite
+    e o índice GIN sobre `to_tsvector` no Postgres; nenhum dos dois varre a tabela com LIKE.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connections[queryset.db].vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        # Os termos só têm letras e dígitos, então a sintaxe raw do tsquery é segura.
+        tsquery = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+        queryset = queryset.alias(_search=search_vector()).filter(_search=tsquery).annotate(
+            search_rank=SearchRank(search_vector(), tsquery),
+        )
+    else:
+        # Cada termo entre aspas: caracteres da sintaxe do FTS5 digitados pelo usuário não causam erro.
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # O `rank` do FTS5 é o BM25 negativo (menor é melhor).
+        queryset = queryset.filter(search_entry__document__match=match).annotate(
+            search_rank=-F('search_entry__rank'),
+        )
+    return queryset.order_by('-search_rank', 'id')
+
@@ -0,0 +1,25 @@
+def serialize_task(task):
+    # Representação JSON única de uma tarefa, usada pelas respostas AJAX e pela API.
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'due_date': task.due_date.strftime('%Y-%m-%d') if task.due_date else None,
+        'completed': task.completed,
+        'created_at': task.created_at.isoformat() if task.created_at else None,
+        'updated_at': task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+def form_errors(form):
+    # Extrai o primeiro erro por campo, no mesmo formato das respostas AJAX das views.
+    return {field: form.errors[field][0] for field in form.errors}
+
+
+def serialize_counters(counters):
+    return {
+        'total': counters.total,
+        'pending': counters.pending,
+        'completed': counters.completed,
+        'overdue': counters.overdue,
+    }
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_task_list_version
+from .models import Task, TaskCounters
+
+
+# Cobre as views, a API e o admin. Caminhos em lote (bulk_create, bulk_update, queryset.update e
+# queryset.delete) não disparam sinais e chamam bump_task_list_version diretamente.
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_list_cache(sender, instance, **kwargs):
+    bump_task_list_version(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_task_counters(sender, instance, created, raw=False, **kwargs):
+    # Linha de contadores desde a criação do usuário; as tarefas só a ajustam com UPDATE ... F().
+    if created and not raw:
+        TaskCounters.objects.create(user=instance, overdue_as_of=timezone.localdate())
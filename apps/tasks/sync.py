@@ -0,0 +1,108 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import DateTimeField, F, IntegerField, Value
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+from .pagination import Row
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidSyncCursor(ValueError):
+    pass
+
+
+class SyncCursorExpired(Exception):
+    """O cursor é mais antigo que a retenção dos tombstones: o cliente precisa de uma sincronização completa."""
+
+
+def _to_micros(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def encode_sync_cursor(tasks_position, tombstones_position):
+    # Cada fluxo (tarefas alteradas e tombstones) tem sua própria posição (timestamp, id).
+    payload = {
+        't': [_to_micros(tasks_position[0]), tasks_position[1]],
+        'd': [_to_micros(tombstones_position[0]), tombstones_position[1]],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_sync_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return (
+            (_from_micros(int(payload['t'][0])), int(payload['t'][1])),
+            (_from_micros(int(payload['d'][0])), int(payload['d'][1])),
+        )
+    except (ValueError, TypeError, KeyError, IndexError, OverflowError):
+        raise InvalidSyncCursor('Cursor de sincronização inválido.')
+
+
+def _page_after(queryset, timestamp_field, position, limit):
+    # Keyset em (timestamp, id): seek no índice (user, timestamp, id), custo proporcional às alterações.
+    return list(
+        queryset.alias(_sync_key=Row(F(timestamp_field), F('id')))
+        .filter(_sync_key__gt=Row(
+            Value(position[0], output_field=DateTimeField()),
+            Value(position[1], output_field=IntegerField()),
+        ))
+        .order_by(timestamp_field, 'id')[:limit + 1]
+    )
+
+
+def _next_position(items, timestamp_field, position, limit, floor):
+    if len(items) > limit:
+        # Há mais itens: a próxima página continua exatamente após o último entregue.
+        last = items[limit - 1]
+        return (getattr(last, timestamp_field), last.pk), True
+    if items:
+        position = (getattr(items[-1], timestamp_field), items[-1].pk)
+    # Fluxo esgotado: recua até a janela de segurança para reler transações que ainda não
+    # tinham feito commit (timestamps são atribuídos antes do commit). Itens podem se repetir.
+    return min(position, (floor, 0)), False
+
+
+def changes_since(user, cursor=None):
+    """
+    Alterações das tarefas do usuário desde `cursor`: tarefas criadas/alteradas, tombstones de
+    exclusões, o próximo cursor e se há mais páginas. Sem cursor, retorna todas as tarefas atuais.
+    """
+    now = timezone.now()
+    floor = now - timedelta(seconds=settings.TASK_SYNC_SAFETY_WINDOW_SECONDS)
+    limit = settings.TASK_SYNC_PAGE_SIZE
+
+    if cursor:
+        tasks_position, tombstones_position = decode_sync_cursor(cursor)
+        if tombstones_position[0] < now - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS):
+            raise SyncCursorExpired('Cursor anterior à retenção de exclusões; faça uma sincronização completa.')
+    else:
+        # Sincronização completa: todas as tarefas existentes; exclusões só a partir de agora.
+        tasks_position, tombstones_position = (EPOCH, 0), (floor, 0)
+
+    tasks = _page_after(Task.objects.filter(user=user), 'updated_at', tasks_position, limit)
+    tombstones = _page_after(TaskTombstone.objects.filter(user=user), 'deleted_at', tombstones_position, limit)
+    tasks_position, tasks_more = _next_position(tasks, 'updated_at', tasks_position, limit, floor)
+    tombstones_position, tombstones_more = _next_position(tombstones, 'deleted_at', tombstones_position, limit, floor)
+
+    return {
+        'changed': tasks[:limit],
+        'deleted': tombstones[:limit],
+        'cursor': encode_sync_cursor(tasks_position, tombstones_position),
+        'has_more': tasks_more or tombstones_more,
+    }
+
+
+def prune_tombstones(now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
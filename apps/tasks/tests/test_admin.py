@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.tasks.cache import get_task_list_version
+from apps.tasks.models import Task
+from config.paginator import EstimatedCountPaginator, estimated_count
+
+User = get_user_model()
+
+
+class TaskAdminTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_superuser(email='admin@example.com', name='Admin', password='password123')
+        self.client.login(email='admin@example.com', password='password123')
+        self.user1 = User.objects.create_user(email='owner1@example.com', name='Owner One', password='password123')
+        self.user2 = User.objects.create_user(email='owner2@example.com', name='Owner Two', password='password123')
+        self.task1 = Task.objects.create(user=self.user1, title='Admin Task 1')
+        self.task2 = Task.objects.create(user=self.user2, title='Admin Task 2', completed=True)
+        self.url = reverse('admin:tasks_task_changelist')
+
+    def _changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        baseline = self._changelist_queries()
+        for i in range(10):
+            user = User.objects.create_user(email=f'extra{i}@example.com', name=f'Extra {i}', password='password123')
+            Task.objects.create(user=user, title=f'Extra Task {i}')
+        self.assertEqual(self._changelist_queries(), baseline)
+
+    def test_user_filter_accepts_id_or_email_without_listing_users(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'placeholder="ID ou e-mail"')
+        self.assertNotContains(response, f'?user__id__exact={self.user1.pk}')
+
+        response = self.client.get(self.url, {'user': self.user1.pk})
+        self.assertContains(response, 'Admin Task 1')
+        self.assertNotContains(response, 'Admin Task 2')
+        response = self.client.get(self.url, {'user': 'owner2@example.com'})
+        self.assertContains(response, 'Admin Task 2')
+        self.assertNotContains(response, 'Admin Task 1')
+
+    def test_mark_completed_and_pending_actions(self):
+        version = get_task_list_version(self.user1.pk)
+        updated_at = self.task2.updated_at
+        response = self.client.post(self.url, {
+            'action': 'mark_completed',
+            '_selected_action': [self.task1.pk, self.task2.pk],
+        }, follow=True)
+        self.assertContains(response, '1 tarefa(s) marcada(s) como concluída(s).')
+        self.task1.refresh_from_db()
+        self.task2.refresh_from_db()
+        self.assertTrue(self.task1.completed)
+        # Tarefas que já estavam no estado pedido não são tocadas.
+        self.assertEqual(self.task2.updated_at, updated_at)
+        self.assertNotEqual(get_task_list_version(self.user1.pk), version)
+
+        self.client.post(self.url, {'action': 'mark_pending', '_selected_action': [self.task1.pk, self.task2.pk]})
+        self.assertFalse(Task.objects.filter(completed=True).exists())
+
+    def test_estimated_count_falls_back_to_exact_count(self):
+        # Fora do PostgreSQL (ou com filtros) a contagem é exata.
+        self.assertEqual(estimated_count(Task.objects.all()), 2)
+        self.assertEqual(estimated_count(Task.objects.filter(completed=True)), 1)
+        self.assertEqual(EstimatedCountPaginator(Task.objects.all(), 1).num_pages, 2)
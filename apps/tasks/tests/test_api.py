@@ -0,0 +1,199 @@
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from apps.tasks.models import Task
+import json
+from datetime import date, timedelta
+
+User = get_user_model()
+
+
+class TaskAPITest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user1 = User.objects.create_user(email='api1@example.com', name='API User One', password='password123')
+        self.user2 = User.objects.create_user(email='api2@example.com', name='API User Two', password='password123')
+        self.client.login(email='api1@example.com', password='password123')
+        self.task1 = Task.objects.create(user=self.user1, title='API Task 1', completed=False)
+        self.task2 = Task.objects.create(user=self.user1, title='API Task 2', completed=True)
+        self.task_user2 = Task.objects.create(user=self.user2, title='API Task User 2')
+
+    def _send(self, method, url, payload):
+        return getattr(self.client, method)(url, json.dumps(payload), content_type='application/json')
+
+    def test_unauthenticated_returns_401_json(self):
+        self.client.logout()
+        response = self.client.get(reverse('tasks_api:task_list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+    def test_list_returns_only_own_tasks_with_filter(self):
+        data = self.client.get(reverse('tasks_api:task_list')).json()
+        self.assertEqual([task['id'] for task in data['results']], [self.task1.pk, self.task2.pk])
+        self.assertIsNone(data['next_cursor'])
+        data = self.client.get(reverse('tasks_api:task_list'), {'completed': 'true'}).json()
+        self.assertEqual([task['id'] for task in data['results']], [self.task2.pk])
+
+    def test_retrieve_other_user_task_returns_404(self):
+        response = self.client.get(reverse('tasks_api:task_detail', args=[self.task_user2.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_success_and_validation(self):
+        response = self._send('post', reverse('tasks_api:task_list'), {'title': 'Created via API', 'due_date': None})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(pk=response.json()['task']['id'], user=self.user1).exists())
+
+        response = self._send('post', reverse('tasks_api:task_list'), {'title': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+
+    def test_create_invalid_json_returns_400(self):
+        response = self.client.post(reverse('tasks_api:task_list'), 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_patch_updates_only_sent_fields(self):
+        # Prazo no passado não impede alterar outros campos, pois due_date não foi enviado.
+        Task.objects.filter(pk=self.task1.pk).update(due_date=date.today() - timedelta(days=3), description='keep')
+        response = self._send('patch', reverse('tasks_api:task_detail', args=[self.task1.pk]), {'completed': True})
+        self.assertEqual(response.status_code, 200)
+        self.task1.refresh_from_db()
+        self.assertTrue(self.task1.completed)
+        self.assertEqual(self.task1.description, 'keep')
+
+        response = self._send('patch', reverse('tasks_api:task_detail', args=[self.task1.pk]),
+                              {'due_date': str(date.today() - timedelta(days=1))})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('due_date', response.json()['errors'])
+
+    def test_patch_rejects_non_boolean_completed(self):
+        url = reverse('tasks_api:task_detail', args=[self.task1.pk])
+        for value in ('yes', 1, None):
+            with self.subTest(value=value):
+                response = self._send('patch', url, {'completed': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['errors'], {'completed': 'Must be true or false.'})
+        response = self._send('patch', url, {'title': 'Outro', 'completed': 'on'})
+        self.assertEqual(response.status_code, 400)
+        self.task1.refresh_from_db()
+        self.assertEqual((self.task1.title, self.task1.completed), ('API Task 1', False))
+
+    def test_delete(self):
+        response = self.client.delete(reverse('tasks_api:task_detail', args=[self.task1.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.filter(pk=self.task1.pk).exists())
+        response = self.client.delete(reverse('tasks_api:task_detail', args=[self.task_user2.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Task.objects.filter(pk=self.task_user2.pk).exists())
+
+
+class TaskBulkAPITest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user1 = User.objects.create_user(email='bulk1@example.com', name='Bulk User One', password='password123')
+        self.user2 = User.objects.create_user(email='bulk2@example.com', name='Bulk User Two', password='password123')
+        self.client.login(email='bulk1@example.com', password='password123')
+        self.tasks = [Task.objects.create(user=self.user1, title=f'Bulk {i}') for i in range(3)]
+        self.task_user2 = Task.objects.create(user=self.user2, title='Not yours')
+
+    def _bulk(self, payload):
+        return self.client.post(reverse('tasks_api:task_bulk'), json.dumps(payload), content_type='application/json')
+
+    def test_bulk_mixed_operations_with_per_item_results(self):
+        payload = {
+            'create': [{'title': f'New {i}'} for i in range(50)] + [{'title': ''}],
+            'update': [
+                {'id': self.tasks[0].pk, 'completed': True},
+                {'id': self.task_user2.pk, 'title': 'Hijack'},
+                {'id': self.tasks[1].pk, 'title': 'Renamed'},
+            ],
+            'delete': [self.tasks[2].pk, self.task_user2.pk, 'x'],
+        }
+        # savepoint, INSERT em lote, UPDATE ... RETURNING da alternância de `completed`, SELECT ... FOR UPDATE
+        # das demais atualizações, UPDATE em lote dos títulos, SELECT dos ids a excluir, savepoint, SELECT ... FOR UPDATE das linhas + INSERT dos tombstones,
+        # DELETE direto (sem o SELECT do collector), liberação dos savepoints,
+        # um UPDATE ... F() dos contadores do usuário por operação e a leitura dos contadores para o evento SSE
+        # (sessão e usuário vêm do cache)
+        with self.assertNumQueries(16):
+            response = self._bulk(payload)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual([r['success'] for r in data['create']], [True] * 50 + [False])
+        self.assertIn('title', data['create'][50]['errors'])
+        self.assertEqual(Task.objects.filter(user=self.user1, title__startswith='New ').count(), 50)
+
+        self.assertEqual([r['success'] for r in data['update']], [True, False, True])
+        self.assertEqual(data['update'][1]['errors'], {'id': 'Not Found'})
+        self.assertEqual(data['update'][1]['code'], 'not_found')
+        self.assertEqual(data['create'][50]['code'], 'invalid')
+        self.tasks[0].refresh_from_db()
+        self.tasks[1].refresh_from_db()
+        self.assertTrue(self.tasks[0].completed)
+        self.assertEqual(self.tasks[1].title, 'Renamed')
+
+        self.assertEqual([r['success'] for r in data['delete']], [True, False, False])
+        self.assertFalse(Task.objects.filter(pk=self.tasks[2].pk).exists())
+        self.task_user2.refresh_from_db()
+        self.assertEqual(self.task_user2.title, 'Not yours')
+        # Contadores após o lote: 50 criadas, uma excluída e uma das 52 restantes concluída.
+        self.assertEqual(data['counters']['total'], 52)
+        self.assertEqual(data['counters']['completed'], 1)
+
+    def test_queued_toggle_is_a_single_update_returning(self):
+        # O que a fila do tasks.js envia ao marcar uma tarefa: savepoint, UPDATE ... RETURNING, UPDATE dos
+        # contadores, liberação do savepoint e a leitura dos contadores (sessão e usuário vêm do cache).
+        payload = {'update': [{'id': self.tasks[0].pk, 'completed': True}]}
+        with self.assertNumQueries(5):
+            response = self._bulk(payload)
+        result = response.json()['update'][0]
+        self.assertTrue(result['success'])
+        self.assertTrue(result['task']['completed'])
+        self.assertEqual(response.json()['counters']['completed'], 1)
+
+        # Já concluída, ou de outro usuário: nada é gravado e a tarefa é lida para a resposta.
+        response = self._bulk({'update': [
+            {'id': self.tasks[0].pk, 'completed': True}, {'id': self.task_user2.pk, 'completed': True},
+        ]})
+        self.assertEqual([r['success'] for r in response.json()['update']], [True, False])
+        self.assertEqual(response.json()['counters']['completed'], 1)
+        self.task_user2.refresh_from_db()
+        self.assertFalse(self.task_user2.completed)
+
+    def test_bulk_update_writes_only_the_fields_of_each_item(self):
+        payload = {'update': [
+            {'id': self.tasks[0].pk, 'title': 'Só o título'},
+            {'id': self.tasks[1].pk, 'description': 'Descrição', 'completed': True},
+        ]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self._bulk(payload)
+        self.assertEqual([r['success'] for r in response.json()['update']], [True, True])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "tasks_task"')]
+        # Um UPDATE por conjunto de campos: o item que só mudou o título não regrava `completed`.
+        self.assertEqual(len(updates), 2)
+        title_update = next(sql for sql in updates if '"title"' in sql)
+        self.assertNotIn('"completed"', title_update)
+        self.assertNotIn('"description"', title_update)
+
+    def test_bulk_delete_rejects_non_integer_ids(self):
+        task = self.tasks[0]
+        response = self._bulk({'delete': [[task.pk], {'id': task.pk}, True, task.pk, task.pk]})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['delete']
+        self.assertEqual([r['success'] for r in results], [False, False, False, True, False])
+        for result in results[:3]:
+            self.assertEqual(result['errors'], {'id': 'A numeric id is required.'})
+        self.assertEqual(results[4]['errors'], {'id': 'Not Found'})
+        self.assertEqual([r.get('code') for r in results], ['invalid_id', 'invalid_id', 'invalid_id', None, 'not_found'])
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    @override_settings(TASK_API_BULK_MAX_ITEMS=2)
+    def test_bulk_rejects_too_many_items(self):
+        response = self._bulk({'create': [{'title': 'a'}, {'title': 'b'}], 'delete': [self.tasks[0].pk]})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(Task.objects.filter(user=self.user1).count(), 3)
+
+    def test_bulk_rejects_non_list_operation(self):
+        response = self._bulk({'create': {'title': 'a'}})
+        self.assertEqual(response.status_code, 400)
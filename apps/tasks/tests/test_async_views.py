@@ -0,0 +1,124 @@
+import importlib
+from datetime import date, timedelta
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+from apps.tasks.models import Task
+
+User = get_user_model()
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def reload_urlconf():
+    # As views são escolhidas pelo urls.py na importação, conforme TASK_ASYNC_VIEWS.
+    import apps.tasks.urls
+    import config.urls
+
+    importlib.reload(apps.tasks.urls)
+    importlib.reload(config.urls)
+    clear_url_caches()
+
+
+class AsyncTaskViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Limpezas rodam na ordem inversa: a URLconf é recarregada depois de desfazer a configuração.
+        cls.addClassCleanup(reload_urlconf)
+        cls.enterClassContext(override_settings(TASK_ASYNC_VIEWS=True))
+        reload_urlconf()
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='async@example.com', name='Async User', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        self.async_client.force_login(self.user)
+
+    def test_task_urls_resolve_to_async_views(self):
+        for name in ('task_list', 'task_create'):
+            with self.subTest(name=name):
+                self.assertTrue(iscoroutinefunction(resolve(reverse(f'tasks:{name}')).func))
+
+    async def test_list_page_partial_and_conditional_get(self):
+        await Task.objects.acreate(user=self.user, title='Minha tarefa', due_date=date.today() - timedelta(days=1))
+        await Task.objects.acreate(user=self.other, title='Tarefa de outro')
+        url = reverse('tasks:task_list')
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Minha tarefa')
+        self.assertNotContains(response, 'Tarefa de outro')
+        self.assertContains(response, '<span data-counter="overdue">1</span> atrasada(s)')
+
+        revalidated = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+        # Com a cópia local no navegador a página vem sem a lista, com outro ETag.
+        self.async_client.cookies['tasks_local_cache'] = str(self.user.pk)
+        local = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(local.status_code, 200)
+        self.assertTrue(local.context['local_list'])
+        self.assertNotContains(local, 'Minha tarefa')
+        self.assertContains(local, '<span data-counter="overdue">1</span> atrasada(s)')
+        del self.async_client.cookies['tasks_local_cache']
+
+        partial = await self.async_client.get(url, {'completed': 'true'}, headers=AJAX)
+        self.assertNotContains(partial, 'Minha tarefa')
+        self.assertEqual((await self.async_client.get(url, {'cursor': 'x'}, headers=AJAX)).status_code, 400)
+
+    async def test_create_update_and_delete(self):
+        response = await self.async_client.post(reverse('tasks:task_create'), {'title': 'Assíncrona'}, headers=AJAX)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['counters'], {'total': 1, 'pending': 1, 'completed': 0, 'overdue': 0})
+        pk = response.json()['task']['id']
+
+        response = await self.async_client.post(
+            reverse('tasks:task_update', args=[pk]), {'title': 'Editada', 'completed': 'on'}, headers=AJAX,
+        )
+        self.assertEqual(response.json()['task']['title'], 'Editada')
+        self.assertEqual(response.json()['counters']['completed'], 1)
+        self.assertTrue((await Task.objects.aget(pk=pk)).completed)
+
+        response = await self.async_client.patch(
+            reverse('tasks:task_patch', args=[pk]), '{"completed": false}', content_type='application/json', headers=AJAX,
+        )
+        self.assertFalse(response.json()['task']['completed'])
+        self.assertEqual(response.json()['counters']['completed'], 0)
+        response = await self.async_client.patch(
+            reverse('tasks:task_patch', args=[pk]), '{"description": "Parcial"}', content_type='application/json',
+            headers=AJAX,
+        )
+        self.assertEqual((response.json()['task']['title'], response.json()['task']['description']), ('Editada', 'Parcial'))
+
+        response = await self.async_client.post(reverse('tasks:task_delete', args=[pk]), headers=AJAX)
+        self.assertEqual(response.json()['counters']['total'], 0)
+        self.assertFalse(await Task.objects.filter(pk=pk).aexists())
+
+    async def test_invalid_data_and_other_users_tasks(self):
+        response = await self.async_client.post(reverse('tasks:task_create'), {'title': ''}, headers=AJAX)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['title'], 'Este campo é obrigatório.')
+
+        # Sem AJAX, a página é renderizada de novo com o formulário inválido.
+        response = await self.async_client.post(reverse('tasks:task_create'), {'title': ''})
+        self.assertContains(response, 'aria-invalid="true"')
+
+        task = await Task.objects.acreate(user=self.other, title='De outro usuário')
+        for name in ('task_update', 'task_delete'):
+            with self.subTest(name=name):
+                response = await self.async_client.post(reverse(f'tasks:{name}', args=[task.pk]), {'title': 'X'})
+                self.assertEqual(response.status_code, 404)
+        response = await self.async_client.patch(
+            reverse('tasks:task_patch', args=[task.pk]), '{"completed": true}', content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual((await Task.objects.aget(pk=task.pk)).title, 'De outro usuário')
+
+    async def test_anonymous_user_is_redirected_to_login(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith('/users/login/?next='))
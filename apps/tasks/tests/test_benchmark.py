@@ -0,0 +1,89 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from apps.tasks.benchmark import percentile
+from apps.tasks.models import Task
+
+User = get_user_model()
+
+
+class SeedTasksCommandTest(TestCase):
+    def test_seeds_users_and_tasks_with_requested_distribution(self):
+        out = StringIO()
+        call_command(
+            'seed_tasks', users=4, tasks_per_user=50, distribution='uniform', completed_ratio=1,
+            no_due_date_ratio=0, description_words=0, seed=7, stdout=out,
+        )
+        self.assertIn('4 usuário(s) e 200 tarefa(s)', out.getvalue())
+        self.assertEqual(User.objects.filter(email__endswith='@seed.example.com').count(), 4)
+        self.assertEqual(Task.objects.count(), 200)
+        self.assertFalse(Task.objects.filter(completed=False).exists())
+        self.assertFalse(Task.objects.filter(due_date__isnull=True).exists())
+        self.assertFalse(Task.objects.exclude(description='').exists())
+        user = User.objects.filter(email__endswith='@seed.example.com').first()
+        self.assertTrue(user.check_password('password123'))
+
+    def test_rejects_invalid_ratio(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_tasks', users=1, completed_ratio=2, stdout=StringIO())
+
+
+class BenchmarkTasksCommandTest(TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertIsNone(percentile([], 50))
+
+    def test_reports_every_endpoint_and_leaves_no_tasks_behind(self):
+        call_command('seed_tasks', users=2, tasks_per_user=10, distribution='uniform', seed=1, stdout=StringIO())
+        before = Task.objects.count()
+        out = StringIO()
+        call_command('benchmark_tasks', requests=3, warmup=1, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(
+            set(report['endpoints']),
+            {'list_all', 'list_pending', 'list_completed', 'list_partial', 'create', 'update', 'delete'},
+        )
+        for name, metrics in report['endpoints'].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(metrics['requests'], 3)
+                self.assertEqual(metrics['errors'], 0)
+                self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+                if name == 'list_partial':
+                    # Fragmento, sessão e usuário vêm do cache.
+                    self.assertEqual(metrics['queries_mean'], 0)
+                else:
+                    self.assertGreater(metrics['queries_mean'], 0)
+        self.assertEqual(report['meta']['user_tasks'], 10)
+        self.assertEqual(Task.objects.count(), before)
+
+    def test_list_render_compares_both_paths(self):
+        call_command('seed_tasks', users=1, tasks_per_user=20, seed=2, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_tasks', list_render=True, rows=15, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['meta']['rows'], 15)
+        self.assertEqual(set(report['paths']), {'orm', 'fast'})
+        for metrics in report['paths'].values():
+            self.assertEqual(set(metrics), {
+                'cpu_ms_per_10k', 'wall_ms_per_10k', 'rows_peak_kb_per_10k', 'peak_kb_per_10k', 'html_kb_per_10k',
+            })
+            self.assertGreater(metrics['peak_kb_per_10k'], 0)
+        self.assertEqual(set(report['fast_vs_orm']), set(report['paths']['orm']))
+
+    def test_concurrency_requires_an_http_server(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_tasks', concurrency=4, stdout=StringIO())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cold_over_http_requires_a_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, 'REDIS_URL'):
+            call_command('benchmark_tasks', cold=True, base_url='http://127.0.0.1:8000', stdout=StringIO())
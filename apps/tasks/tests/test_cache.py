@@ -0,0 +1,122 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from apps.tasks.models import Task
+from apps.tasks.cache import fragment_stats, get_task_list_version
+from io import StringIO
+import json
+
+User = get_user_model()
+
+
+class TaskListFragmentCacheTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(email='cache@example.com', name='Cache User', password='password123')
+        self.client.login(email='cache@example.com', password='password123')
+        self.task = Task.objects.create(user=self.user, title='Cached Task')
+
+    def _list(self, **params):
+        return self.client.get(reverse('tasks:task_list'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_repeated_partial_is_served_from_cache_without_task_queries(self):
+        first = self._list()
+        with self.assertNumQueries(0):  # sessão e usuário vêm do cache
+            second = self._list()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(fragment_stats()['hits'], 1)
+        self.assertEqual(fragment_stats()['misses'], 1)
+
+    def test_filters_are_cached_separately(self):
+        self._list(completed='true')
+        response = self._list(completed='false')
+        self.assertContains(response, 'Cached Task')
+        self.assertEqual(fragment_stats()['misses'], 2)
+
+    def test_create_update_delete_views_invalidate_cache(self):
+        self._list()
+        self.client.post(reverse('tasks:task_create'), {'title': 'Brand New'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(self._list(), 'Brand New')
+
+        self.client.post(reverse('tasks:task_update', args=[self.task.pk]), {'title': 'Renamed Task'},
+                         HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(self._list(), 'Renamed Task')
+
+        self.client.post(reverse('tasks:task_delete', args=[self.task.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertNotContains(self._list(), 'Renamed Task')
+        self.assertEqual(fragment_stats()['hits'], 0)
+
+    def test_model_save_outside_views_invalidates_cache(self):
+        # Edições pelo admin passam por Model.save() e disparam o mesmo sinal.
+        version = get_task_list_version(self.user.pk)
+        self._list()
+        self.task.title = 'Edited In Admin'
+        self.task.save()
+        self.assertNotEqual(get_task_list_version(self.user.pk), version)
+        self.assertContains(self._list(), 'Edited In Admin')
+
+    def test_bulk_api_invalidates_cache(self):
+        self._list()
+        self.client.post(reverse('tasks_api:task_bulk'), json.dumps({'create': [{'title': 'From Bulk'}]}),
+                         content_type='application/json')
+        self.assertContains(self._list(), 'From Bulk')
+
+    def test_other_users_changes_do_not_invalidate(self):
+        other = User.objects.create_user(email='cache2@example.com', name='Other', password='password123')
+        self._list()
+        Task.objects.create(user=other, title='Other Task')
+        self._list()
+        self.assertEqual(fragment_stats()['hits'], 1)
+
+    def test_stats_command_outputs_json(self):
+        self._list()
+        self._list()
+        out = StringIO()
+        call_command('task_cache_stats', '--reset', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertEqual(fragment_stats()['hits'], 0)
+
+
+class TaskListConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(email='etag@example.com', name='ETag User', password='password123')
+        self.client.login(email='etag@example.com', password='password123')
+        self.task = Task.objects.create(user=self.user, title='Polled Task')
+
+    def test_partial_sends_validators_and_answers_304_without_task_queries(self):
+        response = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(0):  # sessão e usuário vêm do cache
+            revalidated = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+                                          HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+
+    def test_change_invalidates_etag(self):
+        response = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        Task.objects.create(user=self.user, title='Another Task')
+        revalidated = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+                                      HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertContains(revalidated, 'Another Task')
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_page_partial_and_filters_have_distinct_etags(self):
+        page = self.client.get(reverse('tasks:task_list'))
+        partial = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        filtered = self.client.get(reverse('tasks:task_list'), {'completed': 'true'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(len({page['ETag'], partial['ETag'], filtered['ETag']}), 3)
+        response = self.client.get(reverse('tasks:task_list'), HTTP_IF_NONE_MATCH=partial['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_list_conditional_get(self):
+        response = self.client.get(reverse('tasks_api:task_list'))
+        revalidated = self.client.get(reverse('tasks_api:task_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertIn('updated_at', response.json()['results'][0])
@@ -0,0 +1,167 @@
+import json
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from apps.tasks.models import Task, TaskCounters, TaskTombstone
+
+User = get_user_model()
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+class TaskCountersTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='counters@example.com', name='Counters User', password='password123')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.today = date.today()
+
+    def counters(self, user=None):
+        counters = TaskCounters.objects.for_user((user or self.user).pk)
+        return counters.total, counters.pending, counters.completed, counters.overdue
+
+    def assertCountersMatchTasks(self, user=None):
+        # Compara os contadores mantidos com F() com a contagem direta das tarefas.
+        user = user or self.user
+        tasks = Task.objects.filter(user=user)
+        expected = (
+            tasks.count(),
+            tasks.filter(completed=False).count(),
+            tasks.filter(completed=True).count(),
+            tasks.filter(completed=False, due_date__lt=self.today).count(),
+        )
+        self.assertEqual(self.counters(user), expected)
+
+    def test_new_user_starts_with_zeroed_counters(self):
+        self.assertEqual(self.counters(), (0, 0, 0, 0))
+
+    def test_views_keep_counters_and_return_them(self):
+        response = self.client.post(reverse('tasks:task_create'), {'title': 'Nova'}, headers=AJAX)
+        self.assertEqual(response.json()['counters'], {'total': 1, 'pending': 1, 'completed': 0, 'overdue': 0})
+        pk = response.json()['task']['id']
+
+        response = self.client.post(
+            reverse('tasks:task_update', args=[pk]), {'title': 'Nova', 'completed': 'on'}, headers=AJAX,
+        )
+        self.assertEqual(response.json()['counters'], {'total': 1, 'pending': 0, 'completed': 1, 'overdue': 0})
+
+        response = self.client.post(reverse('tasks:task_delete', args=[pk]), headers=AJAX)
+        self.assertEqual(response.json()['counters'], {'total': 0, 'pending': 0, 'completed': 0, 'overdue': 0})
+
+    def test_overdue_follows_completion_and_due_date_changes(self):
+        task = Task.objects.create(user=self.user, title='Atrasada', due_date=self.today - timedelta(days=2))
+        self.assertEqual(self.counters(), (1, 1, 0, 1))
+        task.completed = True
+        task.save()
+        self.assertEqual(self.counters(), (1, 0, 1, 0))
+        task.completed = False
+        task.due_date = self.today + timedelta(days=1)
+        task.save(update_fields=['completed', 'due_date', 'updated_at'])
+        self.assertEqual(self.counters(), (1, 1, 0, 0))
+        # Campo contado fora de update_fields não altera os contadores (nem o banco).
+        task.completed = True
+        task.save(update_fields=['title', 'updated_at'])
+        self.assertCountersMatchTasks()
+
+    def test_bulk_paths_keep_counters_consistent(self):
+        past = self.today - timedelta(days=3)
+        Task.objects.bulk_create([
+            Task(user=self.user, title=f'Lote {i}', due_date=past if i % 2 else None, completed=i % 3 == 0)
+            for i in range(12)
+        ])
+        self.assertCountersMatchTasks()
+
+        Task.objects.filter(user=self.user, title__in=['Lote 1', 'Lote 2', 'Lote 3']).set_completed(True)
+        self.assertCountersMatchTasks()
+        Task.objects.filter(user=self.user).update(due_date=past)
+        self.assertCountersMatchTasks()
+
+        tasks = list(Task.objects.filter(user=self.user, completed=True))
+        for task in tasks:
+            task.completed = False
+        Task.objects.bulk_update(tasks, ['completed', 'updated_at'])
+        self.assertCountersMatchTasks()
+
+        Task.objects.filter(user=self.user, title__in=['Lote 4', 'Lote 5']).delete()
+        self.assertCountersMatchTasks()
+
+        other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        Task.objects.filter(user=self.user, title='Lote 6').update(user=other)
+        self.assertCountersMatchTasks()
+        self.assertCountersMatchTasks(other)
+
+    def test_stale_instances_do_not_count_twice(self):
+        # Duas requisições carregam a mesma tarefa pendente e a salvam concluída, uma depois da outra.
+        task = Task.objects.create(user=self.user, title='Disputada', due_date=self.today - timedelta(days=1))
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.completed = second.completed = True
+        first.save()
+        second.save()
+        self.assertEqual(self.counters(), (1, 0, 1, 0))
+
+        first.delete()
+        tombstones = TaskTombstone.objects.filter(task_id=task.pk)
+        self.assertEqual(tombstones.count(), 1)
+        # A segunda exclusão não apaga nenhuma linha: nem desconta de novo nem registra outra exclusão.
+        second.delete()
+        self.assertEqual(self.counters(), (0, 0, 0, 0))
+        self.assertEqual(tombstones.count(), 1)
+
+    def test_api_bulk_keeps_counters_consistent(self):
+        first = Task.objects.create(user=self.user, title='Primeira')
+        second = Task.objects.create(user=self.user, title='Segunda', completed=True)
+        payload = {
+            'create': [{'title': f'Nova {i}'} for i in range(3)],
+            'update': [{'id': first.id, 'completed': True}],
+            'delete': [second.id],
+        }
+        self.client.post(reverse('tasks_api:task_bulk'), json.dumps(payload), content_type='application/json')
+        self.assertEqual(self.counters(), (4, 3, 1, 0))
+
+    def test_overdue_is_swept_lazily_when_the_date_advances(self):
+        Task.objects.create(user=self.user, title='Hoje', due_date=self.today)
+        Task.objects.create(user=self.user, title='Amanhã', due_date=self.today + timedelta(days=1))
+        self.assertEqual(self.counters(), (2, 2, 0, 0))
+
+        later = self.today + timedelta(days=2)
+        with mock.patch('apps.tasks.models.timezone.localdate', return_value=later):
+            # Antes da leitura do novo dia, uma criação ainda é comparada com a data-marca antiga.
+            Task.objects.create(user=self.user, title='Ontem', due_date=later - timedelta(days=1))
+            with self.assertNumQueries(6):  # leitura, savepoint, SELECT FOR UPDATE, COUNT do intervalo, UPDATE, release
+                counters = TaskCounters.objects.for_user(self.user.pk)
+            self.assertEqual((counters.overdue, counters.overdue_as_of), (3, later))
+            with self.assertNumQueries(1):
+                TaskCounters.objects.for_user(self.user.pk)
+
+    def test_missing_counters_row_is_rebuilt_on_read(self):
+        user = User.objects.bulk_create([User(email='bulk@example.com', name='Bulk User')])[0]
+        Task.objects.create(user=user, title='Sem contadores', due_date=self.today - timedelta(days=1))
+        self.assertFalse(TaskCounters.objects.filter(user=user).exists())
+        self.assertEqual(self.counters(user), (1, 1, 0, 1))
+
+    def test_rebuild_command_repairs_drift(self):
+        Task.objects.create(user=self.user, title='Uma')
+        Task.objects.create(user=self.user, title='Outra', completed=True)
+        TaskCounters.objects.filter(user=self.user).update(total=99, completed=-5)
+        out = StringIO()
+        call_command('rebuild_task_counters', stdout=out)
+        self.assertIn('1 contador(es) corrigido(s)', out.getvalue())
+        self.assertCountersMatchTasks()
+
+        out = StringIO()
+        call_command('rebuild_task_counters', user=['counters@example.com'], stdout=out)
+        self.assertIn('1 usuário(s) verificado(s), 0 contador(es) corrigido(s)', out.getvalue())
+
+    def test_task_list_page_shows_counters(self):
+        Task.objects.create(user=self.user, title='Pendente', due_date=self.today - timedelta(days=1))
+        Task.objects.create(user=self.user, title='Feita', completed=True)
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertContains(response, '<span data-counter="overdue">1</span> atrasada(s)')
+        self.assertContains(response, '<span class="filter-count" data-counter="total">2</span>')
+        self.assertContains(response, '<span class="filter-count" data-counter="completed">1</span>')
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.tasks import events
+from apps.tasks.events import LocalBroker, format_sse, sse_stream
+from .test_async_views import reload_urlconf
+
+User = get_user_model()
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def parse_sse(chunk):
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+class TaskEventsStreamTest(TransactionTestCase):
+    # Os eventos são publicados no commit: aqui as views fazem commits reais.
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(reload_urlconf)
+        cls.enterClassContext(override_settings(TASK_ASYNC_VIEWS=True))
+        reload_urlconf()
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='events@example.com', name='Events User', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        self.async_client.force_login(self.user)
+        # Um broker novo por teste: assinantes de outros testes (e loops já encerrados) não interferem.
+        events.get_broker.cache_clear()
+        self.addCleanup(events.get_broker.cache_clear)
+
+    async def test_stream_delivers_the_users_task_changes(self):
+        response = await self.async_client.get(reverse('tasks:task_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        # A tarefa de outro usuário não é enviada a este stream.
+        other_client = self.async_client_class()
+        await other_client.aforce_login(self.other)
+        await other_client.post(reverse('tasks:task_create'), {'title': 'De outro'}, headers=AJAX)
+
+        response = await self.async_client.post(reverse('tasks:task_create'), {'title': 'Ao vivo'}, headers=AJAX)
+        pk = response.json()['task']['id']
+        event, data = parse_sse(await asyncio.wait_for(anext(stream), 5))
+        self.assertEqual(event, 'created')
+        self.assertEqual(data['task']['title'], 'Ao vivo')
+        self.assertEqual(data['counters']['total'], 1)
+
+        await self.async_client.post(reverse('tasks:task_delete', args=[pk]), headers=AJAX)
+        event, data = parse_sse(await asyncio.wait_for(anext(stream), 5))
+        self.assertEqual((event, data['id'], data['counters']['total']), ('deleted', pk, 0))
+        await stream.aclose()
+
+    async def test_anonymous_user_is_redirected_to_login(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('tasks:task_events'))
+        self.assertEqual(response.status_code, 302)
+
+
+class TaskEventsPublishTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='publish@example.com', name='Publish User', password='password123')
+        self.client.force_login(self.user)
+
+    def test_views_and_api_publish_after_commit(self):
+        with mock.patch.object(LocalBroker, 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('tasks:task_create'), {'title': 'Publicada'}, headers=AJAX)
+            pk = response.json()['task']['id']
+            self.client.post(reverse('tasks:task_update', args=[pk]), {'title': 'Editada'}, headers=AJAX)
+            self.client.delete(reverse('tasks_api:task_detail', args=[pk]))
+            self.client.post(
+                reverse('tasks_api:task_bulk'), json.dumps({'create': [{'title': 'Lote'}]}),
+                content_type='application/json',
+            )
+        calls = [(user_id, event['type']) for (user_id, event), _ in publish.call_args_list]
+        self.assertEqual(calls, [(self.user.pk, t) for t in ('created', 'updated', 'deleted', 'batch')])
+        updated = publish.call_args_list[1].args[1]
+        self.assertEqual(updated['task']['title'], 'Editada')
+        batch = publish.call_args_list[3].args[1]
+        self.assertEqual(batch['counters']['total'], 1)
+        self.assertEqual([item['task']['title'] for item in batch['changed']], ['Lote'])
+        self.assertIn('Lote', batch['changed'][0]['row'])
+        self.assertEqual(batch['deleted'], [])
+
+    def test_large_bulk_publishes_a_resync(self):
+        with mock.patch.object(LocalBroker, 'publish') as publish, self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('apps.tasks.api.BATCH_EVENT_MAX_ITEMS', 1):
+            self.client.post(
+                reverse('tasks_api:task_bulk'), json.dumps({'create': [{'title': 'A'}, {'title': 'B'}]}),
+                content_type='application/json',
+            )
+        event = publish.call_args.args[1]
+        self.assertEqual(event['type'], 'resync')
+        self.assertEqual(event['counters']['total'], 2)
+
+    def test_task_page_links_the_stream_only_under_asgi(self):
+        self.assertNotContains(self.client.get(reverse('tasks:task_list')), 'data-events-url')
+
+
+class LocalBrokerTest(TestCase):
+    async def test_slow_subscriber_gets_a_resync(self):
+        broker = LocalBroker()
+        stream = sse_stream(1, broker)
+        await anext(stream)
+        subscription = next(iter(broker.subscriptions[1]))
+        for i in range(events.QUEUE_SIZE + 1):
+            broker.publish(1, {'type': 'deleted', 'id': i})
+        broker.publish(2, {'type': 'deleted', 'id': 0})
+        await asyncio.sleep(0)  # As entregas são agendadas no loop com call_soon_threadsafe.
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(await anext(stream), format_sse({'type': 'resync'}))
+        await stream.aclose()
+        self.assertEqual(broker.subscriptions, {})
@@ -0,0 +1,104 @@
+import csv
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from apps.tasks.models import Task
+from apps.tasks.transfer import ics_fold
+from apps.tasks.views import CALENDAR_FEED_SALT, calendar_feed_user
+
+User = get_user_model()
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class TaskExportViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='export@example.com', name='Export User', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.due = date.today() + timedelta(days=3)
+        self.task = Task.objects.create(user=self.user, title='Reunião, sala 2', description='Pauta; itens', due_date=self.due)
+        Task.objects.create(user=self.user, title='Sem prazo', completed=True)
+        Task.objects.create(user=self.other, title='De outro usuário', due_date=self.due)
+        self.csv_url = reverse('tasks:task_export_csv')
+        self.ics_url = reverse('tasks:task_calendar')
+
+    def test_csv_streams_only_the_users_tasks(self):
+        response = self.client.get(self.csv_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(content(response))))
+        self.assertEqual([row['title'] for row in rows], ['Reunião, sala 2', 'Sem prazo'])
+        self.assertEqual(rows[0]['due_date'], self.due.isoformat())
+        self.assertEqual(rows[1]['completed'], 'true')
+
+        response = self.client.get(self.csv_url, {'completed': 'true'})
+        self.assertEqual([row['title'] for row in csv.DictReader(StringIO(content(response)))], ['Sem prazo'])
+
+    def test_calendar_has_one_event_per_due_date(self):
+        response = self.client.get(self.ics_url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = content(response)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn(f'UID:task-{self.task.pk}@testserver', body)
+        self.assertIn(f'DTSTART;VALUE=DATE:{self.due:%Y%m%d}', body)
+        self.assertIn('SUMMARY:Reunião\\, sala 2', body)
+        self.assertIn('DESCRIPTION:Pauta\\; itens', body)
+
+    def test_conditional_get_returns_304_until_tasks_change(self):
+        for url in (self.csv_url, self.ics_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response['ETag']
+                with self.assertNumQueries(0):  # Sessão e usuário vêm do cache.
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+                Task.objects.create(user=self.user, title='Nova', due_date=self.due)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_calendar_feed_token_authenticates_without_session(self):
+        feed_url = self.client.get(reverse('tasks:task_list')).context['calendar_feed_url']
+        self.assertTrue(feed_url.startswith('http://testserver/tasks/calendar.ics?token='))
+
+        anonymous = Client()
+        response = anonymous.get(feed_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Reunião', content(response))
+        with self.assertNumQueries(0):  # O dono do token vem do cache de autenticação.
+            self.assertEqual(anonymous.get(feed_url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        self.assertEqual(anonymous.get(self.ics_url, {'token': 'forjado'}).status_code, 403)
+        self.assertEqual(anonymous.get(self.ics_url).status_code, 302)
+
+    def test_password_change_revokes_feed_token(self):
+        token = self.client.get(reverse('tasks:task_list')).context['calendar_feed_url'].split('token=')[1]
+        self.assertEqual(calendar_feed_user(token), self.user)
+        self.user.set_password('outrasenha123')
+        self.user.save()
+        self.assertIsNone(calendar_feed_user(token))
+
+    def test_feed_token_does_not_carry_the_session_auth_hash(self):
+        token = self.client.get(reverse('tasks:task_list')).context['calendar_feed_url'].split('token=')[1]
+        _, key = signing.loads(token, salt=CALENDAR_FEED_SALT)
+        self.assertNotIn(key, self.user.get_session_auth_hash())
+
+    def test_long_lines_are_folded_at_75_octets(self):
+        folded = ics_fold('SUMMARY:' + 'ç' * 100)
+        lines = folded.split('\r\n')[:-1]
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertEqual(''.join(line[1:] if i else line for i, line in enumerate(lines)), 'SUMMARY:' + 'ç' * 100)
@@ -1,6 +1,9 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
 from apps.tasks.models import Task
+from apps.tasks.views import TaskListView
 from datetime import date, timedelta
 
 User = get_user_model()
@@ -56,3 +59,42 @@ class TaskModelTest(TestCase):
         self.assertEqual(tasks[2], task5)
         self.assertEqual(tasks[3], task2)
         self.assertEqual(tasks[4], task4)
+
+
+class TaskListIndexTest(TestCase):
+    """Garante que a consulta da TaskListView é servida pelo índice composto, sem ordenação em memória."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='index@example.com', name='Index User', password='password123')
+        other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        today = date.today()
+        Task.objects.bulk_create(
+            [Task(user=self.user, title=f'Task {i}', completed=i % 3 == 0,
+                  due_date=today + timedelta(days=i % 10) if i % 4 else None) for i in range(60)]
+            + [Task(user=other, title=f'Other {i}') for i in range(20)]
+        )
+
+    def _explain(self, completed_filter=None):
+        params = {'completed': completed_filter} if completed_filter else {}
+        request = RequestFactory().get(reverse('tasks:task_list'), params)
+        request.user = self.user
+        view = TaskListView()
+        view.setup(request)
+        queryset = view.get_queryset()
+        if connection.vendor == 'postgresql':
+            # Em tabelas pequenas o Postgres prefere seq scan; desligamos para inspecionar o plano com índice.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertNoFilesort(self, plan):
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn('Sort', plan)
+        self.assertIn('task_user_keyset_idx', plan)
+
+    def test_list_query_uses_index_without_filesort(self):
+        for completed_filter in (None, 'true', 'false'):
+            with self.subTest(completed=completed_filter):
+                self.assertNoFilesort(self._explain(completed_filter))
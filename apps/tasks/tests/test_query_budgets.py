@@ -0,0 +1,90 @@
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from apps.tasks import api_urls, urls
+from apps.tasks.models import Task
+from config.query_budget import assert_query_budget
+
+User = get_user_model()
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+SEEDED_TASKS = 500
+
+# Máximo de consultas SQL por requisição, com SEEDED_TASKS tarefas do usuário e o cache frio (pior caso).
+# Colunas: rótulo, nome da URL, método, dados (str = corpo JSON), cabeçalhos, orçamento.
+# URLs com `pk` recebem uma tarefa nova a cada medição.
+QUERY_BUDGETS = [
+    ('task_list', 'tasks:task_list', 'get', {}, {}, 4),
+    ('task_list pendentes', 'tasks:task_list', 'get', {'completed': 'false'}, {}, 4),
+    ('task_list concluídas', 'tasks:task_list', 'get', {'completed': 'true'}, {}, 4),
+    ('task_list partial', 'tasks:task_list', 'get', {}, AJAX, 3),
+    ('task_list busca', 'tasks:task_list', 'get', {'q': 'tarefa'}, AJAX, 3),
+    ('task_create', 'tasks:task_create', 'post', {'title': 'Nova tarefa'}, AJAX, 5),
+    ('task_update', 'tasks:task_update', 'post', {'title': 'Editada', 'completed': 'on'}, AJAX, 7),
+    ('task_patch', 'tasks:task_patch', 'patch', json.dumps({'completed': True}), AJAX, 5),
+    ('task_delete', 'tasks:task_delete', 'post', {}, AJAX, 9),
+    ('task_bulk_action concluir', 'tasks:task_bulk_action', 'post', {'action': 'complete'}, AJAX, 6),
+    ('task_bulk_action limpar', 'tasks:task_bulk_action', 'post', {'action': 'clear_completed'}, AJAX, 13),
+    ('task_export_csv', 'tasks:task_export_csv', 'get', {}, {}, 3),
+    ('task_calendar', 'tasks:task_calendar', 'get', {}, {}, 3),
+    ('api task_list', 'tasks_api:task_list', 'get', {}, {}, 3),
+    ('api task_list busca', 'tasks_api:task_list', 'get', {'q': 'tarefa'}, {}, 3),
+    ('api task_create', 'tasks_api:task_list', 'post', json.dumps({'title': 'Nova tarefa'}), {}, 5),
+    ('api task_detail', 'tasks_api:task_detail', 'get', {}, {}, 3),
+    ('api task_patch', 'tasks_api:task_detail', 'patch', json.dumps({'completed': True}), {}, 5),
+    ('api task_delete', 'tasks_api:task_detail', 'delete', {}, {}, 9),
+    ('api task_bulk', 'tasks_api:task_bulk', 'post', json.dumps({
+        'create': [{'title': f'Lote {i}'} for i in range(50)],
+        'update': [],
+        'delete': [],
+    }), {}, 7),
+    ('api task_sync', 'tasks_api:task_sync', 'get', {}, {}, 5),
+]
+
+
+class TaskQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', name='Budget User', password='password123')
+        today = date.today()
+        Task.objects.bulk_create(
+            Task(
+                user=cls.user,
+                title=f'Tarefa {i}',
+                description='Descrição da tarefa ' * 5,
+                due_date=today + timedelta(days=i % 30) if i % 3 else None,
+                completed=i % 4 == 0,
+            )
+            for i in range(SEEDED_TASKS)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_every_task_url_has_a_budget(self):
+        names = {f'{module.app_name}:{pattern.name}' for module in (urls, api_urls) for pattern in module.urlpatterns}
+        self.assertEqual(names - {entry[1] for entry in QUERY_BUDGETS}, set())
+
+    def test_views_stay_within_query_budget(self):
+        for label, url_name, method, data, headers, budget in QUERY_BUDGETS:
+            with self.subTest(label):
+                kwargs = {}
+                if url_name in ('tasks:task_update', 'tasks:task_patch', 'tasks:task_delete', 'tasks_api:task_detail'):
+                    kwargs['pk'] = Task.objects.create(user=self.user, title='Alvo do orçamento').pk
+                # Cache frio: mede o caminho que consulta as tarefas.
+                cache.clear()
+                extra = {'content_type': 'application/json'} if isinstance(data, str) else {}
+                with assert_query_budget(budget, label):
+                    response = getattr(self.client, method)(
+                        reverse(url_name, kwargs=kwargs), data, headers=headers, **extra,
+                    )
+                    if response.streaming:
+                        # As exportações consultam o banco enquanto o corpo é gerado.
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 400, label)
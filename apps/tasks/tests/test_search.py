@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.tasks.models import Task
+from apps.tasks.search import search_tasks
+
+User = get_user_model()
+
+
+class TaskSearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='search@example.com', name='Search User', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        self.report = Task.objects.create(user=self.user, title='Relatório mensal', description='Enviar ao financeiro')
+        self.bread = Task.objects.create(user=self.user, title='Comprar pão', description='Padaria da esquina')
+        self.other = Task.objects.create(user=self.other_user, title='Relatório do outro usuário')
+
+    def _search(self, query, user=None):
+        return list(search_tasks(Task.objects.filter(user=user or self.user), query))
+
+    def test_matches_prefix_and_ignores_accents(self):
+        self.assertEqual(self._search('relat'), [self.report])
+        self.assertEqual(self._search('relatorio financeiro'), [self.report])
+        self.assertEqual(self._search('padaria'), [self.bread])
+        self.assertEqual(self._search('relatorio padaria'), [])
+
+    def test_ranks_more_relevant_tasks_first(self):
+        repeated = Task.objects.create(user=self.user, title='Relatório', description='relatório anual, relatório final')
+        results = self._search('relatorio')
+        self.assertEqual(results, [repeated, self.report])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_query_syntax_characters_are_safe(self):
+        self.assertEqual(self._search('"pão" (padaria* -'), [self.bread])
+        self.assertEqual(self._search('*** ()'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.bread.title = 'Comprar leite'
+        self.bread.save()
+        self.assertEqual(self._search('leite'), [self.bread])
+        self.assertEqual(self._search('pão'), [])
+        # Caminhos que não passam por save() também são indexados.
+        Task.objects.filter(pk=self.report.pk).update(description='Entregar à diretoria')
+        self.assertEqual(self._search('diretoria'), [self.report])
+        Task.objects.filter(pk=self.report.pk).delete()
+        self.assertEqual(self._search('diretoria'), [])
+
+    def test_search_uses_full_text_index(self):
+        plan = search_tasks(Task.objects.filter(user=self.user), 'relatorio').explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('VIRTUAL TABLE INDEX', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertIn('task_search_idx', plan)
+
+    def test_index_survives_the_later_migrations(self):
+        # Migrações que recriam tasks_task no SQLite (ALTER de colunas) descartam os triggers do FTS5:
+        # uma delas precisa recriá-los, como a 0008, ou este teste falha.
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+                names = {'tasks_task_fts_insert', 'tasks_task_fts_update', 'tasks_task_fts_delete'}
+            elif connection.vendor == 'postgresql':
+                cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'tasks_task'")
+                names = {'task_search_idx'}
+            else:
+                self.skipTest('Sem índice de busca neste banco.')
+            self.assertTrue(names.issubset(row[0] for row in cursor.fetchall()))
+
+
+class TaskSearchViewsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(email='views@example.com', name='Views User', password='password123')
+        self.client.login(email='views@example.com', password='password123')
+        self.tasks = [
+            Task.objects.create(user=self.user, title=f'Reunião {i}', description='reunião ' * i)
+            for i in range(1, 4)
+        ]
+        Task.objects.create(user=self.user, title='Academia', completed=True)
+
+    @override_settings(TASK_LIST_PAGE_SIZE=2)
+    def test_api_search_is_ranked_and_paginated(self):
+        url = reverse('tasks_api:task_list')
+        data = self.client.get(url, {'q': 'reuniao'}).json()
+        self.assertEqual([task['id'] for task in data['results']], [self.tasks[2].pk, self.tasks[1].pk])
+        self.assertIsNotNone(data['next_cursor'])
+        data = self.client.get(url, {'q': 'reuniao', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([task['id'] for task in data['results']], [self.tasks[0].pk])
+        self.assertIsNone(data['next_cursor'])
+        self.assertEqual(self.client.get(url, {'q': 'reuniao', 'cursor': 'x'}).status_code, 400)
+
+    def test_list_view_search_combines_with_filter(self):
+        response = self.client.get(reverse('tasks:task_list'), {'q': 'academia'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(response, 'Academia')
+        self.assertNotContains(response, 'Reunião')
+        response = self.client.get(
+            reverse('tasks:task_list'), {'q': 'academia', 'completed': 'false'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertNotContains(response, 'Academia')
+
+    def test_admin_search_uses_full_text_index(self):
+        User.objects.create_superuser(email='admin@example.com', name='Admin', password='password123')
+        self.client.login(email='admin@example.com', password='password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': 'academia'})
+        self.assertContains(response, 'Academia')
+        self.assertNotContains(response, 'Reunião 1')
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('LIKE', sql)
+        if connection.vendor == 'sqlite':
+            self.assertIn('MATCH', sql)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.tasks.models import Task, TaskTombstone
+from apps.tasks.sync import encode_sync_cursor
+
+User = get_user_model()
+
+
+# Sem janela de segurança, cada sincronização devolve apenas o que mudou desde a anterior.
+@override_settings(TASK_SYNC_SAFETY_WINDOW_SECONDS=0)
+class TaskSyncAPITest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user1 = User.objects.create_user(email='sync1@example.com', name='Sync User One', password='password123')
+        self.user2 = User.objects.create_user(email='sync2@example.com', name='Sync User Two', password='password123')
+        self.client.login(email='sync1@example.com', password='password123')
+        self.task1 = Task.objects.create(user=self.user1, title='Sync Task 1')
+        self.task2 = Task.objects.create(user=self.user1, title='Sync Task 2')
+        Task.objects.create(user=self.user2, title='Other User Task')
+
+    def _sync(self, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        return self.client.get(reverse('tasks_api:task_sync'), params)
+
+    def test_full_sync_returns_only_own_tasks(self):
+        data = self._sync().json()
+        self.assertEqual([task['id'] for task in data['changed']], [self.task1.pk, self.task2.pk])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+        self.assertTrue(data['cursor'])
+
+    def test_rows_option_adds_the_rendered_list_items(self):
+        data = self._sync().json()
+        self.assertNotIn('row', data['changed'][0])
+        self.assertEqual(data['counters']['total'], 2)
+
+        data = self.client.get(reverse('tasks_api:task_sync'), {'rows': '1'}).json()
+        item = data['changed'][0]
+        self.assertEqual(item['title'], 'Sync Task 1')
+        self.assertIn(f'id="task-item-{self.task1.pk}"', item['row'])
+        self.assertIn(f'data-position="{item["position"]}"', item['row'])
+
+    def test_delta_contains_updates_and_tombstones(self):
+        cursor = self._sync().json()['cursor']
+        self.assertEqual(self._sync(cursor).json()['changed'], [])
+
+        self.task1.title = 'Renamed'
+        self.task1.save()
+        task2_pk = self.task2.pk
+        self.task2.delete()
+        Task.objects.filter(user=self.user2).delete()
+
+        data = self._sync(cursor).json()
+        self.assertEqual([(task['id'], task['title']) for task in data['changed']], [(self.task1.pk, 'Renamed')])
+        self.assertEqual([item['id'] for item in data['deleted']], [task2_pk])
+
+        data = self._sync(data['cursor']).json()
+        self.assertEqual((data['changed'], data['deleted']), ([], []))
+
+    def test_queryset_delete_writes_tombstones(self):
+        cursor = self._sync().json()['cursor']
+        Task.objects.filter(user=self.user1).delete()
+        self.assertFalse(Task.objects.filter(user=self.user1).exists())
+        data = self._sync(cursor).json()
+        self.assertEqual(sorted(item['id'] for item in data['deleted']), [self.task1.pk, self.task2.pk])
+
+    @override_settings(TASK_SYNC_PAGE_SIZE=2)
+    def test_pages_until_has_more_is_false(self):
+        extra = [Task.objects.create(user=self.user1, title=f'Extra {i}') for i in range(3)]
+        seen, cursor, pages = [], None, 0
+        while True:
+            data = self._sync(cursor).json()
+            seen += [task['id'] for task in data['changed']]
+            cursor, pages = data['cursor'], pages + 1
+            if not data['has_more']:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, [self.task1.pk, self.task2.pk] + [task.pk for task in extra])
+
+    def test_safety_window_redelivers_recent_changes(self):
+        with override_settings(TASK_SYNC_SAFETY_WINDOW_SECONDS=60):
+            cursor = self._sync().json()['cursor']
+            # Alterações dentro da janela são entregues de novo: o cliente aplica de forma idempotente.
+            data = self._sync(cursor).json()
+        self.assertEqual([task['id'] for task in data['changed']], [self.task1.pk, self.task2.pk])
+
+    def test_expired_cursor_returns_410(self):
+        old = timezone.now() - timedelta(days=31)
+        response = self._sync(encode_sync_cursor((old, 0), (old, 0)))
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['reset'])
+
+    def test_invalid_cursor_returns_400(self):
+        response = self._sync('not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_prune_command_removes_old_tombstones(self):
+        task1_pk = self.task1.pk
+        self.task1.delete()
+        TaskTombstone.objects.create(user=self.user1, task_id=999, deleted_at=timezone.now() - timedelta(days=40))
+        out = StringIO()
+        call_command('prune_task_tombstones', stdout=out)
+        self.assertIn('1 tombstone(s) removido(s)', out.getvalue())
+        self.assertEqual(list(TaskTombstone.objects.values_list('task_id', flat=True)), [task1_pk])
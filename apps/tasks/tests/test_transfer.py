@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from apps.tasks.models import Task
+
+User = get_user_model()
+
+
+class TransferTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='import@example.com', name='Import User', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', name='Other User', password='password123')
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_command(self, *args, **kwargs):
+        out, err = StringIO(), StringIO()
+        call_command(*args, stdout=out, stderr=err, **kwargs)
+        return out.getvalue(), err.getvalue()
+
+
+class ImportTasksCommandTest(TransferTestCase):
+    def test_imports_valid_rows_and_reports_invalid_ones(self):
+        future = (date.today() + timedelta(days=5)).isoformat()
+        past = (date.today() - timedelta(days=5)).isoformat()
+        path = self.write_file('tasks.csv', (
+            'user,title,description,due_date,completed\n'
+            f',Sem dono explícito,desc,{future},false\n'
+            f'other@example.com,Do outro,,,1\n'
+            f',,sem título,,\n'
+            f',No passado,,{past},0\n'
+            f'nobody@example.com,Usuário desconhecido,,,\n'
+        ))
+        out, err = self.run_command('import_tasks', path, user='import@example.com')
+
+        self.assertIn('2 tarefa(s) importada(s), 3 linha(s) rejeitada(s)', out)
+        self.assertIn('linhas/s', out)
+        self.assertIn('Linha 3: title: Este campo é obrigatório.', err)
+        self.assertIn('Linha 4: due_date: A data de vencimento não pode ser no passado.', err)
+        self.assertIn('Linha 5: user:', err)
+        self.assertEqual(self.user.tasks.get().title, 'Sem dono explícito')
+        self.assertTrue(self.other.tasks.get().completed)
+
+    def test_allow_past_due_dates_accepts_historical_data(self):
+        past = (date.today() - timedelta(days=365)).isoformat()
+        path = self.write_file('tasks.jsonl', json.dumps({'title': 'Antiga', 'due_date': past, 'completed': True}) + '\n')
+        self.run_command('import_tasks', path, user='import@example.com', allow_past_due_dates=True)
+        task = self.user.tasks.get()
+        self.assertEqual(task.due_date.isoformat(), past)
+        self.assertTrue(task.completed)
+
+    def test_failure_reports_resume_row_and_start_row_resumes(self):
+        lines = [json.dumps({'title': f'Tarefa {i}'}) for i in range(1, 8)]
+        lines[5] = json.dumps({'title': 'Inválida', 'due_date': '2000-01-01'})
+        path = self.write_file('tasks.jsonl', '\n'.join(lines) + '\n')
+
+        with self.assertRaises(CommandError) as ctx:
+            self.run_command('import_tasks', path, user='import@example.com', chunk_size=2, max_errors=0)
+        # Os blocos das linhas 1-2 e 3-4 foram confirmados; a linha 5 ainda não.
+        self.assertIn('Retome com --start-row 5', str(ctx.exception))
+        self.assertEqual(self.user.tasks.count(), 4)
+
+        self.run_command('import_tasks', path, user='import@example.com', start_row=5, allow_past_due_dates=True)
+        self.assertEqual(
+            list(self.user.tasks.order_by('id').values_list('title', flat=True)),
+            [f'Tarefa {i}' for i in range(1, 6)] + ['Inválida', 'Tarefa 7'],
+        )
+
+    def test_requires_an_owner(self):
+        path = self.write_file('tasks.csv', 'title\nSem dono\n')
+        out, err = self.run_command('import_tasks', path)
+        self.assertIn('0 tarefa(s) importada(s), 1 linha(s) rejeitada(s)', out)
+        self.assertIn('sem coluna `user`', err)
+
+
+class ExportTasksCommandTest(TransferTestCase):
+    def test_export_round_trips_through_import(self):
+        Task.objects.create(user=self.user, title='Com, vírgula', description='linha 1\nlinha 2', due_date=date.today())
+        Task.objects.create(user=self.other, title='Concluída', completed=True)
+        path = os.path.join(self.dir.name, 'export.csv')
+        out, _ = self.run_command('export_tasks', path, chunk_size=1)
+        self.assertIn('2 tarefa(s) exportada(s)', out)
+
+        Task.objects.all().delete()
+        self.run_command('import_tasks', path)
+        self.assertEqual(
+            sorted(Task.objects.values_list('user__email', 'title', 'description', 'completed')),
+            [('import@example.com', 'Com, vírgula', 'linha 1\nlinha 2', False), ('other@example.com', 'Concluída', '', True)],
+        )
+
+    def test_after_id_appends_remaining_rows(self):
+        tasks = [Task.objects.create(user=self.user, title=f'Tarefa {i}') for i in range(3)]
+        Task.objects.create(user=self.other, title='De outro usuário')
+        path = os.path.join(self.dir.name, 'export.jsonl')
+        self.run_command('export_tasks', path, user='import@example.com')
+        with open(path, 'r+', encoding='utf-8') as f:
+            # Simula uma exportação interrompida após a primeira linha.
+            first = f.readline()
+            f.seek(len(first.encode()))
+            f.truncate()
+
+        self.run_command('export_tasks', path, user='import@example.com', after_id=tasks[0].id)
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row['id'] for row in rows], [task.id for task in tasks])
+        self.assertEqual(rows[0]['user'], 'import@example.com')
+        self.assertIs(rows[0]['completed'], False)
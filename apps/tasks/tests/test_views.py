@@ -1,12 +1,23 @@
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from apps.tasks.models import Task
+from apps.tasks.models import Task, TaskTombstone
 from apps.tasks.forms import TaskForm
 import json
+import re
 from datetime import date, timedelta
 
 User = get_user_model()
+CSRF_INPUT_RE = re.compile(r'<input type="hidden" name="csrfmiddlewaretoken" value="[^"]*">')
+
+
+def listed_ids(response):
+    # A listagem renderiza linhas de values() (dicts), não instâncias de Task.
+    return {row['id'] for row in response.context['tasks']}
+
 
 class TaskViewTest(TestCase):
     def setUp(self):
@@ -23,9 +34,9 @@ class TaskViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'tasks/task_list.html')
         self.assertIn('tasks', response.context)
-        self.assertIn(self.task1_user1, response.context['tasks'])
-        self.assertIn(self.task2_user1, response.context['tasks'])
-        self.assertNotIn(self.task_user2, response.context['tasks'])
+        self.assertIn(self.task1_user1.pk, listed_ids(response))
+        self.assertIn(self.task2_user1.pk, listed_ids(response))
+        self.assertNotIn(self.task_user2.pk, listed_ids(response))
 
     def test_task_list_view_non_ajax_get_no_tasks(self):
         self.client.logout()
@@ -37,28 +48,89 @@ class TaskViewTest(TestCase):
         self.assertQuerySetEqual(response.context['tasks'], [])
         self.assertContains(response, 'Nenhuma tarefa encontrada.')
 
+    def test_page_skips_the_list_when_the_browser_has_a_local_copy(self):
+        self.client.cookies['tasks_local_cache'] = str(self.user1.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:task_list'))
+        self.assertTrue(response.context['local_list'])
+        self.assertNotContains(response, 'task-item-')
+        self.assertContains(response, f'data-task-store="tasks-{self.user1.pk}"')
+        self.assertFalse([q for q in queries if 'FROM "tasks_task"' in q['sql']])
+
+        # Filtro ou busca na URL, AJAX e cookie de outro usuário: a lista vem do servidor.
+        for params, headers in (({'completed': 'true'}, {}), ({'q': 'View'}, {}), ({}, {'X-Requested-With': 'XMLHttpRequest'})):
+            response = self.client.get(reverse('tasks:task_list'), params, headers=headers)
+            self.assertContains(response, f'task-item-{self.task2_user1.pk}')
+        self.client.cookies['tasks_local_cache'] = str(self.user2.pk)
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertFalse(response.context['local_list'])
+        self.assertContains(response, f'task-item-{self.task1_user1.pk}')
+
+    @override_settings(TASK_LIST_PAGE_SIZE=7, TASK_API_BULK_MAX_ITEMS=20)
+    def test_page_exposes_server_settings_to_the_script(self):
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertContains(response, 'data-page-size="7"')
+        self.assertContains(response, 'data-task-batch-max-items="20"')
+        self.assertContains(response, f'data-today="{timezone.localdate():%Y-%m-%d}"')
+        self.assertContains(response, f'data-task-update-url-template="{reverse("tasks:task_update", args=[0])}"')
+
     def test_task_list_view_ajax_get_no_filter(self):
         response = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'tasks/_task_list_items.html')
         self.assertIn('tasks', response.context)
-        self.assertIn(self.task1_user1, response.context['tasks'])
-        self.assertIn(self.task2_user1, response.context['tasks'])
-        self.assertNotIn(self.task_user2, response.context['tasks'])
+        self.assertIn(self.task1_user1.pk, listed_ids(response))
+        self.assertIn(self.task2_user1.pk, listed_ids(response))
+        self.assertNotIn(self.task_user2.pk, listed_ids(response))
+
+    def test_task_list_items_carry_only_the_view_markup(self):
+        self.task1_user1.due_date = date(2030, 1, 31)
+        self.task1_user1.save()
+        response = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        content = response.content.decode()
+        self.assertNotIn('edit-task-form-actual', content)
+        self.assertNotIn('<textarea', content)
+        # O tasks.js monta o formulário de edição a partir destes dados.
+        self.assertIn(f'id="task-item-{self.task1_user1.pk}" data-due-date="2030-01-31"', content)
+        self.assertIn('Prazo: 31/01/2030', content)
+        self.assertIn('task-description task-description-empty', content)
+
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertContains(response, 'id="task-edit-form-template"', count=1)
+        self.assertContains(response, 'class="edit-task-form-actual"', count=1)
+
+    @override_settings(TASK_LIST_DESCRIPTION_LENGTH=10)
+    def test_task_list_truncates_descriptions_in_sql_and_escapes_rows(self):
+        self.task1_user1.title = '<b>Negrito</b>'
+        self.task1_user1.description = 'Começo & meio da descrição longa'
+        self.task1_user1.save()
+        self.task2_user1.description = 'Curta'
+        self.task2_user1.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        content = response.content.decode()
+        # Só o início da descrição sai do banco; o texto completo vem da API ao expandir.
+        self.assertIn('SUBSTR', queries[0]['sql'].upper())
+        self.assertIn('<span class="task-title">&lt;b&gt;Negrito&lt;/b&gt;</span>', content)
+        self.assertIn('<p class="task-description task-description-truncated">Começo &amp; m</p>', content)
+        self.assertIn(f'data-task-id="{self.task1_user1.pk}" class="task-description-expand"', content)
+        self.assertIn('<p class="task-description">Curta</p>', content)
+        self.assertEqual(content.count('task-description-expand'), 1)
+        self.assertIn(f'action="/tasks/{self.task1_user1.pk}/delete/"', content)
 
     def test_task_list_view_ajax_get_filter_completed_true(self):
         response = self.client.get(reverse('tasks:task_list') + '?completed=true', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'tasks/_task_list_items.html')
-        self.assertIn(self.task2_user1, response.context['tasks'])
-        self.assertNotIn(self.task1_user1, response.context['tasks'])
+        self.assertIn(self.task2_user1.pk, listed_ids(response))
+        self.assertNotIn(self.task1_user1.pk, listed_ids(response))
 
     def test_task_list_view_ajax_get_filter_completed_false(self):
         response = self.client.get(reverse('tasks:task_list') + '?completed=false', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'tasks/_task_list_items.html')
-        self.assertIn(self.task1_user1, response.context['tasks'])
-        self.assertNotIn(self.task2_user1, response.context['tasks'])
+        self.assertIn(self.task1_user1.pk, listed_ids(response))
+        self.assertNotIn(self.task2_user1.pk, listed_ids(response))
 
     def test_task_create_non_ajax_success(self):
         initial_task_count = Task.objects.filter(user=self.user1).count()
@@ -129,6 +201,38 @@ class TaskCRUDAJAXTest(TestCase):
         data = json.loads(response.content)
         self.assertTrue(data['success'])
 
+    def test_mutation_responses_carry_the_rendered_row(self):
+        response = self.client.post(reverse('tasks:task_create'), {'title': '<i>Nova</i>', 'due_date': '2030-01-31'},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(response.content)
+        pk = data['task']['id']
+        # O mesmo <li> da listagem, sem o token CSRF (o tasks.js o envia no cabeçalho).
+        self.assertTrue(data['row'].startswith(f'<li class="task-item" id="task-item-{pk}" data-due-date="2030-01-31"'))
+        self.assertIn(f'data-position="{data["position"]}"', data['row'])
+        self.assertIn('&lt;i&gt;Nova&lt;/i&gt;', data['row'])
+        self.assertNotIn('csrfmiddlewaretoken', data['row'])
+        listed = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest').content.decode()
+        self.assertIn(data['row'], CSRF_INPUT_RE.sub('', listed))
+
+        response = self.client.post(reverse('tasks:task_update', args=[pk]), {'title': 'Editada', 'completed': 'on'},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(response.content)
+        self.assertIn('<span class="task-title task-completed">Editada</span>', data['row'])
+        response = self.client.patch(reverse('tasks:task_patch', args=[pk]), json.dumps({'completed': False}),
+                                     content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertIn('<span class="task-title">Editada</span>', json.loads(response.content)['row'])
+
+    def test_row_positions_follow_the_list_order(self):
+        today = date.today()
+        for i, (completed, due_date) in enumerate([
+            (True, None), (False, None), (False, today + timedelta(days=2)), (True, today), (False, today),
+        ]):
+            Task.objects.create(user=self.user1, title=f'Ordem {i}', completed=completed, due_date=due_date)
+        content = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest').content.decode()
+        positions = re.findall(r'data-position="(\d+)"', content)
+        self.assertEqual(len(positions), Task.objects.filter(user=self.user1).count())
+        self.assertEqual(positions, sorted(positions))
+
     def test_task_update_other_user_task(self):
         # Mudamos de 403 para 404 (Isolamento Seguro)
         response = self.client.post(reverse('tasks:task_update', args=[self.task_user2.pk]),
@@ -150,6 +254,46 @@ class TaskCRUDAJAXTest(TestCase):
                                     HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 404)
 
+    def patch(self, pk, payload):
+        return self.client.patch(reverse('tasks:task_patch', args=[pk]), json.dumps(payload),
+                                 content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_task_patch_completed_is_a_single_update_without_select(self):
+        # Prazo vencido: o TaskForm completo recusaria a alternância.
+        Task.objects.filter(pk=self.task1_user1.pk).update(due_date=date.today() - timedelta(days=3))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch(self.task1_user1.pk, {'completed': True})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertTrue(data['task']['completed'])
+        self.assertEqual(data['task']['due_date'], (date.today() - timedelta(days=3)).isoformat())
+        self.assertEqual(data['counters']['completed'], 1)
+        self.assertEqual(data['counters']['overdue'], 0)
+        task_queries = [q['sql'] for q in queries if '"tasks_task"' in q['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertTrue(task_queries[0].startswith('UPDATE "tasks_task"'))
+        self.assertIn('RETURNING', task_queries[0])
+        self.assertTrue(Task.objects.get(pk=self.task1_user1.pk).completed)
+
+    def test_task_patch_other_user_or_missing_task_returns_404(self):
+        self.assertEqual(self.patch(self.task_user2.pk, {'completed': True}).status_code, 404)
+        self.assertEqual(self.patch(999999, {'completed': True}).status_code, 404)
+        self.assertFalse(Task.objects.get(pk=self.task_user2.pk).completed)
+
+    def test_task_patch_is_idempotent(self):
+        response = self.patch(self.task1_user1.pk, {'completed': False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['counters']['pending'], 1)
+
+    def test_task_patch_updates_only_sent_fields(self):
+        response = self.patch(self.task1_user1.pk, {'title': 'Só o título'})
+        self.assertEqual(response.status_code, 200)
+        task = Task.objects.get(pk=self.task1_user1.pk)
+        self.assertEqual((task.title, task.description), ('Só o título', 'Desc 1'))
+        self.assertEqual(self.patch(self.task1_user1.pk, {'title': ''}).status_code, 400)
+        self.assertEqual(self.patch(self.task1_user1.pk, {'completed': 'sim'}).status_code, 400)
+        self.assertEqual(self.patch(self.task1_user1.pk, {'user': self.user2.pk}).status_code, 400)
+
     def test_task_unauthenticated_redirects(self):
         self.client.logout()
         urls = [
@@ -161,3 +305,124 @@ class TaskCRUDAJAXTest(TestCase):
         for url in urls:
             response = self.client.get(url) if 'list' in url else self.client.post(url)
             self.assertEqual(response.status_code, 302)
+
+
+@override_settings(TASK_LIST_PAGE_SIZE=2)
+class TaskListPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(email='pager@example.com', name='Pager', password='password123')
+        self.client.login(email='pager@example.com', password='password123')
+        today = date.today()
+        # Ordem esperada: pendentes por prazo (sem prazo por último), depois concluídas.
+        self.tasks = [
+            Task.objects.create(user=self.user, title='P1', due_date=today),
+            Task.objects.create(user=self.user, title='P2', due_date=today + timedelta(days=1)),
+            Task.objects.create(user=self.user, title='P3'),
+            Task.objects.create(user=self.user, title='C1', completed=True, due_date=today),
+            Task.objects.create(user=self.user, title='C2', completed=True),
+        ]
+
+    def ids(self):
+        return [task.pk for task in self.tasks]
+
+    def _walk(self, params=None, ajax=False):
+        params = dict(params or {})
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if ajax else {}
+        seen = []
+        while True:
+            response = self.client.get(reverse('tasks:task_list'), params, **headers)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.context['tasks'])
+            cursor = response.context['next_cursor']
+            if ajax:
+                self.assertEqual(response.get('X-Next-Cursor'), cursor)
+            if not cursor:
+                return seen
+            self.assertContains(response, f'data-next-cursor="{cursor}"')
+            params['cursor'] = cursor
+
+    def test_full_page_walks_all_tasks_in_order(self):
+        self.assertEqual(self._walk(), self.ids())
+
+    def test_ajax_partial_walks_all_tasks_in_order(self):
+        self.assertEqual(self._walk(ajax=True), self.ids())
+
+    def test_pagination_respects_completed_filter(self):
+        self.assertEqual(self._walk({'completed': 'false'}, ajax=True), self.ids()[:3])
+        self.assertEqual(self._walk({'completed': 'true'}, ajax=True), self.ids()[3:])
+
+    def test_later_pages_cost_same_queries_as_first(self):
+        first = self.client.get(reverse('tasks:task_list'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        cursor = first.context['next_cursor']
+        with self.assertNumQueries(1):  # apenas a página de tarefas (sessão e usuário vêm do cache)
+            self.client.get(reverse('tasks:task_list'), {'cursor': cursor}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get(reverse('tasks:task_list'), {'cursor': 'not-a-cursor'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('tasks:task_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskBulkActionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='bulk@example.com', name='Bulk User', password='password123')
+        self.other = User.objects.create_user(email='bulkother@example.com', name='Other User', password='password123')
+        self.client.force_login(self.user)
+        self.pending = [Task.objects.create(user=self.user, title=f'Relatório {i}') for i in range(3)]
+        self.done = [Task.objects.create(user=self.user, title=f'Compras {i}', completed=True) for i in range(2)]
+        self.foreign = Task.objects.create(user=self.other, title='Relatório de outro', completed=True)
+
+    def bulk(self, data):
+        return self.client.post(reverse('tasks:task_bulk_action'), data, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_complete_all_is_one_update_scoped_to_the_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk({'action': 'complete', 'completed': 'all'})
+        data = json.loads(response.content)
+        self.assertEqual((data['count'], data['scope']), (3, {'completed': 'all', 'q': ''}))
+        self.assertEqual(data['counters']['completed'], 5)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Task.objects.filter(user=self.user, completed=False).exists())
+
+        response = self.bulk({'action': 'reopen', 'completed': 'all'})
+        self.assertEqual(json.loads(response.content)['count'], 5)
+        self.assertTrue(Task.objects.get(pk=self.foreign.pk).completed)
+
+    def test_actions_follow_the_current_filter_and_search(self):
+        response = self.bulk({'action': 'complete', 'completed': 'false', 'q': 'relatorio'})
+        self.assertEqual(json.loads(response.content)['count'], 3)
+        response = self.bulk({'action': 'reopen', 'completed': 'true', 'q': 'compras'})
+        self.assertEqual(json.loads(response.content)['count'], 2)
+        self.assertEqual(set(Task.objects.filter(user=self.user, completed=True)), set(self.pending))
+
+    def test_clear_completed_deletes_with_tombstones(self):
+        response = self.bulk({'action': 'clear_completed', 'completed': 'all'})
+        data = json.loads(response.content)
+        self.assertEqual((data['count'], data['counters']['total']), (2, 3))
+        self.assertFalse(Task.objects.filter(pk__in=[task.pk for task in self.done]).exists())
+        self.assertEqual(
+            set(TaskTombstone.objects.filter(user=self.user).values_list('task_id', flat=True)),
+            {task.pk for task in self.done},
+        )
+        self.assertTrue(Task.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_explicit_ids_are_capped_and_scoped(self):
+        ids = [self.pending[0].pk, self.foreign.pk]
+        response = self.bulk({'action': 'clear_completed', 'ids': ids})
+        self.assertEqual(json.loads(response.content)['count'], 0)
+        response = self.bulk({'action': 'complete', 'ids': ids})
+        data = json.loads(response.content)
+        self.assertEqual((data['count'], data['scope']), (1, {'ids': sorted(ids)}))
+        self.assertTrue(Task.objects.filter(pk=self.foreign.pk).exists())
+        with override_settings(TASK_BULK_ACTION_MAX_IDS=1):
+            self.assertEqual(self.bulk({'action': 'complete', 'ids': ids}).status_code, 413)
+        self.assertEqual(self.bulk({'action': 'complete', 'ids': ['x']}).status_code, 400)
+        self.assertEqual(self.bulk({'action': 'drop'}).status_code, 400)
+
+    def test_non_ajax_redirects_to_the_list(self):
+        response = self.client.post(reverse('tasks:task_bulk_action'), {'action': 'complete'})
+        self.assertRedirects(response, reverse('tasks:task_list'), fetch_redirect_response=False)
+        self.assertContains(self.client.get(reverse('tasks:task_list')), 'id="task-bulk-form"')
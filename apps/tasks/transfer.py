@@ -0,0 +1,148 @@
+"""
+Leitura e escrita de tarefas em CSV, JSONL e iCalendar, linha a linha, para os comandos
+`import_tasks`/`export_tasks` e as exportações da interface. Nada é carregado inteiro em memória:
+a entrada é lida sob demanda e a saída escrita (ou gerada, no streaming) a cada linha.
+"""
+import csv
+import json
+import sys
+from datetime import date, timedelta, timezone
+
+FORMATS = ('csv', 'jsonl')
+# Colunas da exportação. A importação usa `user` (e-mail) e os campos do TaskForm; as demais são ignoradas.
+EXPORT_FIELDS = ('id', 'user', 'title', 'description', 'due_date', 'completed', 'created_at', 'updated_at')
+# Colunas lidas do banco, na ordem de EXPORT_FIELDS (o dono sai como e-mail, o formato aceito pelo import_tasks).
+EXPORT_COLUMNS = ('id', 'user__email', 'title', 'description', 'due_date', 'completed', 'created_at', 'updated_at')
+ICS_COLUMNS = ('id', 'title', 'description', 'due_date', 'completed', 'updated_at')
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'sim', 's', 'on'}
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    if path and path.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def open_stream(path, mode):
+    # '-' ou vazio usa stdin/stdout. newline='' é exigido pelo módulo csv.
+    if not path or path == '-':
+        return None
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def parse_bool(value):
+    # O CheckboxInput do formulário trataria "0" e "false " como verdadeiros; no CSV tudo é texto.
+    if isinstance(value, bool) or value is None:
+        return bool(value)
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def read_rows(stream, fmt):
+    """
+    Gera (número da linha de dados, dict) a partir de `stream`, começando em 1. Linhas JSONL em
+    branco são ignoradas; uma linha que não é um objeto JSON vira um dict com a chave `__error__`.
+    """
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            row['completed'] = parse_bool(row.get('completed'))
+            yield number, row
+        return
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = {'__error__': f'JSON inválido: {e}'}
+        if not isinstance(row, dict):
+            row = {'__error__': 'Esperado um objeto JSON por linha.'}
+        yield number, row
+
+
+class Echo:
+    # Pseudo-arquivo: csv.writer devolve a linha formatada em vez de acumulá-la (StreamingHttpResponse).
+    def write(self, value):
+        return value
+
+
+def format_row(row):
+    # `row` segue EXPORT_FIELDS. Datas em ISO 8601, como na API.
+    return [value.isoformat() if isinstance(value, date) else value for value in row]
+
+
+def csv_value(value):
+    return 'true' if value is True else 'false' if value is False else '' if value is None else value
+
+
+def csv_lines(rows):
+    """Gera o CSV (cabeçalho + uma linha por item de `rows`, no formato de EXPORT_COLUMNS), linha a linha."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in format_row(row)])
+
+
+def ics_escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def ics_fold(line):
+    # RFC 5545: linhas de no máximo 75 octetos; as continuações começam com um espaço.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Não corta um caractere UTF-8 ao meio (bytes de continuação são 0b10xxxxxx).
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ics_lines(rows, host, name='Tarefas'):
+    """
+    Gera um calendário iCalendar com um evento de dia inteiro por prazo. `rows` segue ICS_COLUMNS;
+    o UID é estável por tarefa, então os clientes atualizam o evento em vez de duplicá-lo.
+    """
+    yield from map(ics_fold, (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Plataforma de Tarefas//Tarefas//PT-BR',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{ics_escape(name)}',
+    ))
+    for pk, title, description, due_date, completed, updated_at in rows:
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:task-{pk}@{host}',
+            f'DTSTAMP:{updated_at.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}',
+            f'DTSTART;VALUE=DATE:{due_date:%Y%m%d}',
+            f'DTEND;VALUE=DATE:{due_date + timedelta(days=1):%Y%m%d}',
+            f'SUMMARY:{"✔ " if completed else ""}{ics_escape(title)}',
+        ]
+        if description:
+            lines.append(f'DESCRIPTION:{ics_escape(description)}')
+        lines.append('END:VEVENT')
+        yield ''.join(map(ics_fold, lines))
+    yield ics_fold('END:VCALENDAR')
+
+
+class RowWriter:
+    def __init__(self, stream, fmt, header=True):
+        self.stream = stream or sys.stdout
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.writer(self.stream)
+            if header:
+                self.writer.writerow(EXPORT_FIELDS)
+
+    def write(self, row):
+        row = format_row(row)
+        if self.fmt == 'csv':
+            self.writer.writerow([csv_value(value) for value in row])
+        else:
+            self.stream.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n')
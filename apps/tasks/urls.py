@@ -1,11 +1,34 @@
+from django.conf import settings
 from django.urls import path
-from .views import TaskListView, TaskCreateView, TaskUpdateView, TaskDeleteView
+from .views import (
+    TaskListView, TaskCreateView, TaskUpdateView, TaskPatchView, TaskDeleteView, TaskBulkActionView, TaskExportCSVView,
+    TaskCalendarView,
+)
+
+if settings.TASK_ASYNC_VIEWS:
+    # Sob ASGI a listagem e as escritas usam as views assíncronas (ORM assíncrono), nas mesmas URLs.
+    from .async_views import (
+        AsyncTaskListView as TaskListView,
+        AsyncTaskCreateView as TaskCreateView,
+        AsyncTaskUpdateView as TaskUpdateView,
+        AsyncTaskPatchView as TaskPatchView,
+        AsyncTaskDeleteView as TaskDeleteView,
+        TaskEventsView,
+    )
 
 app_name = 'tasks'
 
 urlpatterns = [
     path('', TaskListView.as_view(), name='task_list'),
     path('create/', TaskCreateView.as_view(), name='task_create'),
+    path('<int:pk>/', TaskPatchView.as_view(), name='task_patch'),
     path('<int:pk>/update/', TaskUpdateView.as_view(), name='task_update'),
     path('<int:pk>/delete/', TaskDeleteView.as_view(), name='task_delete'),
+    path('bulk/', TaskBulkActionView.as_view(), name='task_bulk_action'),
+    path('export.csv', TaskExportCSVView.as_view(), name='task_export_csv'),
+    path('calendar.ics', TaskCalendarView.as_view(), name='task_calendar'),
 ]
+
+if settings.TASK_ASYNC_VIEWS:
+    # O stream SSE mantém a conexão aberta: sob WSGI ocuparia um worker por aba.
+    urlpatterns.append(path('events/', TaskEventsView.as_view(), name='task_events'))
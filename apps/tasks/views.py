@@ -1,12 +1,158 @@
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import render, get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from django.views.generic import ListView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
 from http import HTTPStatus
-from .models import Task
-from .forms import TaskForm
+import json
+from apps.users.auth import get_cached_user
+from .api import BATCH_EVENT_MAX_ITEMS
+from .models import Task, TaskCounters
+from .forms import TaskForm, partial_task_form
+from .events import publish_task_event
+from .cache import fragment_cache_key, get_fragment, get_task_list_last_modified, set_fragment, task_list_etag
+from .pagination import InvalidCursor, decode_cursor, decode_offset_cursor, paginate_ranked, paginate_tasks
+from .rendering import list_rows, render_rows, row_payload
+from .search import search_tasks
+from .serializers import form_errors, serialize_counters, serialize_task
+from .transfer import EXPORT_COLUMNS, ICS_COLUMNS, csv_lines, ics_lines
 
+CALENDAR_FEED_SALT = 'tasks.calendar-feed'
+
+def task_list_fragment_key(request, completed_filter=None, cursor=None, search=''):
+    # O partial contém {% csrf_token %}; o segredo CSRF entra na chave para o token continuar válido.
+    get_token(request)
+    variant = completed_filter if completed_filter in ('true', 'false') else 'all'
+    return fragment_cache_key(request.user.pk, variant, cursor or '', search, request.META.get('CSRF_COOKIE', ''))
+
+
+def build_fragment(request, key, tasks, next_cursor):
+    # `tasks` são linhas de list_rows(); os itens saem do template de linha pré-compilado.
+    html = render_to_string('tasks/_task_list_items.html', {
+        'tasks': tasks, 'rows_html': render_rows(request, tasks), 'next_cursor': next_cursor,
+    }, request)
+    fragment = {'html': html, 'next_cursor': next_cursor}
+    set_fragment(key, fragment)
+    return fragment
+
+
+def render_task_list(request, queryset, completed_filter=None, cursor=None, search=''):
+    """
+    Devolve {'html', 'next_cursor'} de uma página da lista de tarefas, usando o cache de fragmentos
+    por usuário. Num acerto, nenhuma consulta à tabela de tarefas é feita. Com `search`, a página
+    traz os resultados da busca textual ordenados por relevância.
+    """
+    key = task_list_fragment_key(request, completed_filter, cursor, search)
+    fragment = get_fragment(key)
+    if fragment is None:
+        # Só as colunas exibidas, como dicts, com a descrição truncada pelo banco.
+        if search:
+            tasks, next_cursor = paginate_ranked(
+                list_rows(search_tasks(queryset, search)), cursor, settings.TASK_LIST_PAGE_SIZE,
+            )
+        else:
+            tasks, next_cursor = paginate_tasks(list_rows(queryset), cursor, settings.TASK_LIST_PAGE_SIZE)
+        fragment = build_fragment(request, key, tasks, next_cursor)
+    return fragment
+
+
+def invalid_cursor_response(cursor, search, is_ajax):
+    if cursor:
+        try:
+            # A busca pagina por relevância (deslocamento); a lista, por cursor keyset.
+            (decode_offset_cursor if search else decode_cursor)(cursor)
+        except InvalidCursor as e:
+            if is_ajax:
+                return JsonResponse({'error': str(e)}, status=400)
+            return HttpResponseBadRequest(str(e))
+    return None
+
+
+def fragment_response(fragment):
+    # Resposta AJAX da listagem: só o partial, com o cursor da próxima página no cabeçalho.
+    response = HttpResponse(fragment['html'])
+    if fragment['next_cursor']:
+        response['X-Next-Cursor'] = fragment['next_cursor']
+    return response
+
+
+def render_task_page(request, form, fragment, counters, search=''):
+    # Sem `fragment` (local_list_requested), o tasks.js monta a lista a partir da cópia local.
+    return render(request, 'tasks/task_list.html', {
+        'form': form,
+        'task_list_html': mark_safe(fragment['html']) if fragment else '',
+        'next_cursor': fragment['next_cursor'] if fragment else None,
+        'local_list': fragment is None,
+        'task_store': f'tasks-{request.user.pk}',
+        'local_cache_cookie': settings.TASK_LOCAL_CACHE_COOKIE,
+        'page_size': settings.TASK_LIST_PAGE_SIZE,
+        'batch_max_items': min(BATCH_EVENT_MAX_ITEMS, settings.TASK_API_BULK_MAX_ITEMS),
+        # Data de referência das atrasadas (a mesma dos contadores); o ETag da página já varia com ela.
+        'today': timezone.localdate(),
+        'search': search,
+        'calendar_feed_url': calendar_feed_url(request),
+        # O stream SSE só existe sob ASGI: sob WSGI cada conexão aberta ocuparia um worker.
+        'task_events_url': reverse('tasks:task_events') if settings.TASK_ASYNC_VIEWS else '',
+        # Contadores desnormalizados: uma leitura por chave primária em vez de COUNT(*) nas tarefas.
+        'counters': counters,
+    })
+
+
+def local_list_requested(request, cursor, search):
+    """
+    Indica se a página pode vir sem a lista: o navegador tem uma cópia sincronizada das tarefas do usuário
+    (cookie TASK_LOCAL_CACHE_COOKIE com o id dele, gravado pelo tasks.js) e a primeira página sem filtro nem
+    busca foi pedida. O tasks.js filtra essa cópia localmente e só busca as alterações na sincronização.
+    """
+    return (
+        not cursor and not search and 'completed' not in request.GET
+        and request.COOKIES.get(settings.TASK_LOCAL_CACHE_COOKIE) == str(request.user.pk)
+    )
+
+
+def task_counters(request):
+    # Contadores atualizados devolvidos nas respostas AJAX, para o cabeçalho e os filtros da página.
+    return serialize_counters(TaskCounters.objects.for_user(request.user.pk))
+
+
+def task_list_view_etag(request, *args, **kwargs):
+    # O HTML varia entre página e partial e contém tokens CSRF derivados do segredo do usuário.
+    # get_token garante o segredo já na primeira resposta (é o mesmo que vai no cookie).
+    # A data entra porque o contador de atrasadas do cabeçalho muda à meia-noite sem alteração nas tarefas.
+    # O cookie da cópia local (local_list_requested) decide se a página traz a lista.
+    get_token(request)
+    return task_list_etag(
+        request, request.headers.get('x-requested-with', ''), request.META.get('CSRF_COOKIE', ''), timezone.localdate(),
+        request.COOKIES.get(settings.TASK_LOCAL_CACHE_COOKIE, ''),
+    )
+
+
+def task_list_last_modified(request, *args, **kwargs):
+    return get_task_list_last_modified(request.user.pk)
+
+
+# GET condicional: clientes que fazem polling recebem 304 sem nenhuma consulta às tarefas.
+# `no-cache` obriga o navegador a revalidar sempre, e a resposta varia com o cabeçalho AJAX.
+TASK_LIST_CACHING = [
+    condition(etag_func=task_list_view_etag, last_modified_func=task_list_last_modified),
+    cache_control(private=True, no_cache=True),
+    vary_on_headers('X-Requested-With'),
+]
+
+
+@method_decorator(TASK_LIST_CACHING, name='get')
 class TaskListView(LoginRequiredMixin, ListView):
     model = Task
     template_name = 'tasks/task_list.html'
@@ -14,26 +160,27 @@ class TaskListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         # Garante que apenas as tarefas pertencentes ao usuário logado sejam retornadas.
-        queryset = Task.objects.filter(user=self.request.user)
-        completed_filter = self.request.GET.get('completed')
-        if completed_filter == 'true':
-            queryset = queryset.filter(completed=True)
-        elif completed_filter == 'false':
-            queryset = queryset.filter(completed=False)
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['form'] = TaskForm() 
-        return context
+        return Task.objects.filter(user=self.request.user).filter_completed(self.request.GET.get('completed'))
 
     def get(self, request, *args, **kwargs):
+        cursor = request.GET.get('cursor')
+        search = request.GET.get('q', '').strip()
+        is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+        error = invalid_cursor_response(cursor, search, is_ajax)
+        if error:
+            return error
+
+        if not is_ajax and local_list_requested(request, cursor, search):
+            # A lista vem da cópia local do navegador: nenhuma consulta às tarefas.
+            return render_task_page(request, TaskForm(), None, TaskCounters.objects.for_user(request.user.pk))
+
+        # Pagina por cursor (keyset) em vez de OFFSET: cada página é um seek no índice composto.
+        fragment = render_task_list(request, self.get_queryset(), request.GET.get('completed'), cursor, search)
+
         # Sobreescreve o método get para lidar com requisições AJAX para filtro.
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            self.object_list = self.get_queryset()
-            context = self.get_context_data()
-            return render(request, 'tasks/_task_list_items.html', context)
-        return super().get(request, *args, **kwargs)
+        if is_ajax:
+            return fragment_response(fragment)
+        return render_task_page(request, TaskForm(), fragment, TaskCounters.objects.for_user(request.user.pk), search)
 
 class TaskCreateView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
@@ -42,23 +189,19 @@ class TaskCreateView(LoginRequiredMixin, View):
             task = form.save(commit=False)
             task.user = request.user
             task.save()
+            data, row, counters = serialize_task(task), row_payload(task), task_counters(request)
+            # As outras abas e dispositivos do usuário recebem a tarefa pelo stream SSE.
+            publish_task_event(request.user.pk, 'created', task=data, counters=counters, **row)
             if request.headers.get('x-requested-with') == 'XMLHttpRequest': #Headers AJAX
-                return JsonResponse({'success': True, 'task': {
-                    'id': task.id,
-                    'title': task.title,
-                    'description': task.description,
-                    'due_date': task.due_date.strftime('%Y-%m-%d') if task.due_date else None,
-                    'completed': task.completed
-                }}, status=201)
+                # A linha já renderizada (row_payload): o tasks.js só insere o <li> na posição indicada.
+                return JsonResponse({'success': True, 'task': data, 'counters': counters, **row}, status=201)
             return redirect('tasks:task_list')
         else:
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                errors = {field: form.errors[field][0] for field in form.errors} # Extrai o primeiro erro por campo
+                errors = form_errors(form) # Extrai o primeiro erro por campo
                 return JsonResponse({'success': False, 'errors': errors}, status=400)
-            return render(request, 'tasks/task_list.html', {
-                'form': form,
-                'tasks': Task.objects.filter(user=request.user).order_by('completed', 'due_date', 'created_at')
-            })
+            fragment = render_task_list(request, Task.objects.filter(user=request.user))
+            return render_task_page(request, form, fragment, TaskCounters.objects.for_user(request.user.pk))
 
 class TaskUpdateView(LoginRequiredMixin, View):
     def post(self, request, pk, *args, **kwargs):
@@ -67,26 +210,209 @@ class TaskUpdateView(LoginRequiredMixin, View):
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
             task = form.save()
+            data, row, counters = serialize_task(task), row_payload(task), task_counters(request)
+            publish_task_event(request.user.pk, 'updated', task=data, counters=counters, **row)
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                return JsonResponse({'success': True, 'task': {
-                    'id': task.id,
-                    'title': task.title,
-                    'description': task.description,
-                    'due_date': task.due_date.strftime('%Y-%m-%d') if task.due_date else None,
-                    'completed': task.completed
-                }})
+                return JsonResponse({'success': True, 'task': data, 'counters': counters, **row})
             return redirect('tasks:task_list')
         else:
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                errors = {field: form.errors[field][0] for field in form.errors}
+                errors = form_errors(form)
                 return JsonResponse({'success': False, 'errors': errors}, status=400)
             return redirect('tasks:task_list')
 
+def patch_payload(request):
+    """Corpo JSON de um PATCH: um dict não vazio só com campos do TaskForm, ou None se inválido."""
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict) or not payload or not payload.keys() <= set(TaskForm.Meta.fields):
+        return None
+    return payload
+
+
+def invalid_patch_response(payload):
+    if payload is None:
+        message = f'Envie um objeto JSON com um ou mais dos campos: {", ".join(TaskForm.Meta.fields)}.'
+        return JsonResponse({'success': False, 'errors': {'__all__': message}}, status=400)
+    if 'completed' in payload and not isinstance(payload['completed'], bool):
+        return JsonResponse({'success': False, 'errors': {'completed': 'Informe true ou false.'}}, status=400)
+    return None
+
+
+class TaskPatchView(LoginRequiredMixin, View):
+    """
+    Atualização parcial (PATCH com corpo JSON): só os campos enviados são validados e gravados, então
+    o checkbox da lista não passa pelo clean_due_date, que recusaria tarefas com prazo já vencido.
+    Só com `completed` é um único UPDATE ... WHERE id AND user_id ... RETURNING, sem SELECT prévio.
+    """
+    http_method_names = ['patch']
+
+    def patch(self, request, pk, *args, **kwargs):
+        payload = patch_payload(request)
+        error = invalid_patch_response(payload)
+        if error:
+            return error
+        if payload.keys() == {'completed'}:
+            tasks = Task.objects.filter(pk=pk, user=request.user).set_completed_returning(payload['completed'])
+            # Nenhuma linha alterada: a tarefa não existe, é de outro usuário ou já estava no estado pedido.
+            task = tasks[0] if tasks else get_object_or_404(Task, pk=pk, user=request.user)
+            changed = bool(tasks)
+        else:
+            task = get_object_or_404(Task, pk=pk, user=request.user)
+            fields = tuple(field for field in TaskForm.Meta.fields if field in payload)
+            form = partial_task_form(fields)(data=payload, instance=task)
+            if not form.is_valid():
+                return JsonResponse({'success': False, 'errors': form_errors(form)}, status=400)
+            task = form.save(commit=False)
+            # update_fields só atualiza campos auto_now se estiverem na lista.
+            task.save(update_fields=fields + ('updated_at',))
+            changed = True
+        data, row, counters = serialize_task(task), row_payload(task), task_counters(request)
+        if changed:
+            publish_task_event(request.user.pk, 'updated', task=data, counters=counters, **row)
+        return JsonResponse({'success': True, 'task': data, 'counters': counters, **row})
+
+
 class TaskDeleteView(LoginRequiredMixin, View):
     def post(self, request, pk, *args, **kwargs):
         task = get_object_or_404(Task, pk=pk, user=request.user)
+        task_id = task.pk
         task.delete()
-        
+        counters = task_counters(request)
+        publish_task_event(request.user.pk, 'deleted', id=task_id, counters=counters)
+
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'success': True, 'counters': counters})
+        return redirect('tasks:task_list')
+
+
+# Ações de TaskBulkActionView: `complete` e `reopen` com set_completed(), `clear_completed` com delete().
+BULK_ACTIONS = ('complete', 'reopen', 'clear_completed')
+
+
+def bulk_action_queryset(request, ids):
+    """
+    Tarefas do usuário afetadas por uma ação em lote e o escopo usado, que volta na resposta e no evento
+    SSE para os clientes aplicarem a ação às tarefas exibidas: os `ids` enviados ou, sem eles, o filtro
+    atual da lista (`completed` e `q`).
+    """
+    queryset = Task.objects.filter(user=request.user)
+    if ids:
+        return queryset.filter(pk__in=ids), {'ids': ids}
+    completed_filter = request.POST.get('completed')
+    search = request.POST.get('q', '').strip()
+    queryset = queryset.filter_completed(completed_filter)
+    if search:
+        # Subconsulta de ids: o UPDATE/DELETE não leva o JOIN nem a ordenação por relevância da busca.
+        queryset = queryset.filter(pk__in=search_tasks(queryset, search).order_by().values('pk'))
+    return queryset, {'completed': completed_filter if completed_filter in ('true', 'false') else 'all', 'q': search}
+
+
+class TaskBulkActionView(LoginRequiredMixin, View):
+    """
+    Concluir todas, reabrir todas ou excluir as concluídas (POST `action`) sem uma requisição por tarefa:
+    cada ação é um único set_completed() ou delete() do QuerySet, restrito ao usuário e sem carregar as
+    tarefas. A resposta traz o número de tarefas afetadas, para o tasks.js atualizar a lista sem recarregá-la.
+    """
+
+    def post(self, request, *args, **kwargs):
+        action = request.POST.get('action')
+        if action not in BULK_ACTIONS:
+            return self.error(request, f'Ação inválida. Use uma de: {", ".join(BULK_ACTIONS)}.')
+        ids = request.POST.getlist('ids')
+        if len(ids) > settings.TASK_BULK_ACTION_MAX_IDS:
+            return self.error(
+                request, f'Envie no máximo {settings.TASK_BULK_ACTION_MAX_IDS} ids por requisição.', status=413,
+            )
+        if not all(pk.isdigit() for pk in ids):
+            return self.error(request, 'Os ids devem ser números inteiros.')
+        queryset, scope = bulk_action_queryset(request, sorted({int(pk) for pk in ids}))
+        if action == 'clear_completed':
+            count, _ = queryset.filter(completed=True).delete()
+        else:
+            count = queryset.set_completed(action == 'complete')
+        counters = task_counters(request)
+        if count:
+            # As outras abas aplicam a mesma ação às tarefas exibidas (ou recarregam a lista).
+            publish_task_event(request.user.pk, 'bulk', action=action, scope=scope, count=count, counters=counters)
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'success': True, 'action': action, 'scope': scope, 'count': count, 'counters': counters})
+        return redirect('tasks:task_list')
+
+    def error(self, request, message, status=400):
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            return JsonResponse({'success': True})
-        return redirect('tasks:task_list')
\ No newline at end of file
+            return JsonResponse({'success': False, 'errors': {'__all__': message}}, status=status)
+        return HttpResponse(message, status=status, content_type='text/plain; charset=utf-8')
+
+
+def calendar_feed_key(user):
+    # Derivada do hash de sessão (trocar a senha a muda), mas sem expô-lo: o token é assinado, não cifrado.
+    return salted_hmac(CALENDAR_FEED_SALT, user.get_session_auth_hash()).hexdigest()[:16]
+
+
+def calendar_feed_url(request):
+    """
+    Link de assinatura do calendário (.ics) do usuário. Clientes de calendário não enviam a sessão,
+    então o link leva um token assinado; ele inclui um HMAC do hash de sessão, e trocar a senha o revoga.
+    """
+    user = request.user
+    token = signing.dumps([user.pk, calendar_feed_key(user)], salt=CALENDAR_FEED_SALT)
+    return request.build_absolute_uri(f"{reverse('tasks:task_calendar')}?token={token}")
+
+
+def calendar_feed_user(token):
+    try:
+        pk, key = signing.loads(token, salt=CALENDAR_FEED_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    user = get_cached_user(pk)
+    if user is None or not user.is_active or not constant_time_compare(calendar_feed_key(user), key):
+        return None
+    return user
+
+
+def task_export_etag(request, *args, **kwargs):
+    # A versão da lista muda a cada alteração das tarefas; o caminho distingue CSV, .ics e filtros.
+    return task_list_etag(request, 'export')
+
+
+# Exportações em streaming: as linhas são lidas com iterator() (cursor no servidor, no PostgreSQL)
+# e escritas na resposta aos poucos, sem carregar todas as tarefas na memória do worker. Sem alterações
+# desde a última cópia, o GET condicional responde 304 sem consultar as tarefas.
+@method_decorator(condition(etag_func=task_export_etag, last_modified_func=task_list_last_modified), name='get')
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+class TaskExportCSVView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs):
+        queryset = Task.objects.filter(user=request.user).filter_completed(request.GET.get('completed'))
+        rows = queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=settings.TASK_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(csv_lines(rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="tarefas.csv"'
+        return response
+
+
+@method_decorator(condition(etag_func=task_export_etag, last_modified_func=task_list_last_modified), name='get')
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+class TaskCalendarView(LoginRequiredMixin, View):
+    """Prazos das tarefas em iCalendar, para baixar ou assinar (polling) num cliente de calendário."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = request.GET.get('token')
+        if token:
+            # O token autentica apenas este feed, sem criar sessão.
+            user = calendar_feed_user(token)
+            if user is None:
+                raise PermissionDenied('Link do calendário inválido ou revogado.')
+            request.user = user
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        queryset = (
+            Task.objects.filter(user=request.user, due_date__isnull=False)
+            .filter_completed(request.GET.get('completed'))
+        )
+        rows = queryset.values_list(*ICS_COLUMNS).iterator(chunk_size=settings.TASK_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(ics_lines(rows, request.get_host()), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="tarefas.ics"'
+        return response
@@ -3,6 +3,9 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from .models import User
 from django import forms
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from config.paginator import EstimatedCountPaginator
 
 
 class UserAdminChangeForm(forms.ModelForm):
@@ -49,7 +52,10 @@ class CustomUserAdmin(BaseUserAdmin):
     list_display = ('email', 'name', 'is_staff', 'is_active')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
     search_fields = ('name', 'email')
-    ordering = ('email',)
+    ordering = ('email',)  # Usa o índice único de email.
+    # Sem o COUNT(*) extra da tabela inteira ao filtrar, e contagem estimada quando não há filtro.
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
@@ -66,3 +72,13 @@ class CustomUserAdmin(BaseUserAdmin):
     )
 
     filter_horizontal = ('groups', 'user_permissions',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Um e-mail completo (ex: vindo do autocomplete de usuário das tarefas) é buscado pelo índice único,
+        # sem o `icontains` que percorre a tabela inteira.
+        term = search_term.strip()
+        try:
+            validate_email(term)
+        except ValidationError:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(email=User.objects.normalize_email(term)), False
@@ -0,0 +1,59 @@
+"""
+Autenticação sem consultas por requisição. O AuthenticationMiddleware carrega o usuário da sessão a cada
+requisição; com o CachedModelBackend (AUTHENTICATION_BACKENDS) ele vem do cache, numa versão enxuta:
+id, e-mail, nome, flags de acesso e a impressão digital da senha (o hash de sessão, `get_session_auth_hash`),
+nunca o hash da senha em si. Os demais campos ficam adiados e, se acessados, são lidos do banco.
+
+A entrada do cache é removida quando o usuário é salvo ou excluído (troca de senha, desativação, edição
+no admin) e no logout; alterações por `QuerySet.update()` não disparam sinais e valem após
+AUTH_USER_CACHE_TIMEOUT segundos.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_KEY = 'users:auth-user:{user_id}'
+# Campos guardados no cache; os demais campos do usuário ficam adiados.
+CACHED_FIELDS = ('id', 'email', 'name', 'is_active', 'is_staff', 'is_superuser')
+
+
+def cache_user(user):
+    data = {field: getattr(user, field) for field in CACHED_FIELDS}
+    data['session_auth_hash'] = user.get_session_auth_hash()
+    cache.set(USER_KEY.format(user_id=user.pk), data, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def forget_user(user_id):
+    cache.delete(USER_KEY.format(user_id=user_id))
+
+
+def build_user(data):
+    # Como um `.only(*CACHED_FIELDS)`: save() grava apenas os campos carregados, e a senha nunca é sobrescrita.
+    UserModel = get_user_model()
+    fields = [f.attname for f in UserModel._meta.concrete_fields if f.attname in data]
+    user = UserModel.from_db(UserModel._default_manager.db, fields, [data[name] for name in fields])
+    user.cached_session_auth_hash = data['session_auth_hash']
+    return user
+
+
+def get_cached_user(user_id):
+    """Usuário pelo id, do cache ou (numa falta) do banco; None se não existir."""
+    data = cache.get(USER_KEY.format(user_id=user_id))
+    if data is not None:
+        return build_user(data)
+    UserModel = get_user_model()
+    try:
+        user = UserModel._default_manager.get(pk=user_id)
+    except UserModel.DoesNotExist:
+        return None
+    cache_user(user)
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend cujo `get_user` (chamado pelo AuthenticationMiddleware) lê o usuário do cache."""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.users.ratelimit import rejected_stats, reset_rejected_stats
+
+
+class Command(BaseCommand):
+    help = 'Mostra quantas tentativas de login e registro foram rejeitadas pelo limite, por IP e por e-mail (JSON).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zera os contadores após exibi-los.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(rejected_stats()))
+        if options['reset']:
+            reset_rejected_stats()
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import django
+from django.contrib.auth import get_user_model, password_validation
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.tasks.models import TaskCounters
+from apps.tasks.transfer import FORMATS, detect_format, open_stream, parse_bool, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria usuários em massa a partir de um arquivo CSV ou JSONL (colunas email, name, password e, '
+        'opcionalmente, is_active). Os hashes das senhas são calculados num pool de processos e os usuários '
+        'inseridos com bulk_create em transações por bloco. Linhas inválidas ou com e-mail já cadastrado '
+        'são relatadas e ignoradas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo de entrada ('-' para a entrada padrão).")
+        parser.add_argument('--format', choices=FORMATS, help='Formato da entrada (padrão: pela extensão; .jsonl ou csv).')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processos que calculam os hashes das senhas (padrão: um por CPU; 1 = no próprio processo).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Linhas por INSERT.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Linhas por transação (e por consulta de e-mails).')
+        parser.add_argument(
+            '--start-row', type=int, default=1,
+            help='Primeira linha de dados a importar (1 = início). Usada para retomar uma importação interrompida.',
+        )
+        parser.add_argument('--max-errors', type=int, default=1000, help='Interrompe após este número de linhas inválidas.')
+
+    def handle(self, *args, **options):
+        if min(options['workers'], options['batch_size'], options['chunk_size'], options['start_row']) < 1:
+            raise CommandError('--workers, --batch-size, --chunk-size e --start-row devem ser positivos.')
+
+        fmt = detect_format(options['path'], options['format'])
+        stream = open_stream(options['path'], 'r') or nullcontext(sys.stdin)
+        self.created = self.rejected = 0
+        self.hashing_seconds = 0.0
+        # Última linha cujo bloco foi confirmado: é dela que uma nova execução retoma.
+        self.committed_row = options['start_row'] - 1
+        self.started = time.perf_counter()
+        # Sem pool com um único worker. O initializer prepara o Django nos processos criados com spawn.
+        pool = ProcessPoolExecutor(options['workers'], initializer=django.setup) if options['workers'] > 1 else None
+        try:
+            with stream as f, pool or nullcontext():
+                self.pool, self.workers = pool, options['workers']
+                self.run(read_rows(f, fmt), options)
+        except (Exception, KeyboardInterrupt) as e:
+            resume = f'{self.created} usuário(s) já criado(s). Retome com --start-row {self.committed_row + 1}.'
+            if isinstance(e, KeyboardInterrupt):
+                self.stderr.write(f'Importação interrompida. {resume}')
+                raise
+            raise CommandError(f'{e} {resume}') from e
+
+        elapsed = time.perf_counter() - self.started
+        rows = self.created + self.rejected
+        hashes = f'{self.created / self.hashing_seconds:.0f}' if self.hashing_seconds else '-'
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.created} usuário(s) criado(s), {self.rejected} linha(s) rejeitada(s) em {elapsed:.1f}s '
+            f'({rows / elapsed:.0f} linhas/s; {hashes} hashes/s com {options["workers"]} processo(s)).'
+        ))
+
+    def run(self, rows, options):
+        chunk, last_row = [], self.committed_row
+        for number, row in rows:
+            if number < options['start_row']:
+                continue
+            last_row = number
+            entry = self.build_user(number, row)
+            if entry is None:
+                if self.rejected > options['max_errors']:
+                    raise CommandError(f'Mais de {options["max_errors"]} linha(s) inválida(s).')
+            else:
+                chunk.append(entry)
+            if number - self.committed_row >= options['chunk_size']:
+                self.flush(chunk, last_row, options)
+                chunk = []
+        self.flush(chunk, last_row, options)
+
+    def build_user(self, number, row):
+        """Valida a linha sem consultar o banco; devolve (linha, usuário, senha em claro) ou None."""
+        if '__error__' in row:
+            return self.reject(number, {'__all__': row['__error__']})
+        is_active = row.get('is_active')
+        user = User(
+            email=User.objects.normalize_email((row.get('email') or '').strip()),
+            name=(row.get('name') or '').strip(),
+            # Coluna ausente ou vazia: conta ativa.
+            is_active=True if is_active in (None, '') else parse_bool(is_active),
+        )
+        password = row.get('password') or None
+        try:
+            # A unicidade do e-mail é verificada por bloco em flush(), com uma única consulta.
+            user.clean_fields(exclude={'password'})
+            if password is not None:
+                password_validation.validate_password(password, user)
+        except ValidationError as e:
+            errors = e.message_dict if hasattr(e, 'error_dict') else {'password': e.messages}
+            return self.reject(number, {field: ' '.join(messages) for field, messages in errors.items()})
+        return number, user, password
+
+    def reject(self, number, errors):
+        self.rejected += 1
+        self.stderr.write(f'Linha {number}: ' + '; '.join(f'{field}: {message}' for field, message in errors.items()))
+        return None
+
+    def without_duplicates(self, chunk):
+        # Repetidos no próprio arquivo e já cadastrados: um único SELECT pelos e-mails do bloco.
+        existing = set(User.objects.filter(email__in={user.email for _, user, _ in chunk}).values_list('email', flat=True))
+        seen, unique = set(), []
+        for number, user, password in chunk:
+            if user.email in existing:
+                self.reject(number, {'email': f'{user.email} já cadastrado.'})
+            elif user.email in seen:
+                self.reject(number, {'email': f'{user.email} repetido no arquivo.'})
+            else:
+                seen.add(user.email)
+                unique.append((number, user, password))
+        return unique
+
+    def hash_passwords(self, passwords):
+        # Sem senha, a conta recebe uma senha inutilizável (make_password(None)); o usuário define uma depois.
+        started = time.perf_counter()
+        if self.pool is None:
+            hashes = [make_password(password) for password in passwords]
+        else:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = list(self.pool.map(make_password, passwords, chunksize=chunksize))
+        self.hashing_seconds += time.perf_counter() - started
+        return hashes
+
+    def flush(self, chunk, last_row, options):
+        chunk = self.without_duplicates(chunk) if chunk else []
+        if chunk:
+            for (_, user, _), password in zip(chunk, self.hash_passwords([password for _, _, password in chunk])):
+                user.password = password
+            try:
+                self.insert([user for _, user, _ in chunk], options)
+            except IntegrityError:
+                # Outro processo cadastrou um dos e-mails entre a consulta e o INSERT: refaz a consulta.
+                for _, user, _ in chunk:
+                    user.pk = None  # Ids atribuídos antes do rollback.
+                chunk = self.without_duplicates(chunk)
+                self.insert([user for _, user, _ in chunk], options)
+            self.created += len(chunk)
+        self.committed_row = last_row
+        if chunk and options['verbosity'] >= 2:
+            elapsed = time.perf_counter() - self.started
+            self.stdout.write(f'{self.created} usuário(s) até a linha {last_row} ({self.created / elapsed:.0f} linhas/s).')
+
+    def insert(self, users, options):
+        if not users:
+            return
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=options['batch_size'])
+            # bulk_create não dispara o post_save que cria a linha de contadores de cada usuário.
+            today = timezone.localdate()
+            TaskCounters.objects.bulk_create(
+                [TaskCounters(user_id=user.pk, overdue_as_of=today) for user in users], batch_size=options['batch_size'],
+            )
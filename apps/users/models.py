@@ -39,3 +39,10 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.name
+
+    def get_session_auth_hash(self):
+        # Usuários montados pelo cache de autenticação (apps/users/auth.py) não carregam a senha, apenas
+        # o hash de sessão calculado a partir dela. Depois de set_password() o hash volta a ser calculado.
+        if 'password' in self.get_deferred_fields() and hasattr(self, 'cached_session_auth_hash'):
+            return self.cached_session_auth_hash
+        return super().get_session_auth_hash()
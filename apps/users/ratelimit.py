@@ -0,0 +1,124 @@
+"""
+Limite de tentativas de login e registro (token bucket), por IP e por e-mail. Cada tentativa custa um token;
+o balde tem capacidade para uma rajada e é reabastecido continuamente. Tentativas sem token recebem 429
+com Retry-After antes de qualquer hash de senha ou consulta ao banco: uma rajada de credential stuffing não
+ocupa os workers com PBKDF2.
+
+Os baldes ficam no cache AUTH_RATE_LIMIT_CACHE (com mais de um processo, um cache compartilhado como o
+Redis). A leitura e a gravação do balde não são atômicas: tentativas simultâneas podem gastar o mesmo
+token, o que deixa passar algumas tentativas a mais numa rajada concorrente, nunca um fluxo contínuo.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.shortcuts import render
+
+BUCKET_KEY = 'users:ratelimit:{scope}:{kind}:{ident}'
+REJECTED_KEY = 'users:ratelimit:rejected:{scope}:{kind}'
+SCOPES = ('login', 'register')
+KINDS = ('ip', 'email')
+# Campo do POST com o e-mail em cada formulário (o de login o chama de `username`).
+EMAIL_FIELDS = {'login': 'username', 'register': 'email'}
+
+
+def rate_limit_cache():
+    return caches[settings.AUTH_RATE_LIMIT_CACHE]
+
+
+class TokenBucket:
+    """Balde com `capacity` tokens, reabastecido a `per_minute` tokens por minuto."""
+
+    def __init__(self, capacity, per_minute):
+        self.capacity = capacity
+        self.rate = per_minute / 60
+
+    def consume(self, key, now=None):
+        """Gasta um token. Devolve 0 se havia token, senão os segundos até o próximo token."""
+        cache = rate_limit_cache()
+        now = time.time() if now is None else now
+        tokens, updated = cache.get(key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return math.ceil((1 - tokens) / self.rate)
+        # O balde expira quando estaria cheio de novo: chaves de IPs e e-mails inativos não se acumulam.
+        cache.set(key, (tokens - 1, now), timeout=math.ceil(self.capacity / self.rate))
+        return 0
+
+
+def client_ip(request):
+    # Atrás de um proxy reverso, AUTH_RATE_LIMIT_IP_HEADER aponta o cabeçalho com o IP real (ex: HTTP_X_REAL_IP).
+    return request.META.get(settings.AUTH_RATE_LIMIT_IP_HEADER) or request.META.get('REMOTE_ADDR', '')
+
+
+def _ident(value):
+    # E-mails não ficam em claro nas chaves do cache.
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+def check_rate_limit(request, scope):
+    """Segundos até a próxima tentativa permitida (0 se a tentativa pode seguir)."""
+    identities = [('ip', client_ip(request))]
+    email = request.POST.get(EMAIL_FIELDS[scope], '').strip().lower()
+    if email:
+        identities.append(('email', email))
+    for kind, value in identities:
+        limits = settings.AUTH_RATE_LIMITS[kind]
+        bucket = TokenBucket(limits['capacity'], limits['per_minute'])
+        retry_after = bucket.consume(BUCKET_KEY.format(scope=scope, kind=kind, ident=_ident(value)))
+        if retry_after:
+            _count_rejected(scope, kind)
+            return retry_after
+    return 0
+
+
+def _count_rejected(scope, kind):
+    cache = rate_limit_cache()
+    key = REJECTED_KEY.format(scope=scope, kind=kind)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave foi despejada entre o add e o incr.
+        cache.set(key, 1, timeout=None)
+
+
+def rejected_stats():
+    cache = rate_limit_cache()
+    keys = {(scope, kind): REJECTED_KEY.format(scope=scope, kind=kind) for scope in SCOPES for kind in KINDS}
+    values = cache.get_many(keys.values())
+    stats = {scope: {kind: values.get(keys[scope, kind], 0) for kind in KINDS} for scope in SCOPES}
+    stats['total'] = sum(sum(kinds.values()) for kinds in stats.values())
+    return stats
+
+
+def reset_rejected_stats():
+    rate_limit_cache().delete_many([REJECTED_KEY.format(scope=s, kind=k) for s in SCOPES for k in KINDS])
+
+
+def rate_limited_response(request, retry_after):
+    message = 'Muitas tentativas. Tente novamente em alguns instantes.'
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    else:
+        response = render(request, 'error.html', {'status_code': 429, 'message': message}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope):
+    """Decorator de view: limita os POSTs (tentativas) de `scope` antes de a view rodar."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'POST':
+                retry_after = check_rate_limit(request, scope)
+                if retry_after:
+                    return rate_limited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import cache_user, forget_user
+
+
+# Troca de senha, desativação e edições (views, admin) passam por save(); a próxima requisição relê o
+# usuário do banco e, se o hash de sessão mudou, a sessão é encerrada pelo AuthenticationMiddleware.
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_in)
+def cache_logged_in_user(sender, request, user, **kwargs):
+    # Já no login, para que a primeira requisição da sessão também não consulte o usuário.
+    cache_user(user)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class UserAdminTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_superuser(email='admin@example.com', name='Admin', password='password123')
+        self.client.login(email='admin@example.com', password='password123')
+        User.objects.create_user(email='maria@example.com', name='Maria Silva', password='password123')
+        User.objects.create_user(email='joao@example.com', name='João Souza', password='password123')
+
+    def test_full_email_search_uses_exact_match(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:users_user_changelist'), {'q': 'maria@example.com'})
+        self.assertContains(response, 'Maria Silva')
+        self.assertNotContains(response, 'João Souza')
+        self.assertNotIn('LIKE', ' '.join(query['sql'] for query in queries))
+
+    def test_partial_search_still_matches_names(self):
+        response = self.client.get(reverse('admin:users_user_changelist'), {'q': 'souza'})
+        self.assertContains(response, 'João Souza')
+        self.assertNotContains(response, 'Maria Silva')
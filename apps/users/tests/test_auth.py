@@ -0,0 +1,65 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import aget_user, get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from apps.users.auth import USER_KEY, CachedModelBackend
+
+User = get_user_model()
+
+
+class CachedAuthenticationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='cached@example.com', name='Cached User', password='password123')
+        self.client = Client()
+        self.client.post(reverse('users:login'), {'username': 'cached@example.com', 'password': 'password123'})
+        self.key = USER_KEY.format(user_id=self.user.pk)
+
+    def test_authenticated_requests_only_query_task_data(self):
+        self.assertIsNotNone(cache.get(self.key))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Bem-vindo, Cached User!')
+        with self.assertNumQueries(2):  # página de tarefas e contadores
+            self.assertEqual(self.client.get(reverse('tasks:task_list')).status_code, 200)
+
+    def test_cached_user_is_slim_and_never_overwrites_the_password(self):
+        user = CachedModelBackend().get_user(self.user.pk)
+        self.assertEqual((user.pk, user.email, user.name), (self.user.pk, 'cached@example.com', 'Cached User'))
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertNotIn('password', str(cache.get(self.key)))
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+        user.name = 'Renomeado'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Renomeado')
+        self.assertTrue(self.user.check_password('password123'))
+        self.assertIsNone(cache.get(self.key))
+
+    def test_logout_clears_session_and_cached_user(self):
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(self.key))
+        self.assertEqual(self.client.get(reverse('tasks:task_list')).status_code, 302)
+
+    def test_password_change_ends_other_sessions(self):
+        self.user.set_password('outrasenha123')
+        self.user.save()
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(reverse('users:login')))
+
+    def test_deactivation_ends_sessions(self):
+        self.client.get(reverse('home'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('tasks:task_list')).status_code, 302)
+
+    def test_async_lookup_uses_the_cache(self):
+        # request.auser(), usado pelas views assíncronas, chega ao mesmo get_user do backend.
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        with self.assertNumQueries(0):
+            user = async_to_sync(aget_user)(request)
+        self.assertEqual(user.name, 'Cached User')
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.tasks.models import TaskCounters
+
+User = get_user_model()
+
+
+# Um hasher rápido: o que se testa é o fluxo do comando, não o custo do PBKDF2.
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportUsersCommandTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(email='existente@example.com', name='Existente', password='password123')
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_command(self, *args, **kwargs):
+        out, err = StringIO(), StringIO()
+        call_command('import_users', *args, stdout=out, stderr=err, **kwargs)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_valid_users_and_reports_invalid_rows(self):
+        path = self.write_file('users.csv', (
+            'email,name,password,is_active\n'
+            'ana@EXAMPLE.com,Ana,Senha-forte-1,\n'
+            'existente@example.com,Repetida,Senha-forte-2,\n'
+            'invalido,Sem e-mail válido,Senha-forte-3,\n'
+            'bruno@example.com,,Senha-forte-4,\n'
+            'ana@example.com,Ana de novo,Senha-forte-5,\n'
+            'carla@example.com,Carla,123,\n'
+            'davi@example.com,Davi,,false\n'
+        ))
+        out, err = self.run_command(path, workers=2)
+
+        self.assertIn('2 usuário(s) criado(s), 5 linha(s) rejeitada(s)', out)
+        self.assertIn('hashes/s com 2 processo(s)', out)
+        self.assertIn('Linha 2: email: existente@example.com já cadastrado.', err)
+        self.assertIn('Linha 3: email:', err)
+        self.assertIn('Linha 4: name:', err)
+        self.assertIn('Linha 5: email: ana@example.com repetido no arquivo.', err)
+        self.assertIn('Linha 6: password:', err)
+
+        ana = User.objects.get(email='ana@example.com')
+        self.assertTrue(ana.check_password('Senha-forte-1'))
+        self.assertTrue(ana.is_active)
+        davi = User.objects.get(email='davi@example.com')
+        self.assertFalse(davi.has_usable_password())
+        self.assertFalse(davi.is_active)
+        # bulk_create não dispara o post_save: o comando cria as linhas de contadores.
+        self.assertEqual(TaskCounters.objects.filter(user__in=[ana, davi]).count(), 2)
+
+    def test_one_email_lookup_per_chunk(self):
+        lines = [json.dumps({'email': f'user{i}@example.com', 'name': f'User {i}'}) for i in range(10)]
+        path = self.write_file('users.jsonl', '\n'.join(lines) + '\n')
+        with CaptureQueriesContext(connection) as queries:
+            out, _ = self.run_command(path, workers=1, chunk_size=4)
+        self.assertIn('10 usuário(s) criado(s), 0 linha(s) rejeitada(s)', out)
+        lookups = [q for q in queries if q['sql'].startswith('SELECT "users_user"."email"')]
+        self.assertEqual(len(lookups), 3)
+
+    def test_start_row_resumes_an_interrupted_import(self):
+        path = self.write_file('users.csv', 'email,name\nprimeiro@example.com,Primeiro\nsegundo@example.com,Segundo\n')
+        out, _ = self.run_command(path, workers=1, start_row=2)
+        self.assertIn('1 usuário(s) criado(s)', out)
+        self.assertFalse(User.objects.filter(email='primeiro@example.com').exists())
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import URLPattern, reverse
+
+from apps.users import urls
+from config import urls as root_urls
+from config.query_budget import assert_query_budget
+
+User = get_user_model()
+
+# Máximo de consultas SQL por requisição. Colunas: rótulo, nome da URL, método, dados, autenticado, orçamento.
+# O admin fica de fora: as views são do próprio Django.
+QUERY_BUDGETS = [
+    ('register', 'users:register', 'get', {}, False, 0),
+    ('register post', 'users:register', 'post', {
+        'name': 'Novo Usuário', 'email': 'novo@example.com',
+        'password': 'newpassword123', 'password_confirm': 'newpassword123',
+    }, False, 12),
+    ('login', 'users:login', 'get', {}, False, 0),
+    ('login post', 'users:login', 'post', {'username': 'budget@example.com', 'password': 'password123'}, False, 9),
+    ('logout', 'users:logout', 'get', {}, True, 2),
+    ('home', 'home', 'get', {}, True, 0),
+]
+
+
+class UserQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', name='Budget User', password='password123')
+
+    def test_every_user_url_has_a_budget(self):
+        names = {f'{urls.app_name}:{pattern.name}' for pattern in urls.urlpatterns}
+        names |= {p.name for p in root_urls.urlpatterns if isinstance(p, URLPattern) and p.name}
+        self.assertEqual(names - {entry[1] for entry in QUERY_BUDGETS}, set())
+
+    def test_views_stay_within_query_budget(self):
+        for label, url_name, method, data, authenticated, budget in QUERY_BUDGETS:
+            with self.subTest(label):
+                client = Client()
+                if authenticated:
+                    client.force_login(self.user)
+                with assert_query_budget(budget, label):
+                    response = getattr(client, method)(reverse(url_name), data)
+                self.assertLess(response.status_code, 400, label)
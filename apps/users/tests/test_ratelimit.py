@@ -0,0 +1,82 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from apps.users.ratelimit import TokenBucket
+
+User = get_user_model()
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+LIMITS = {'ip': {'capacity': 3, 'per_minute': 1}, 'email': {'capacity': 2, 'per_minute': 1}}
+
+
+@override_settings(AUTH_RATE_LIMITS=LIMITS)
+class AuthRateLimitTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(email='victim@example.com', name='Victim', password='password123')
+        self.client = Client()
+        self.login_url = reverse('users:login')
+
+    def login(self, email='victim@example.com', client=None, **kwargs):
+        return (client or self.client).post(self.login_url, {'username': email, 'password': 'errada'}, **kwargs)
+
+    def test_excess_attempts_get_429_before_hashing_or_db(self):
+        for _ in range(2):
+            self.assertEqual(self.login().status_code, 200)  # formulário com erro de credenciais
+
+        with mock.patch.object(PBKDF2PasswordHasher, 'encode') as encode, self.assertNumQueries(0):
+            response = self.login()
+        encode.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        # Um token por minuto; as tentativas anteriores já repuseram uma fração dele.
+        self.assertIn(int(response['Retry-After']), range(1, 61))
+        self.assertContains(response, 'Muitas tentativas', status_code=429)
+
+        response = self.login(headers=AJAX)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['retry_after'], int(response['Retry-After']))
+
+        # Páginas (GET) não gastam tokens.
+        self.assertEqual(self.client.get(self.login_url).status_code, 200)
+
+    def test_ip_bucket_limits_attempts_across_emails(self):
+        statuses = [self.login(f'user{i}@example.com').status_code for i in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        # Outro IP continua podendo tentar.
+        self.assertEqual(self.login('user9@example.com', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_registration_is_limited(self):
+        data = {'name': 'Novo', 'email': 'novo@example.com', 'password': 'senha12345', 'password_confirm': 'diferente1'}
+        statuses = [self.client.post(reverse('users:register'), data).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        # O balde de login é independente.
+        self.assertEqual(self.login('outro@example.com').status_code, 200)
+
+    def test_rejections_are_counted(self):
+        for _ in range(3):
+            self.login()
+        out = StringIO()
+        call_command('auth_rate_limit_stats', reset=True, stdout=out)
+        stats = json.loads(out.getvalue())
+        self.assertEqual(stats['login'], {'ip': 0, 'email': 1})
+        self.assertEqual(stats['total'], 1)
+
+        out = StringIO()
+        call_command('auth_rate_limit_stats', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['total'], 0)
+
+
+class TokenBucketTest(TestCase):
+    def test_refills_continuously_up_to_capacity(self):
+        bucket = TokenBucket(capacity=2, per_minute=6)  # um token a cada 10 s
+        self.assertEqual([bucket.consume('k', now=0) for _ in range(3)], [0, 0, 10])
+        self.assertEqual(bucket.consume('k', now=4), 6)
+        self.assertEqual(bucket.consume('k', now=10), 0)
+        # Muito tempo depois o balde está cheio, mas não acumula além da capacidade.
+        self.assertEqual([bucket.consume('k', now=1000) for _ in range(3)], [0, 0, 10])
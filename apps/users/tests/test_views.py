@@ -112,3 +112,10 @@ class UserViewsTests(TestCase):
         self.assertRedirects(response, self.home_url)
         self.assertFalse(response.context['user'].is_authenticated)
         self.assertIsNone(self.client.session.get('_auth_user_id'))
+        # A cópia local das tarefas (IndexedDB) é apagada pelo navegador.
+        self.assertEqual(self.client.cookies['tasks_local_cache'].value, '')
+
+    def test_logout_clears_site_storage(self):
+        self.client.login(email=self.test_user_email, password=self.test_user_password)
+        response = self.client.post(self.logout_url)
+        self.assertEqual(response['Clear-Site-Data'], '"storage"')
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib.auth.views import LoginView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from .forms import UserRegistrationForm, UserAuthenticationForm
+from .ratelimit import rate_limit
 
+# O limite vem antes do dispatch: nem a checagem de usuário já autenticado roda para tentativas rejeitadas.
+@method_decorator(rate_limit('login'), name='dispatch')
 class UserLoginView(LoginView):
     template_name = 'users/login.html'
     redirect_authenticated_user = True
@@ -12,6 +17,7 @@ class UserLoginView(LoginView):
     def get_success_url(self):
         return reverse_lazy('home')
 
+@rate_limit('register')
 def register(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
@@ -25,4 +31,8 @@ def register(request):
 
 def user_logout(request):
     logout(request)
-    return redirect('home')
+    response = redirect('home')
+    # A cópia local das tarefas (IndexedDB do tasks.js) não deve sobreviver à sessão no navegador.
+    response.delete_cookie(settings.TASK_LOCAL_CACHE_COOKIE)
+    response['Clear-Site-Data'] = '"storage"'
+    return response
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Sob ASGI as views de tarefas usam as versões assíncronas (apps/tasks/async_views.py).
+os.environ.setdefault('TASK_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
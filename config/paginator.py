@@ -0,0 +1,31 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Abaixo disto o COUNT(*) exato é barato e a estimativa seria imprecisa demais.
+ESTIMATE_THRESHOLD = 100_000
+
+
+def estimated_count(queryset):
+    """
+    Número de linhas de `queryset`. Para a tabela inteira no PostgreSQL, usa a estimativa
+    `pg_class.reltuples` mantida pelo ANALYZE/autovacuum em vez de um COUNT(*) que lê a tabela toda.
+    Com filtros (ou em outros bancos) faz a contagem exata.
+    """
+    connection = connections[queryset.db]
+    query = queryset.query
+    if connection.vendor == 'postgresql' and not query.where and not query.distinct and not query.combinator:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples é -1 em tabelas que nunca passaram por ANALYZE.
+        if row and row[0] >= ESTIMATE_THRESHOLD:
+            return row[0]
+    return queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    # Paginador para changelists do admin em tabelas grandes (ver `estimated_count`).
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
@@ -0,0 +1,41 @@
+"""
+Orçamento de consultas SQL por view para a suíte de testes. `assert_query_budget` falha com o SQL
+capturado quando uma requisição passa do limite e registra contagem e tempo total de SQL em
+`RESULTS`, que o conftest.py resume ao final do pytest (e grava com `--query-budget-report`).
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+RESULTS = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(budget, label, using='default'):
+    connection = connections[using]
+    elapsed = []
+
+    def timer(execute, sql, params, many, context):
+        # `captured_queries` só guarda o tempo em milissegundos inteiros; aqui a medida é precisa.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed.append(time.perf_counter() - started)
+
+    with CaptureQueriesContext(connection) as context, connection.execute_wrapper(timer):
+        yield context
+    queries = context.captured_queries
+    sql_ms = sum(elapsed) * 1000
+    RESULTS.append({'label': label, 'queries': len(queries), 'budget': budget, 'sql_ms': round(sql_ms, 3)})
+    if len(queries) > budget:
+        sql = '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(queries, start=1))
+        raise QueryBudgetExceeded(
+            f'{label}: {len(queries)} consultas SQL, orçamento de {budget} ({sql_ms:.2f} ms de SQL).\n{sql}'
+        )
@@ -90,7 +90,12 @@ if USE_POSTGRES:
             'HOST': os.getenv('DB_HOST', 'localhost'),
             'PORT': os.getenv('DB_PORT', '5432'),
             'OPTIONS': {
-                'pool': True,
+                # Sob ASGI cada consulta assíncrona ocupa uma conexão do pool enquanto executa: o máximo
+                # limita quantas requisições de um processo consultam o banco ao mesmo tempo.
+                'pool': {
+                    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '4')),
+                    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+                },
             },
         }
     }
@@ -99,6 +104,34 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Transações de escrita pegam o lock na abertura e esperam por ele (timeout, em segundos), em vez
+            # de falharem com "database is locked" quando requisições concorrentes (ASGI, vários workers) escrevem.
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
+    }
+
+
+# Cache
+# A invalidação do cache da lista de tarefas é feita por versão guardada no próprio cache. Com mais
+# de um processo (ex: workers do Gunicorn) o cache precisa ser compartilhado: defina REDIS_URL.
+# Sem REDIS_URL usa-se o cache local em memória, adequado apenas para um único processo.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
 
@@ -147,5 +180,69 @@ STATIC_ROOT = BASE_DIR / 'staticfiles' # Para Docker rodar arquivos estaticos
 
 AUTH_USER_MODEL = 'users.User'
 
+# Sessões lidas do cache (gravadas também no banco) e usuário autenticado guardado no cache pelo
+# CachedModelBackend: requisições autenticadas não consultam django_session nem users_user.
+# Com mais de um processo, defina REDIS_URL para que logout e troca de senha valham em todos.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['apps.users.auth.CachedModelBackend']
+# Limite (em segundos) para alterações que não passam por save(), como QuerySet.update().
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '300'))
+
+# Limite de tentativas de login e registro (apps/users/ratelimit.py): balde por IP e por e-mail, com
+# capacidade para uma rajada e reposição contínua. Excedido o limite, 429 antes de qualquer hash de senha.
+AUTH_RATE_LIMITS = {
+    'ip': {
+        'capacity': int(os.getenv('AUTH_RATE_LIMIT_IP_CAPACITY', '20')),
+        'per_minute': float(os.getenv('AUTH_RATE_LIMIT_IP_PER_MINUTE', '10')),
+    },
+    'email': {
+        'capacity': int(os.getenv('AUTH_RATE_LIMIT_EMAIL_CAPACITY', '5')),
+        'per_minute': float(os.getenv('AUTH_RATE_LIMIT_EMAIL_PER_MINUTE', '1')),
+    },
+}
+# Alias em CACHES onde ficam os baldes; com mais de um processo precisa ser compartilhado (REDIS_URL).
+AUTH_RATE_LIMIT_CACHE = os.getenv('AUTH_RATE_LIMIT_CACHE', 'default')
+# Chave de request.META com o IP do cliente atrás de um proxy reverso (ex: HTTP_X_REAL_IP); sem valor, REMOTE_ADDR.
+AUTH_RATE_LIMIT_IP_HEADER = os.getenv('AUTH_RATE_LIMIT_IP_HEADER', 'REMOTE_ADDR')
+
 LOGIN_URL = '/users/login/' # URL para redirecionar
 LOGIN_REDIRECT_URL = '/' # URL para redirecionar caso login bem sucedido.
+
+# Quantidade de tarefas por página na listagem (paginação por cursor).
+TASK_LIST_PAGE_SIZE = int(os.getenv('TASK_LIST_PAGE_SIZE', '50'))
+
+# Caracteres da descrição trazidos pela listagem (cortados no banco); o texto completo é carregado ao expandir.
+TASK_LIST_DESCRIPTION_LENGTH = int(os.getenv('TASK_LIST_DESCRIPTION_LENGTH', '280'))
+
+# Limite de itens (criações + atualizações + exclusões) por requisição em /api/v1/tasks/bulk/.
+TASK_API_BULK_MAX_ITEMS = int(os.getenv('TASK_API_BULK_MAX_ITEMS', '1000'))
+
+# Limite de ids por requisição nas ações em lote da lista (/tasks/bulk/: concluir, reabrir, limpar concluídas).
+TASK_BULK_ACTION_MAX_IDS = int(os.getenv('TASK_BULK_ACTION_MAX_IDS', '500'))
+
+# Tamanho dos lotes de bulk_create/bulk_update.
+TASK_BULK_BATCH_SIZE = int(os.getenv('TASK_BULK_BATCH_SIZE', '500'))
+
+# Sincronização incremental (/api/v1/tasks/sync/): itens por página de cada fluxo, janela (em segundos)
+# relida a cada sincronização para capturar transações com commit tardio e retenção dos tombstones.
+TASK_SYNC_PAGE_SIZE = int(os.getenv('TASK_SYNC_PAGE_SIZE', '500'))
+TASK_SYNC_SAFETY_WINDOW_SECONDS = int(os.getenv('TASK_SYNC_SAFETY_WINDOW_SECONDS', '5'))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv('TASK_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Cookie gravado pelo tasks.js quando o navegador tem uma cópia sincronizada das tarefas (IndexedDB), com o
+# id do usuário: a página de tarefas vem sem a lista, montada a partir da cópia local. O logout o remove.
+TASK_LOCAL_CACHE_COOKIE = 'tasks_local_cache'
+
+# Views assíncronas (ORM assíncrono) para listagem, criação, edição e exclusão de tarefas. Só compensam
+# num servidor ASGI; config/asgi.py as liga por padrão. Sob WSGI cada requisição precisaria de um loop próprio.
+TASK_ASYNC_VIEWS = os.getenv('TASK_ASYNC_VIEWS', 'False') == 'True'
+
+# Broker dos eventos de tarefas entregues pelo stream SSE (/tasks/events/, só sob ASGI). O LocalBroker
+# alcança apenas as conexões do mesmo processo; com Postgres, LISTEN/NOTIFY alcança todos os workers.
+TASK_EVENTS_BACKEND = os.getenv(
+    'TASK_EVENTS_BACKEND',
+    'apps.tasks.events.PostgresBroker' if USE_POSTGRES else 'apps.tasks.events.LocalBroker',
+)
+
+# Linhas lidas do banco por vez nas exportações (CSV/iCalendar e export_tasks).
+TASK_EXPORT_CHUNK_SIZE = int(os.getenv('TASK_EXPORT_CHUNK_SIZE', '2000'))
@@ -24,6 +24,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('users/', include('apps.users.urls')),
     path('tasks/', include('apps.tasks.urls')),
+    path('api/v1/tasks/', include('apps.tasks.api_urls')),
     path('', config_views.home, name='home'),
 ]
 handler404 = 'config.views.page_not_found_view'
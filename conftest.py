@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+from config.query_budget import RESULTS, assert_query_budget
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # O cache local em memória sobrevive entre testes: versões e fragmentos de um teste
+    # não podem vazar para outro que reutilize os mesmos ids de usuário.
+    cache.clear()
+    yield
+
+
+@pytest.fixture
+def query_budget(request):
+    # Para testes no estilo pytest: `with query_budget(4): client.get(...)`.
+    def check(budget, label=None):
+        return assert_query_budget(budget, label or request.node.nodeid)
+    return check
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-budget-report', metavar='PATH',
+        help='Grava em JSON as consultas, o orçamento e o tempo de SQL de cada view medida.',
+    )
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not RESULTS:
+        return
+    if config.option.verbose >= 0:
+        terminalreporter.section('orçamento de consultas SQL')
+        for result in RESULTS:
+            terminalreporter.write_line(
+                f"{result['label']:<50} {result['queries']:>3}/{result['budget']:<3} {result['sql_ms']:>9.2f} ms"
+            )
+    path = config.getoption('--query-budget-report')
+    if path:
+        with open(path, 'w') as f:
+            json.dump(RESULTS, f, indent=2)
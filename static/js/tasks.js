@@ -2,9 +2,38 @@ document.addEventListener('DOMContentLoaded', () => {
     const taskListContainer = document.getElementById('task-list-container');
     const createTaskForm = document.getElementById('create-task-form');
     const filterButtons = document.querySelectorAll('.filter-btn');
+    const searchForm = document.getElementById('task-search-form');
+    const searchInput = document.getElementById('task-search-input');
 
     // Obtém a URL base para a lista de tarefas do atributo 'data-task-list-url' do contêiner.
     const taskListUrl = taskListContainer.dataset.taskListUrl;
+    // Base da API de tarefas (`<base><id>/`), usada para buscar o texto completo de descrições truncadas.
+    const taskApiUrl = taskListContainer.dataset.taskApiUrl;
+    // URL de edição da tarefa 0 (`{% url 'tasks:task_update' 0 %}`), com o id trocado em taskUpdateUrl().
+    const taskUpdateUrlTemplate = taskListContainer.dataset.taskUpdateUrlTemplate;
+    const taskListSentinel = document.getElementById('task-list-sentinel');
+
+    let currentFilter = 'all';
+    let currentSearch = searchInput ? searchInput.value.trim() : '';
+    // Incrementado a cada troca de filtro para descartar páginas que chegarem de um filtro anterior.
+    let listGeneration = 0;
+    let isLoadingNextPage = false;
+
+    // Monta a URL da lista com o filtro e a busca atuais e, opcionalmente, o cursor da próxima página.
+    function buildTaskListUrl(filter, cursor) {
+        const params = new URLSearchParams();
+        if (filter !== 'all') {
+            params.set('completed', filter);
+        }
+        if (currentSearch) {
+            params.set('q', currentSearch);
+        }
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        const query = params.toString();
+        return query ? `${taskListUrl}?${query}` : taskListUrl;
+    }
 
     // Função auxiliar para extrair o token CSRF de um cookie.
     function getCookie(name) {
@@ -25,6 +54,20 @@ document.addEventListener('DOMContentLoaded', () => {
 
     const csrftoken = getCookie('csrftoken');
 
+    // Contadores confirmados pelo servidor: os da página e, depois, os das respostas e dos eventos SSE. Os
+    // exibidos somam o efeito das alterações da fila ainda não confirmadas (renderCounters).
+    const confirmedCounters = {};
+    document.querySelectorAll('[data-counter]').forEach(element => {
+        confirmedCounters[element.dataset.counter] = Number(element.textContent);
+    });
+
+    // Atualiza os contadores do cabeçalho e dos filtros com os valores devolvidos pelo servidor.
+    function updateCounters(counters) {
+        if (!counters) return;
+        Object.assign(confirmedCounters, counters);
+        renderCounters();
+    }
+
     function clearFormErrors(formElement) {
         formElement.querySelectorAll('.alert.alert-error').forEach(errorDiv => {
             errorDiv.remove();
@@ -90,31 +133,366 @@ document.addEventListener('DOMContentLoaded', () => {
             filterButtons.forEach(btn => btn.classList.remove('filter-btn-active'));
             button.classList.add('filter-btn-active');
 
-            const filter = button.dataset.filter;
-            let url = taskListUrl;
-            
-            if (filter !== 'all') {
-                url += `?completed=${filter}`;
+            currentFilter = button.dataset.filter;
+            reloadTaskList();
+        });
+    });
+
+    // Recarrega a primeira página da lista com o filtro e a busca atuais: da cópia local, quando ela estiver
+    // sincronizada e não houver busca, ou do servidor.
+    function reloadTaskList() {
+        if (useLocalList()) {
+            renderLocalList();
+            return;
+        }
+        listGeneration++;
+        const generation = listGeneration;
+        const url = buildTaskListUrl(currentFilter);
+
+        // Faz uma requisição AJAX para obter a lista de tarefas filtrada.
+        fetch(url, {
+            headers: {
+                // Sinaliza para o servidor que esta é uma requisição AJAX.
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+        .then(response => response.text()) // Espera texto HTML como resposta.
+        .then(html => {
+            if (generation !== listGeneration) {
+                return; // Uma busca ou filtro mais recente já foi disparado.
             }
+            taskListContainer.innerHTML = html; // Atualiza o conteúdo do contêiner da lista de tarefas.
+            reapplyLocalMutations(); // O servidor ainda não recebeu as alterações da fila.
+            addEventListenersToTasks(); // Re-adiciona os event listeners para as novas tarefas carregadas.
+            observeSentinel();
+        })
+        .catch(error => {
+            // Erros de rede ou do servidor são capturados aqui. Exibe mensagem genérica.
+            displayGlobalError('Ocorreu um erro ao carregar as tarefas. Tente novamente.');
+        });
+    }
 
-            // Faz uma requisição AJAX para obter a lista de tarefas filtrada.
-            fetch(url, {
-                headers: {
-                    // Sinaliza para o servidor que esta é uma requisição AJAX.
-                    'X-Requested-With': 'XMLHttpRequest'
+    // --- Busca textual ---
+    // Espera o usuário parar de digitar antes de consultar o servidor.
+    if (searchForm && searchInput) {
+        let searchTimer = null;
+        const applySearch = () => {
+            const value = searchInput.value.trim();
+            if (value === currentSearch) {
+                return;
+            }
+            currentSearch = value;
+            clearGlobalErrors();
+            reloadTaskList();
+        };
+        searchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(applySearch, 300);
+        });
+        searchForm.addEventListener('submit', (e) => {
+            e.preventDefault();
+            clearTimeout(searchTimer);
+            applySearch();
+        });
+    }
+
+    // --- Paginação por cursor (rolagem infinita) ---
+    // O servidor envia o cursor da próxima página em `data-next-cursor` no <ul>; ao chegar
+    // perto do fim da lista, buscamos a próxima página e anexamos apenas os itens novos.
+    function loadNextPage() {
+        const ul = taskListContainer.querySelector('ul.task-list');
+        const cursor = ul && ul.dataset.nextCursor;
+        if (!cursor || isLoadingNextPage) {
+            return;
+        }
+        if (cursor === LOCAL_CURSOR) {
+            appendLocalPage(ul);
+            reapplyLocalMutations();
+            addEventListenersToTasks();
+            observeSentinel();
+            return;
+        }
+        isLoadingNextPage = true;
+        const generation = listGeneration;
+
+        fetch(buildTaskListUrl(currentFilter, cursor), {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(html => {
+            if (generation !== listGeneration) {
+                return; // O filtro mudou enquanto a página carregava.
+            }
+            const template = document.createElement('template');
+            template.innerHTML = html;
+            const page = template.content.querySelector('ul.task-list');
+            page.querySelectorAll('li.task-item').forEach(li => {
+                // Ignora tarefas já presentes (ex: criadas nesta sessão e inseridas antes de a página carregar).
+                if (!document.getElementById(li.id)) {
+                    ul.appendChild(li);
                 }
-            })
-            .then(response => response.text()) // Espera texto HTML como resposta.
-            .then(html => {
-                taskListContainer.innerHTML = html; // Atualiza o conteúdo do contêiner da lista de tarefas.
-                addEventListenersToTasks(); // Re-adiciona os event listeners para as novas tarefas carregadas.
-            })
-            .catch(error => {
-                // Erros de rede ou do servidor são capturados aqui. Exibe mensagem genérica.
-                displayGlobalError('Ocorreu um erro ao carregar as tarefas. Tente novamente.');
             });
+            if (page.dataset.nextCursor) {
+                ul.dataset.nextCursor = page.dataset.nextCursor;
+            } else {
+                delete ul.dataset.nextCursor;
+            }
+            reapplyLocalMutations();
+            addEventListenersToTasks();
+        })
+        .catch(error => {
+            displayGlobalError('Ocorreu um erro ao carregar mais tarefas. Tente novamente.');
+        })
+        .finally(() => {
+            isLoadingNextPage = false;
+            observeSentinel(); // Se a sentinela continuar visível, carrega a página seguinte.
         });
-    });
+    }
+
+    const sentinelObserver = ('IntersectionObserver' in window && taskListSentinel)
+        ? new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextPage();
+            }
+        }, { rootMargin: '200px' })
+        : null;
+
+    // Reobservar força uma nova verificação de visibilidade da sentinela.
+    function observeSentinel() {
+        if (sentinelObserver) {
+            sentinelObserver.unobserve(taskListSentinel);
+            sentinelObserver.observe(taskListSentinel);
+        }
+    }
+
+    observeSentinel();
+
+    // --- Linhas renderizadas pelo servidor ---
+    // Criações, edições e eventos SSE trazem o <li> da tarefa já renderizado (`row`, o mesmo template da
+    // listagem em apps/tasks/rendering.py) e a sua chave de ordenação (`position`, também em data-position).
+    // O tasks.js só troca ou insere esse item, sem montar marcação nem recarregar a lista.
+    function parseTaskRow(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        return template.content.firstElementChild;
+    }
+
+    // Insere a tarefa no lugar da ordenação da lista (pendentes primeiro, por prazo e criação). Uma tarefa
+    // depois da última carregada fica para a próxima página da rolagem infinita, que a trará no lugar certo.
+    function insertTaskRow(html) {
+        insertTaskElement(parseTaskRow(html));
+    }
+
+    function insertTaskElement(row) {
+        const ul = taskListContainer.querySelector('ul.task-list');
+        if (!ul || document.getElementById(row.id)) {
+            return;
+        }
+        const next = Array.from(ul.querySelectorAll('li.task-item'))
+            .find(taskItem => taskItem.dataset.position > row.dataset.position);
+        if (!next && ul.dataset.nextCursor) {
+            return;
+        }
+        const emptyItem = ul.querySelector('li.task-empty');
+        if (emptyItem) {
+            emptyItem.remove(); // Remove a mensagem "Nenhuma tarefa encontrada.".
+        }
+        ul.insertBefore(row, next || null);
+        addEventListenersToTasks(); // Adiciona os event listeners para a nova tarefa.
+    }
+
+    // Troca o item de uma tarefa exibida pela versão nova, no mesmo lugar. Um formulário de edição aberto
+    // é mantido e preenchido com os dados novos.
+    function replaceTaskRow(html, task) {
+        const current = document.getElementById(`task-item-${task.id}`);
+        if (!current) {
+            return;
+        }
+        const row = parseTaskRow(html);
+        const editForm = current.querySelector('.task-edit-form');
+        if (editForm) {
+            fillEditForm(editForm.querySelector('form'), task);
+            row.appendChild(editForm);
+            row.querySelector('.edit-task-button').style.display = 'none';
+        }
+        current.replaceWith(row);
+        addEventListenersToTasks();
+    }
+
+    // --- Descrições truncadas ---
+    // A listagem traz só o início das descrições longas (classe `task-description-truncated`); o texto
+    // completo vem da API ao expandir e antes de editar a tarefa, que reenvia a descrição.
+    function setFullDescription(taskItem, description) {
+        const descriptionElement = taskItem.querySelector('.task-description');
+        descriptionElement.textContent = description || 'Sem descrição.';
+        descriptionElement.classList.toggle('task-description-empty', !description);
+        descriptionElement.classList.remove('task-description-truncated');
+        const expandButton = taskItem.querySelector('.task-description-expand');
+        if (expandButton) {
+            expandButton.remove();
+        }
+    }
+
+    function loadFullDescription(taskItem) {
+        if (!taskItem.querySelector('.task-description-truncated')) {
+            return Promise.resolve();
+        }
+        const taskId = taskItem.id.replace('task-item-', '');
+        return fetch(`${taskApiUrl}${taskId}/`, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(data => setFullDescription(taskItem, data.task.description));
+    }
+
+    function expandDescription(taskId) {
+        const taskItem = document.getElementById(`task-item-${taskId}`);
+        loadFullDescription(taskItem)
+        .then(() => taskItem.querySelector('.task-description').classList.add('task-description-expanded'))
+        .catch(error => {
+            displayGlobalError('Ocorreu um erro ao carregar a descrição da tarefa. Tente novamente.');
+        });
+    }
+
+    // --- Formulário de edição sob demanda ---
+    // A lista traz só a visualização de cada tarefa; o formulário é clonado do <template> único da página
+    // ao clicar em "Editar" e descartado ao salvar ou cancelar.
+    const editFormTemplate = document.getElementById('task-edit-form-template');
+
+    // Lê os dados de uma tarefa a partir da visualização (o prazo em ISO fica em data-due-date).
+    function readTaskItem(taskItem) {
+        const descriptionElement = taskItem.querySelector('.task-description');
+        return {
+            title: taskItem.querySelector('.task-title').textContent,
+            description: descriptionElement.classList.contains('task-description-empty') ? '' : descriptionElement.textContent,
+            due_date: taskItem.dataset.dueDate || '',
+            completed: taskItem.querySelector('.task-completed-toggle').checked,
+        };
+    }
+
+    function fillEditForm(form, task) {
+        form.elements.title.value = task.title;
+        form.elements.description.value = task.description || '';
+        form.elements.due_date.value = task.due_date || '';
+        form.elements.completed.checked = task.completed;
+    }
+
+    function openEditForm(taskId) {
+        const taskItem = document.getElementById(`task-item-${taskId}`);
+        if (!taskItem || taskItem.querySelector('.task-edit-form')) {
+            return;
+        }
+        loadFullDescription(taskItem)
+        .then(() => showEditForm(taskItem, taskId))
+        .catch(error => {
+            displayGlobalError('Ocorreu um erro ao carregar a tarefa para edição. Tente novamente.');
+        });
+    }
+
+    function taskUpdateUrl(taskId) {
+        return taskUpdateUrlTemplate.replace('/0/', `/${taskId}/`);
+    }
+
+    function showEditForm(taskItem, taskId) {
+        if (taskItem.querySelector('.task-edit-form')) {
+            return; // Dois cliques enquanto a descrição carregava.
+        }
+        const container = editFormTemplate.content.firstElementChild.cloneNode(true);
+        container.id = `edit-form-${taskId}`;
+        const form = container.querySelector('form');
+        form.action = taskUpdateUrl(taskId);
+        form.dataset.taskId = taskId;
+        // Ids únicos por tarefa, para os rótulos continuarem associados aos campos.
+        form.querySelectorAll('label[data-for]').forEach(label => {
+            const field = form.elements[label.dataset.for];
+            field.id = `id_${label.dataset.for}_${taskId}`;
+            label.htmlFor = field.id;
+        });
+        fillEditForm(form, readTaskItem(taskItem));
+        form.querySelector('.cancel-edit-button').onclick = () => closeEditForm(taskId);
+        form.onsubmit = (e) => submitEditForm(e, form, taskId);
+
+        taskItem.appendChild(container);
+        taskItem.querySelector('.edit-task-button').style.display = 'none'; // Esconde o botão "Editar".
+        form.elements.title.focus();
+    }
+
+    // Descarta o formulário de edição e mostra o botão "Editar".
+    function closeEditForm(taskId) {
+        const taskItem = document.getElementById(`task-item-${taskId}`);
+        if (!taskItem) {
+            return;
+        }
+        const container = taskItem.querySelector('.task-edit-form');
+        if (container) {
+            container.remove();
+        }
+        taskItem.querySelector('.edit-task-button').style.display = 'inline';
+    }
+
+    // Envia o formulário de atualização de tarefa via AJAX.
+    function submitEditForm(e, form, taskId) {
+        e.preventDefault();
+        const formData = new FormData(form);
+
+        // A edição reenvia `completed`: as alterações da fila, anteriores a ela, chegam ao servidor antes.
+        settleMutations()
+        .then(() => fetch(form.action, {
+            method: 'POST',
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': csrftoken
+            },
+            body: formData
+        }))
+        .then(response => {
+            if (!response.ok) {
+                return response.json().then(err => Promise.reject(err));
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (data.success) {
+                updateCounters(data.counters);
+                replaceTaskRow(data.row, data.task);
+                closeEditForm(taskId);
+                scheduleSync();
+            } else {
+                // Em um ambiente de produção, erros de validação seriam exibidos ao usuário na UI, não no console.
+                displayFormErrors(form, data.errors);
+            }
+        })
+        .catch(error => {
+            displayFormErrors(form, { '__all__': ['Ocorreu um erro ao atualizar a tarefa.'] });
+        });
+    }
+
+    // Remove a tarefa da lista; sem tarefas restantes, exibe a mensagem de lista vazia.
+    function removeTaskItem(taskId) {
+        const taskItem = document.getElementById(`task-item-${taskId}`);
+        if (!taskItem) {
+            return;
+        }
+        taskItem.remove();
+        const ul = taskListContainer.querySelector('ul.task-list');
+        if (ul && !ul.querySelector('li')) {
+            ul.innerHTML = '<li class="task-empty"><p class="empty-message">Nenhuma tarefa encontrada.</p></li>';
+        }
+    }
 
     // --- Funcionalidade de Criação de Tarefas ---
     if (createTaskForm) {
@@ -145,84 +523,10 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (data.success) {
                     clearFormErrors(createTaskForm);
                     createTaskForm.reset();
+                    updateCounters(data.counters);
 
-                    // Constrói o HTML dinamicamente.
-                    const sanitizedId = DOMPurify.sanitize(data.task.id);
-                    const sanitizedTitle = DOMPurify.sanitize(data.task.title);
-                    const sanitizedDescription = DOMPurify.sanitize(data.task.description || '');
-                    const sanitizedDueDate = data.task.due_date ? DOMPurify.sanitize(data.task.due_date) : '';
-
-                    const newTaskHtml = `
-                        <li class="task-item" id="task-item-${sanitizedId}">
-                            <div class="task-view" id="task-view-${sanitizedId}">
-                                <div class="task-main">
-                                    <div class="task-checkbox-wrapper">
-                                        <input
-                                            type="checkbox"
-                                            ${data.task.completed ? 'checked' : ''}
-                                            data-task-id="${sanitizedId}"
-                                            class="task-checkbox task-completed-toggle"
-                                            id="checkbox-${sanitizedId}"
-                                        >
-                                        <label for="checkbox-${sanitizedId}" class="checkbox-custom"></label>
-                                    </div>
-
-                                    <div class="task-content">
-                                        <span class="task-title ${data.task.completed ? 'task-completed' : ''}">${sanitizedTitle}</span>
-                                        ${sanitizedDueDate ? `<span class="task-due-date">Prazo: ${sanitizedDueDate}</span>` : ''}
-                                        <p class="task-description">${sanitizedDescription || 'Sem descrição.'}</p>
-                                    </div>
-                                </div>
-
-                                <div class="task-actions">
-                                    <button data-task-id="${sanitizedId}" class="btn btn-edit edit-task-button">Editar</button>
-                                    <form action="/tasks/${sanitizedId}/delete/" method="post" class="delete-task-form" style="display:inline;">
-                                        <input type="hidden" name="csrfmiddlewaretoken" value="${csrftoken}">
-                                        <button type="submit" data-task-id="${sanitizedId}" class="btn btn-delete">Excluir</button>
-                                    </form>
-                                </div>
-                            </div>
-
-                            <div id="edit-form-${sanitizedId}" class="task-edit-form" style="display:none;">
-                                <form class="edit-task-form-actual" data-task-id="${sanitizedId}" action="/tasks/${sanitizedId}/update/" method="post">
-                                    <input type="hidden" name="csrfmiddlewaretoken" value="${csrftoken}">
-                                    <div class="form-group">
-                                        <label for="id_title_${sanitizedId}" class="form-label">Título</label>
-                                        <input type="text" id="id_title_${sanitizedId}" name="title" value="${sanitizedTitle}" required class="form-input">
-                                    </div>
-                                    <div class="form-group">
-                                        <label for="id_description_${sanitizedId}" class="form-label">Descrição</label>
-                                        <textarea id="id_description_${sanitizedId}" name="description" class="form-textarea">${sanitizedDescription}</textarea>
-                                    </div>
-                                    <div class="form-row form-row-split">
-                                        <div class="form-group">
-                                            <label for="id_due_date_${sanitizedId}" class="form-label">Data de Vencimento</label>
-                                            <input type="date" id="id_due_date_${sanitizedId}" name="due_date" value="${sanitizedDueDate}" class="form-input">
-                                        </div>
-                                        <div class="form-group form-group-checkbox">
-                                            <div class="checkbox-wrapper">
-                                                <input type="checkbox" id="id_completed_${sanitizedId}" name="completed" ${data.task.completed ? 'checked' : ''} class="task-checkbox">
-                                                <label for="id_completed_${sanitizedId}" class="checkbox-label">Concluída</label>
-                                            </div>
-                                        </div>
-                                    </div>
-                                    <div class="edit-actions">
-                                        <button type="submit" class="btn btn-primary">Salvar</button>
-                                        <button type="button" class="btn btn-secondary cancel-edit-button" data-task-id="${sanitizedId}">Cancelar</button>
-                                    </div>
-                                </form>
-                            </div>
-                        </li>
-                    `;
-                    const ul = taskListContainer.querySelector('ul');
-                    // Verifica se a lista está vazia com a mensagem "Nenhuma tarefa encontrada." para substituir.
-                    if (ul.querySelector('li') && ul.querySelector('li').textContent.includes('Nenhuma tarefa encontrada.')) {
-                        ul.innerHTML = newTaskHtml;
-                    } else {
-                        // Adiciona a nova tarefa ao final da lista.
-                        ul.insertAdjacentHTML('beforeend', newTaskHtml);
-                    }
-                    addEventListenersToTasks(); // Re-adiciona os event listeners para a nova tarefa.
+                    insertTaskRow(data.row);
+                    scheduleSync();
                 }
             })
             .catch(error => {
@@ -237,186 +541,782 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
+    // --- Fila de alterações ---
+    // Marcar/desmarcar e excluir tarefas atualizam a lista e os contadores na hora e entram numa fila, enviada
+    // à API em lote (`data-task-batch-url`) MUTATION_FLUSH_DELAY ms depois da primeira alteração ou ao sair
+    // da página. Alterações da mesma tarefa são combinadas: marcar e desmarcar antes do envio não gera
+    // requisição, e a exclusão substitui as anteriores. Só um lote fica em voo por vez, então as escritas
+    // chegam ao servidor na ordem em que foram feitas; se o servidor recusar o lote, as tarefas voltam ao estado
+    // anterior, e sem conexão ele volta para a fila.
+    const taskBatchUrl = taskListContainer.dataset.taskBatchUrl;
+    const MUTATION_FLUSH_DELAY = 500;
+    // Itens por lote (`data-task-batch-max-items`): dentro do limite do endpoint (TASK_API_BULK_MAX_ITEMS) e
+    // de BATCH_EVENT_MAX_ITEMS (apps/tasks/api.py), para chegar às outras abas como um evento `batch`.
+    const MUTATION_BATCH_MAX_ITEMS = Number(taskListContainer.dataset.taskBatchMaxItems);
+
+    // Id da tarefa -> {base, completed, deleted, dueDate, element}. `base` é o estado da tarefa antes da
+    // alteração (o confirmado ou o do lote em voo), usado para desfazê-la e no ajuste dos contadores.
+    const pendingMutations = new Map();
+    const inFlightMutations = new Map();
+    let inFlightRequest = null;
+    let flushTimer = null;
+    // Sem conexão, a fila espera o evento `online` (ou MUTATION_RETRY_DELAY ms) para ser reenviada.
+    const MUTATION_RETRY_DELAY = 30000;
+    let offline = false;
+    let retryTimer = null;
+
+    // A alteração mais recente de uma tarefa ainda não confirmada pelo servidor, se houver.
+    function localMutation(taskId) {
+        return pendingMutations.get(String(taskId)) || inFlightMutations.get(String(taskId));
+    }
+
+    function setTaskCompleted(taskId, completed) {
+        const taskItem = document.getElementById(`task-item-${taskId}`);
+        if (!taskItem) {
+            return;
+        }
+        taskItem.querySelector('.task-completed-toggle').checked = completed;
+        taskItem.querySelector('.task-title').classList.toggle('task-completed', completed);
+        // O primeiro dígito da chave de ordenação é `completed` (pagination.position_key).
+        taskItem.dataset.position = (completed ? '1' : '0') + taskItem.dataset.position.slice(1);
+        const editForm = taskItem.querySelector('.edit-task-form-actual');
+        if (editForm) {
+            editForm.elements.completed.checked = completed;
+        }
+    }
+
+    // "Hoje" para o contador de atrasadas: timezone.localdate() do servidor (`data-today`), não a data do navegador.
+    const serverToday = taskListContainer.dataset.today;
+
+    // Peso de uma tarefa em cada contador.
+    function counterWeights(state) {
+        const exists = state.deleted ? 0 : 1;
+        return {
+            total: exists,
+            pending: exists && !state.completed ? 1 : 0,
+            completed: exists && state.completed ? 1 : 0,
+            overdue: exists && !state.completed && state.dueDate && state.dueDate < serverToday ? 1 : 0,
+        };
+    }
+
+    // Exibe os contadores confirmados somados ao efeito das alterações ainda não confirmadas.
+    function renderCounters() {
+        const counters = { ...confirmedCounters };
+        [inFlightMutations, pendingMutations].forEach(mutations => mutations.forEach(entry => {
+            const before = counterWeights(entry.base);
+            const after = counterWeights(entry);
+            for (const name in before) {
+                if (counters[name] !== undefined) {
+                    counters[name] += after[name] - before[name];
+                }
+            }
+        }));
+        document.querySelectorAll('[data-counter]').forEach(element => {
+            const value = counters[element.dataset.counter];
+            if (value !== undefined) element.textContent = value;
+        });
+    }
+
+    // Enfileira `change` ({completed} ou {deleted, element}) para a tarefa cujo estado exibido antes dele é
+    // `current` ({completed, dueDate}).
+    function queueMutation(taskId, change, current) {
+        const queued = pendingMutations.get(taskId);
+        const base = queued ? queued.base : current;
+        const entry = { completed: base.completed, deleted: false, dueDate: current.dueDate, ...queued, ...change, base };
+        if (!entry.deleted && entry.completed === base.completed) {
+            pendingMutations.delete(taskId); // De volta ao estado de antes: nada a enviar.
+        } else {
+            pendingMutations.set(taskId, entry);
+        }
+        renderCounters();
+        persistMutations();
+        if (!flushTimer) {
+            flushTimer = setTimeout(flushMutations, MUTATION_FLUSH_DELAY);
+        }
+    }
+
+    // Envia a fila. Com um lote em voo, o próximo sai quando ele terminar; ao sair da página (`exiting`) sai
+    // já o que não depende dele (outras tarefas), pois a página pode não existir até lá. Devolve a promessa
+    // do envio em curso.
+    function flushMutations(exiting = false) {
+        clearTimeout(flushTimer);
+        flushTimer = null;
+        const ready = Array.from(pendingMutations).filter(([taskId]) => !inFlightMutations.has(taskId));
+        if (!ready.length || offline || (inFlightRequest && !exiting)) {
+            return inFlightRequest;
+        }
+        const requests = inFlightRequest ? [inFlightRequest] : [];
+        for (let i = 0; i < (exiting ? ready.length : 1); i += MUTATION_BATCH_MAX_ITEMS) {
+            const batch = new Map(ready.slice(i, i + MUTATION_BATCH_MAX_ITEMS));
+            batch.forEach((entry, taskId) => {
+                pendingMutations.delete(taskId);
+                inFlightMutations.set(taskId, entry);
+            });
+            requests.push(sendMutations(batch));
+        }
+        const request = Promise.all(requests);
+        inFlightRequest = request;
+        request.then(() => {
+            if (inFlightRequest === request) {
+                inFlightRequest = null;
+                flushMutations(); // Alterações feitas enquanto o lote estava em voo.
+            }
+        });
+        return request;
+    }
+
+    function sendMutations(batch) {
+        const payload = { update: [], delete: [] };
+        batch.forEach((entry, taskId) => {
+            if (entry.deleted) {
+                payload.delete.push(Number(taskId));
+            } else {
+                payload.update.push({ id: Number(taskId), completed: entry.completed });
+            }
+        });
+        return fetch(taskBatchUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': csrftoken
+            },
+            body: JSON.stringify(payload),
+            keepalive: true // O envio termina mesmo se a página for fechada.
+        })
+        .then(
+            response => response.json().then(data => response.ok ? data : Promise.reject(data)),
+            () => Promise.reject(OFFLINE) // Erro de rede: a requisição não chegou ao servidor.
+        )
+        .then(data => {
+            let rejected = false;
+            batch.forEach((entry, taskId) => inFlightMutations.delete(taskId));
+            data.update.concat(data.delete).forEach(result => {
+                const taskId = String(result.id);
+                if (result.success) {
+                    return;
+                }
+                if (result.code === 'not_found') {
+                    // Excluída em outra aba ou dispositivo: as alterações seguintes também não valem mais.
+                    pendingMutations.delete(taskId);
+                    removeTaskItem(taskId);
+                } else {
+                    rollbackMutation(taskId, batch.get(taskId));
+                    rejected = true;
+                }
+            });
+            updateCounters(data.counters);
+            persistMutations();
+            scheduleSync();
+            if (rejected) {
+                displayGlobalError('Algumas alterações foram recusadas pelo servidor e desfeitas.');
+            }
+        })
+        .catch(error => {
+            batch.forEach((entry, taskId) => inFlightMutations.delete(taskId));
+            if (error === OFFLINE) {
+                // Nada foi perdido: as alterações voltam para a fila e saem quando a conexão voltar.
+                batch.forEach((entry, taskId) => requeueMutation(taskId, entry));
+                goOffline();
+            } else {
+                batch.forEach((entry, taskId) => rollbackMutation(taskId, entry));
+                displayGlobalError('Ocorreu um erro ao salvar as alterações, que foram desfeitas. Tente novamente.');
+            }
+            renderCounters();
+            persistMutations();
+        });
+    }
+
+    const OFFLINE = new Error('offline');
+
+    function goOffline() {
+        offline = true;
+        clearTimeout(retryTimer);
+        retryTimer = setTimeout(goOnline, MUTATION_RETRY_DELAY);
+    }
+
+    function goOnline() {
+        clearTimeout(retryTimer);
+        offline = false;
+        flushMutations();
+        scheduleSync();
+    }
+
+    window.addEventListener('online', goOnline);
+
+    // Uma alteração posterior da mesma tarefa, ainda na fila, passa a partir de `base`, o estado de antes da
+    // alteração que não chegou ao servidor; se voltar a ele, não há mais nada a enviar. Indica se havia uma.
+    function rebaseQueuedMutation(taskId, base) {
+        const queued = pendingMutations.get(taskId);
+        if (!queued) {
+            return false;
+        }
+        queued.base = base;
+        if (!queued.deleted && queued.completed === base.completed) {
+            pendingMutations.delete(taskId);
+        }
+        return true;
+    }
+
+    // Devolve à fila uma alteração que não chegou ao servidor (sem conexão).
+    function requeueMutation(taskId, entry) {
+        const queued = pendingMutations.get(taskId);
+        if (queued && queued.deleted && !queued.element) {
+            queued.element = entry.element;
+        }
+        if (!rebaseQueuedMutation(taskId, entry.base)) {
+            pendingMutations.set(taskId, entry);
+        }
+    }
+
+    // Desfaz uma alteração recusada. Se a tarefa tiver uma alteração posterior na fila, o DOM já mostra o
+    // resultado dela.
+    function rollbackMutation(taskId, entry) {
+        if (rebaseQueuedMutation(taskId, entry.base)) {
+            return;
+        }
+        if (entry.deleted && entry.element) {
+            insertTaskElement(entry.element);
+        } else if (entry.deleted && localTasks.has(taskId)) {
+            // Exclusão feita antes de a página ser recarregada: o item vem da cópia local.
+            const record = localTasks.get(taskId);
+            if (matchesCurrentList({ ...record.task, completed: entry.base.completed })) {
+                insertTaskRow(record.row);
+            }
+        }
+        setTaskCompleted(taskId, entry.base.completed);
+    }
+
+    // Ids das tarefas cuja alteração esta aba gravou na cópia local.
+    const persistedMutations = new Set();
+
+    // Grava a fila na cópia local, para que alterações feitas sem conexão sejam reenviadas mesmo que a página
+    // seja fechada antes. Cada tarefa tem uma entrada, com o estado de antes de todas as alterações pendentes.
+    function persistMutations() {
+        if (!taskDb) {
+            return;
+        }
+        const entries = new Map(inFlightMutations);
+        pendingMutations.forEach((entry, taskId) => {
+            const inFlight = inFlightMutations.get(taskId);
+            entries.set(taskId, inFlight ? { ...entry, base: inFlight.base } : entry);
+        });
+        const removed = Array.from(persistedMutations).filter(taskId => !entries.has(taskId));
+        removed.forEach(taskId => persistedMutations.delete(taskId));
+        entries.forEach((entry, taskId) => persistedMutations.add(taskId));
+        storeTransaction(['mutations'], ({ mutations }) => {
+            removed.forEach(taskId => mutations.delete(taskId));
+            entries.forEach(({ completed, deleted, dueDate, base }, taskId) => {
+                mutations.put({ completed, deleted, dueDate, base }, taskId);
+            });
+        }).catch(() => {});
+    }
+
+    // Reaplica as alterações não confirmadas a itens vindos do servidor (lista recarregada, próxima página).
+    function reapplyLocalMutations() {
+        [inFlightMutations, pendingMutations].forEach(mutations => mutations.forEach((entry, taskId) => {
+            if (entry.deleted) {
+                removeTaskItem(taskId);
+            } else {
+                setTaskCompleted(taskId, entry.completed);
+            }
+        }));
+    }
+
+    // Resolve quando a fila estiver vazia e sem lote em voo, para escritas que não passam por ela (edição,
+    // ações em lote) chegarem ao servidor depois das alterações já feitas na lista.
+    function settleMutations() {
+        if (offline && pendingMutations.size) {
+            return Promise.reject(OFFLINE); // As alterações da fila ainda não chegaram ao servidor.
+        }
+        const request = flushMutations();
+        return request ? request.then(settleMutations) : Promise.resolve();
+    }
+
+    // `pagehide` não dispara em todo fechamento de aba em celulares; ficar oculta é o último aviso confiável.
+    window.addEventListener('pagehide', () => flushMutations(true));
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') {
+            flushMutations(true);
+        }
+    });
+
     // --- Gerenciamento de Event Listeners para Tarefas (existentes e novas)
     function addEventListenersToTasks() {
+        // Marcar/desmarcar e excluir aparecem na hora e vão para a fila de alterações.
         document.querySelectorAll('.task-completed-toggle').forEach(checkbox => {
             checkbox.onchange = (e) => {
                 const taskId = e.target.dataset.taskId;
                 const completed = e.target.checked;
+                const taskItem = document.getElementById(`task-item-${taskId}`);
                 clearGlobalErrors(); // Limpa erros globais antes de tentar atualizar.
-                
-                const currentTaskItem = document.getElementById(`task-item-${taskId}`);
-                const title = currentTaskItem.querySelector('.task-title').textContent;
-                const description = currentTaskItem.querySelector('.task-description').textContent;
-                const dueDateSpan = currentTaskItem.querySelector('.task-due-date');
-                // Prazo: DD-MM-YYYY" (ajustar conforme formato real)
-                const due_date_text = dueDateSpan ? dueDateSpan.textContent.replace('Prazo: ', '') : '';
-                
-                let due_date = '';
-                // Garante que a data esteja no formato correto (YYYY-MM-DD) para envio ao backend.
-                // Adapte o `split` e a ordem dos `parts` se o formato na tela for diferente.
-                if (due_date_text) {
-                    const parts = due_date_text.split('-'); // Supondo o formato DD-MM-YYYY
-                    if (parts.length === 3) {
-                        due_date = `${parts[2]}-${parts[1]}-${parts[0]}`; // Converte para YYYY-MM-DD
-                    }
-                }
-
-                const formData = new FormData();
-                formData.append('title', title);
-                formData.append('description', description === 'Sem descrição.' ? '' : description);
-                formData.append('due_date', due_date);
-                formData.append('completed', completed);
-                formData.append('csrfmiddlewaretoken', csrftoken);
-
-                // Envia a requisição AJAX para atualizar o status da tarefa.
-                fetch(`/tasks/${taskId}/update/`, {
-                    method: 'POST',
-                    headers: {
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'X-CSRFToken': csrftoken
-                    },
-                    body: formData
-                })
-                .then(response => {
-                    if (!response.ok) {
-                        return response.json().then(err => Promise.reject(err));
-                    }
-                    return response.json();
-                })
-                .then(data => {
-                    if (data.success) {
-                        
-                        document.querySelector(`#task-item-${taskId} .task-title`).classList.toggle('task-completed', data.task.completed);
-                    } else {
-                        // Se o erro vier do servidor com validações, exibe-as como erro global.
-                        displayGlobalError(data.errors && data.errors.__all__ ? data.errors.__all__[0] : 'Ocorreu um erro ao atualizar o status da tarefa. Tente novamente.');
-                        e.target.checked = !completed; // Reverte o estado do checkbox em caso de erro.
-                    }
-                })
-                .catch(error => {
-                    // Erros de rede ou do servidor são capturados aqui. Exibe mensagem genérica.
-                    displayGlobalError('Ocorreu um erro ao atualizar o status da tarefa. Tente novamente.');
-                    e.target.checked = !completed; // Reverte o estado do checkbox em caso de erro de rede.
-                });
+                setTaskCompleted(taskId, completed);
+                queueMutation(taskId, { completed }, { completed: !completed, dueDate: taskItem.dataset.dueDate });
             };
         });
 
-        // Lida com a exclusão de tarefas via envio de formulário AJAX.
+        // O formulário de exclusão só é enviado sem JavaScript.
         document.querySelectorAll('.delete-task-form').forEach(form => {
             form.onsubmit = (e) => {
                 e.preventDefault();
                 const taskId = e.target.querySelector('button').dataset.taskId;
+                const taskItem = document.getElementById(`task-item-${taskId}`);
                 clearGlobalErrors(); // Limpa erros globais antes de tentar excluir.
-
-                fetch(form.action, {
-                    method: 'POST',
-                    headers: {
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'X-CSRFToken': csrftoken
-                    },
-                    body: new FormData(form)
-                })
-                .then(response => {
-                    if (!response.ok) { // Check response.ok for network errors before parsing JSON
-                        return response.json().then(err => Promise.reject(err));
-                    }
-                    return response.json();
-                })
-                .then(data => {
-                    if (data.success) {
-                        document.getElementById(`task-item-${taskId}`).remove(); // Remove o item da tarefa do DOM.
-                        const ul = taskListContainer.querySelector('ul');
-                        // Se não houver mais tarefas, exibe a mensagem de "Nenhuma tarefa encontrada.".
-                        if (!ul.querySelector('li')) {
-                            ul.innerHTML = '<li class="task-empty"><p class="empty-message">Nenhuma tarefa encontrada.</p></li>';
-                        }
-                    } else {
-                        // Se o erro vier do servidor com validações, exibe-as como erro global.
-                        displayGlobalError(data.errors && data.errors.__all__ ? data.errors.__all__[0] : 'Ocorreu um erro ao excluir a tarefa. Tente novamente.');
-                    }
-                })
-                .catch(error => {
-                    displayGlobalError('Ocorreu um erro ao excluir a tarefa. Tente novamente.');
+                queueMutation(taskId, { deleted: true, element: taskItem }, {
+                    completed: taskItem.querySelector('.task-completed-toggle').checked,
+                    dueDate: taskItem.dataset.dueDate,
                 });
+                removeTaskItem(taskId);
             };
         });
 
-        // Alterna a visibilidade do formulário de edição da tarefa.
+        // Monta o formulário de edição da tarefa a partir do template.
         document.querySelectorAll('.edit-task-button').forEach(button => {
-            button.onclick = (e) => {
-                const taskId = e.target.dataset.taskId;
-                document.getElementById(`edit-form-${taskId}`).style.display = 'block'; // Mostra o formulário de edição.
-                e.target.style.display = 'none'; // Esconde o botão "Editar".
-            };
+            button.onclick = (e) => openEditForm(e.target.dataset.taskId);
         });
 
-        // Cancela a edição, escondendo o formulário e mostrando o botão "Editar".
-        document.querySelectorAll('.cancel-edit-button').forEach(button => {
-            button.onclick = (e) => {
-                const taskId = e.target.dataset.taskId;
-                document.getElementById(`edit-form-${taskId}`).style.display = 'none'; // Esconde o formulário de edição.
-                document.querySelector(`#task-item-${taskId} .edit-task-button`).style.display = 'inline'; // Mostra o botão "Editar".
-            };
+        // Expande uma descrição truncada pela listagem.
+        document.querySelectorAll('.task-description-expand').forEach(button => {
+            button.onclick = (e) => expandDescription(e.target.dataset.taskId);
         });
+    }
 
-        // Lida com o envio do formulário de atualização de tarefa via AJAX.
-        document.querySelectorAll('.edit-task-form-actual').forEach(form => {
-            form.onsubmit = (e) => {
-                e.preventDefault();
-                const taskId = e.target.dataset.taskId;
-                const formData = new FormData(form);
-
-                fetch(form.action, {
-                    method: 'POST',
-                    headers: {
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'X-CSRFToken': csrftoken
-                    },
-                    body: formData
-                })
-                .then(response => {
-                    if (!response.ok) {
-                        return response.json().then(err => Promise.reject(err));
-                    }
-                    return response.json();
-                })
-                .then(data => {
-                    if (data.success) {
-                        const taskItem = document.getElementById(`task-item-${taskId}`);
-                        const task = data.task;
-                        // Atualiza dinamicamente os detalhes da tarefa no DOM com os novos dados.
-                        taskItem.querySelector('.task-title').textContent = task.title;
-                        taskItem.querySelector('.task-title').classList.toggle('task-completed', task.completed);
-                        taskItem.querySelector('.task-completed-toggle').checked = task.completed;
-                        taskItem.querySelector('.task-description').textContent = task.description || 'Sem descrição.';
-                        const dueDateSpan = taskItem.querySelector('.task-due-date');
-                        if (task.due_date) {
-                            if (dueDateSpan) {
-                                // Se o span de data de vencimento já existe, atualiza seu conteúdo.
-                                dueDateSpan.textContent = `Prazo: ${DOMPurify.sanitize(task.due_date)}`;
-                            } else {
-                                // Se não existe, cria um novo span e o insere após o título.
-                                const titleSpan = taskItem.querySelector('.task-title');
-                                titleSpan.insertAdjacentHTML('afterend', `<span class="task-due-date">Prazo: ${DOMPurify.sanitize(task.due_date)}</span>`);
-                            }
-                        } else {
-                            if (dueDateSpan) dueDateSpan.remove(); // Remove o span se a data de vencimento for removida.
-                        }
-
-                        document.getElementById(`edit-form-${taskId}`).style.display = 'none';
-                        document.querySelector(`#task-item-${taskId} .edit-task-button`).style.display = 'inline';
-                    } else {
-                        // Em um ambiente de produção, erros de validação seriam exibidos ao usuário na UI, não no console.
-                        displayFormErrors(form, data.errors);
-                    }
-                })
-                .catch(error => {
-                    displayFormErrors(form, { '__all__': ['Ocorreu um erro ao atualizar a tarefa.'] });
-                });
-            };
+    addEventListenersToTasks(); // Inicializa os event listeners para as tarefas carregadas inicialmente.
+
+    // --- Ações em lote ---
+    // "Concluir todas", "Reabrir todas" e "Excluir concluídas" valem para o filtro e a busca atuais (inclusive
+    // tarefas de páginas ainda não carregadas) e custam uma única requisição. A resposta traz só o número de
+    // tarefas afetadas e o escopo; as tarefas exibidas são atualizadas localmente, sem recarregar a lista.
+    const bulkForm = document.getElementById('task-bulk-form');
+
+    // Aplica a ação às tarefas exibidas cobertas pelo escopo ({ids} ou {completed, q}). É idempotente, pois
+    // a aba que enviou a ação também recebe o evento SSE correspondente.
+    function applyBulkAction(action, scope) {
+        if (!scope.ids && scope.q && scope.q !== currentSearch) {
+            reloadTaskList(); // Outra busca: só o servidor sabe quais das tarefas exibidas foram afetadas.
+            return;
+        }
+        const completed = action === 'complete';
+        taskListContainer.querySelectorAll('li.task-item').forEach(taskItem => {
+            const taskId = taskItem.id.replace('task-item-', '');
+            const checkbox = taskItem.querySelector('.task-completed-toggle');
+            const covered = scope.ids
+                ? scope.ids.includes(Number(taskId))
+                : scope.completed === 'all' || String(checkbox.checked) === scope.completed;
+            if (!covered || localMutation(taskId)) {
+                return; // A alteração da fila é posterior e prevalece no servidor.
+            }
+            if (action === 'clear_completed') {
+                if (checkbox.checked) {
+                    removeTaskItem(taskId);
+                }
+            } else if (currentFilter !== 'all' && String(completed) !== currentFilter) {
+                removeTaskItem(taskId); // Ex: "Concluir todas" com o filtro "Pendentes" ativo.
+            } else {
+                setTaskCompleted(taskId, completed);
+            }
         });
     }
 
-    addEventListenersToTasks(); // Inicializa os event listeners para as tarefas carregadas inicialmente.
+    if (bulkForm) {
+        bulkForm.addEventListener('submit', (e) => {
+            e.preventDefault();
+            clearGlobalErrors();
+            const action = e.submitter ? e.submitter.value : '';
+            if (action === 'clear_completed' && !window.confirm('Excluir todas as tarefas concluídas do filtro atual?')) {
+                return;
+            }
+            // O FormData não inclui o botão clicado; o filtro e a busca são os exibidos agora.
+            const formData = new FormData(bulkForm);
+            formData.set('action', action);
+            formData.set('completed', currentFilter);
+            formData.set('q', currentSearch);
+
+            // A ação vale sobre o estado já salvo: a fila é esvaziada antes.
+            settleMutations()
+            .then(() => fetch(bulkForm.action, {
+                method: 'POST',
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'X-CSRFToken': csrftoken
+                },
+                body: formData
+            }))
+            .then(response => response.json().then(data => response.ok ? data : Promise.reject(data)))
+            .then(data => {
+                updateCounters(data.counters);
+                applyBulkAction(data.action, data.scope);
+                scheduleSync();
+            })
+            .catch(error => {
+                displayGlobalError(error && error.errors ? error.errors.__all__ : 'Ocorreu um erro ao aplicar a ação às tarefas. Tente novamente.');
+            });
+        });
+    }
+
+    // --- Cópia local das tarefas (IndexedDB) ---
+    // As tarefas do usuário ficam numa base IndexedDB (`data-task-store`), cada uma com o item da lista já
+    // renderizado e a sua chave de ordenação. Com a cópia sincronizada, a página vem sem a lista (o cookie de
+    // `data-local-cache-cookie`, ver local_list_requested em apps/tasks/views.py): ela é montada daqui, e os
+    // filtros Todas/Pendentes/Concluídas são aplicados localmente, sem requisição. A busca textual continua
+    // no servidor. A cópia é atualizada pela sincronização incremental da API (`data-task-sync-url`), que só
+    // traz o que mudou desde o último cursor, e guarda também a fila de alterações feitas sem conexão.
+    const taskSyncUrl = taskListContainer.dataset.taskSyncUrl;
+    const taskStoreName = taskListContainer.dataset.taskStore;
+    const localCacheCookie = taskListContainer.dataset.localCacheCookie;
+    // `data-next-cursor` do <ul> quando as próximas tarefas vêm da cópia local.
+    const LOCAL_CURSOR = 'local';
+    // Itens por página da lista local: o TASK_LIST_PAGE_SIZE do servidor (`data-page-size`).
+    const LOCAL_PAGE_SIZE = Number(taskListContainer.dataset.pageSize);
+    // Atraso da sincronização após uma escrita ou evento SSE, para agrupar os que chegam em sequência.
+    const SYNC_DELAY = 1000;
+
+    let taskDb = null;
+    // Id da tarefa -> {task, row, position}, no estado confirmado pelo servidor.
+    const localTasks = new Map();
+    // Cursor da última sincronização completa; null enquanto a cópia local não tiver todas as tarefas.
+    let syncCursor = null;
+    let syncRequest = null;
+    let syncAgain = false;
+    let syncTimer = null;
+    // A cópia foi refeita do zero (cursor expirado): a lista exibida precisa ser montada de novo.
+    let localListStale = false;
+
+    function useLocalList() {
+        return syncCursor !== null && !currentSearch;
+    }
+
+    function idbRequest(request) {
+        return new Promise((resolve, reject) => {
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    function openTaskStore() {
+        const request = indexedDB.open(taskStoreName, 1);
+        request.onupgradeneeded = () => {
+            const db = request.result;
+            db.createObjectStore('tasks', { keyPath: 'task.id' });
+            db.createObjectStore('meta');
+            db.createObjectStore('mutations');
+        };
+        return idbRequest(request);
+    }
+
+    // Executa `work` com os object stores `names` numa transação e resolve quando ela for gravada.
+    function storeTransaction(names, work) {
+        return new Promise((resolve, reject) => {
+            const transaction = taskDb.transaction(names, 'readwrite');
+            const stores = {};
+            names.forEach(name => {
+                stores[name] = transaction.objectStore(name);
+            });
+            work(stores);
+            transaction.oncomplete = () => resolve();
+            transaction.onerror = transaction.onabort = () => reject(transaction.error);
+        });
+    }
+
+    function loadTaskStore() {
+        const transaction = taskDb.transaction(['tasks', 'meta', 'mutations']);
+        const mutations = transaction.objectStore('mutations');
+        return Promise.all([
+            idbRequest(transaction.objectStore('tasks').getAll()),
+            idbRequest(transaction.objectStore('meta').get('cursor')),
+            idbRequest(mutations.getAllKeys()),
+            idbRequest(mutations.getAll()),
+        ]).then(([records, cursor, mutationIds, mutationEntries]) => {
+            records.forEach(record => localTasks.set(String(record.task.id), record));
+            syncCursor = cursor || null;
+            // Alterações de uma visita anterior que não chegaram ao servidor voltam para a fila.
+            mutationIds.forEach((taskId, i) => {
+                if (!localMutation(taskId)) {
+                    pendingMutations.set(taskId, mutationEntries[i]);
+                }
+                persistedMutations.add(taskId);
+            });
+        });
+    }
+
+    function clearTaskStore() {
+        localTasks.clear();
+        syncCursor = null;
+        localListStale = true;
+        return storeTransaction(['tasks', 'meta'], ({ tasks, meta }) => {
+            tasks.clear();
+            meta.clear();
+        });
+    }
+
+    // Tarefas da cópia local no filtro atual, com as alterações da fila, na ordem da lista.
+    function localRecords() {
+        const records = [];
+        localTasks.forEach((record, taskId) => {
+            const local = localMutation(taskId);
+            if (local && local.deleted) {
+                return;
+            }
+            const completed = local ? local.completed : record.task.completed;
+            if (currentFilter !== 'all' && String(completed) !== currentFilter) {
+                return;
+            }
+            records.push({ row: record.row, position: (completed ? '1' : '0') + record.position.slice(1) });
+        });
+        return records.sort((a, b) => (a.position < b.position ? -1 : a.position > b.position ? 1 : 0));
+    }
+
+    // Anexa ao <ul> a próxima página da cópia local: as tarefas depois da última exibida. A rolagem infinita
+    // continua funcionando, sem montar milhares de itens de uma vez.
+    function appendLocalPage(ul) {
+        const items = ul.querySelectorAll('li.task-item');
+        const after = items.length ? items[items.length - 1].dataset.position : '';
+        const records = localRecords().filter(record => record.position > after);
+        records.slice(0, LOCAL_PAGE_SIZE).forEach(record => {
+            const row = parseTaskRow(record.row);
+            if (!document.getElementById(row.id)) {
+                ul.appendChild(row);
+            }
+        });
+        if (records.length > LOCAL_PAGE_SIZE) {
+            ul.dataset.nextCursor = LOCAL_CURSOR;
+        } else {
+            delete ul.dataset.nextCursor;
+        }
+    }
+
+    function renderLocalList() {
+        listGeneration++; // Descarta páginas do servidor ainda em andamento.
+        localListStale = false;
+        const ul = document.createElement('ul');
+        ul.className = 'task-list';
+        taskListContainer.replaceChildren(ul);
+        appendLocalPage(ul);
+        if (!ul.querySelector('li')) {
+            ul.innerHTML = '<li class="task-empty"><p class="empty-message">Nenhuma tarefa encontrada.</p></li>';
+        }
+        reapplyLocalMutations();
+        addEventListenersToTasks();
+        observeSentinel();
+    }
+
+    function scheduleSync() {
+        if (taskDb && !syncTimer) {
+            syncTimer = setTimeout(() => {
+                syncTimer = null;
+                syncTasks();
+            }, SYNC_DELAY);
+        }
+    }
+
+    // Busca as alterações desde o último cursor e as aplica à cópia local e à lista exibida. Sem cursor,
+    // uma sincronização completa. Uma chamada durante outra repete a sincronização quando ela terminar.
+    function syncTasks() {
+        if (!taskDb) {
+            return Promise.resolve();
+        }
+        if (syncRequest) {
+            syncAgain = true;
+            return syncRequest;
+        }
+        syncRequest = pullChanges(syncCursor)
+        .then(() => {
+            // Nas próximas visitas a página pode vir sem a lista.
+            document.cookie = `${localCacheCookie}; path=/; max-age=31536000; samesite=lax`;
+            if (localListStale && useLocalList()) {
+                renderLocalList();
+            }
+        })
+        .catch(error => {
+            // Sem conexão a cópia local continua valendo; a próxima sincronização continua do mesmo cursor.
+        })
+        .finally(() => {
+            syncRequest = null;
+            if (syncAgain) {
+                syncAgain = false;
+                syncTasks();
+            }
+        });
+        return syncRequest;
+    }
+
+    function pullChanges(cursor) {
+        const params = new URLSearchParams({ rows: '1' });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return fetch(`${taskSyncUrl}?${params}`, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+        .then(response => {
+            if (response.status === 410) {
+                // Cursor anterior à retenção das exclusões: a cópia local é descartada e refeita do zero.
+                return clearTaskStore().then(() => pullChanges(null));
+            }
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json().then(data => saveChanges(data).then(() => {
+                updateCounters(data.counters);
+                return data.has_more ? pullChanges(data.cursor) : null;
+            }));
+        });
+    }
+
+    // Grava uma página da sincronização e a aplica à lista exibida. O cursor só é gravado na última página:
+    // uma sincronização interrompida recomeça do cursor anterior (as respostas são idempotentes).
+    function saveChanges(data) {
+        return storeTransaction(['tasks', 'meta'], ({ tasks, meta }) => {
+            data.changed.forEach(({ row, position, ...task }) => tasks.put({ task, row, position }));
+            data.deleted.forEach(({ id }) => tasks.delete(id));
+            if (!data.has_more) {
+                meta.put(data.cursor, 'cursor');
+            }
+        }).then(() => {
+            // Na sincronização completa a lista exibida veio do servidor junto com ela; não há o que aplicar.
+            const showChanges = syncCursor !== null;
+            data.changed.forEach(({ row, position, ...task }) => {
+                const taskId = String(task.id);
+                const previous = localTasks.get(taskId);
+                localTasks.set(taskId, { task, row, position });
+                // A janela de segurança reentrega tarefas sem alteração.
+                if (showChanges && (!previous || previous.row !== row)) {
+                    applyTaskEvent(task, row);
+                }
+            });
+            data.deleted.forEach(({ id }) => {
+                localTasks.delete(String(id));
+                if (showChanges) {
+                    removeTaskItem(id);
+                }
+            });
+            if (!data.has_more) {
+                syncCursor = data.cursor;
+            }
+        });
+    }
+
+    // Traz as alterações feitas em outro lugar: pela sincronização, com a cópia local, ou recarregando a lista.
+    function refreshTaskList() {
+        if (!taskDb) {
+            reloadTaskList();
+            return;
+        }
+        syncTasks().then(() => {
+            if (currentSearch) {
+                reloadTaskList(); // Só o servidor sabe quais tarefas alteradas entram na busca.
+            }
+        });
+    }
+
+    const localListPage = 'localList' in taskListContainer.dataset;
+    if (taskStoreName && window.indexedDB) {
+        openTaskStore()
+        .then(db => {
+            taskDb = db;
+            return loadTaskStore();
+        })
+        .then(() => {
+            if (localListPage) {
+                reloadTaskList(); // Da cópia local ou, se ela estiver vazia (ex: dados do site apagados), do servidor.
+            } else {
+                reapplyLocalMutations();
+            }
+            renderCounters();
+            flushMutations();
+            syncTasks();
+        })
+        .catch(error => {
+            // IndexedDB indisponível (ex: navegação privada em alguns navegadores): a lista vem do servidor.
+            taskDb = null;
+            syncCursor = null;
+            document.cookie = `${localCacheCookie.split('=')[0]}=; path=/; max-age=0`;
+            if (localListPage) {
+                reloadTaskList();
+            }
+        });
+    } else if (localListPage) {
+        reloadTaskList();
+    }
+
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'visible') {
+            scheduleSync(); // Alterações feitas em outro dispositivo enquanto a aba estava oculta.
+        }
+    });
+
+    // --- Atualizações em tempo real (Server-Sent Events) ---
+    // Alterações feitas em outras abas, dispositivos ou pela API chegam pelo stream SSE e são aplicadas
+    // à lista sem recarregá-la. O atributo só existe quando o servidor roda sob ASGI.
+    const taskEventsUrl = taskListContainer.dataset.eventsUrl;
+
+    // Indica se a tarefa pertence à lista exibida (filtro atual). Com uma busca ativa a relevância só é
+    // conhecida pelo servidor, então a lista não recebe tarefas novas.
+    function matchesCurrentList(task) {
+        return !currentSearch && (currentFilter === 'all' || String(task.completed) === currentFilter);
+    }
+
+    // Aplica a versão de uma tarefa recebida por evento. Uma alteração da fila ainda não confirmada é mais
+    // recente e prevalece sobre ela.
+    function applyTaskEvent(task, row) {
+        const local = localMutation(task.id);
+        if (local && local.deleted) {
+            return;
+        }
+        const visible = document.getElementById(`task-item-${task.id}`);
+        if (visible && !local && !currentSearch && !matchesCurrentList(task)) {
+            removeTaskItem(task.id); // Ex: concluída enquanto o filtro "Pendentes" está ativo.
+            return;
+        } else if (visible) {
+            replaceTaskRow(row, task);
+        } else if (matchesCurrentList(local ? { ...task, completed: local.completed } : task)) {
+            insertTaskRow(row);
+        }
+        if (local) {
+            setTaskCompleted(task.id, local.completed);
+        }
+    }
+
+    if (taskEventsUrl && 'EventSource' in window) {
+        const taskEvents = new EventSource(taskEventsUrl);
+        let disconnected = false;
+
+        const onTaskEvent = (type, handler) => {
+            taskEvents.addEventListener(type, (e) => {
+                const data = JSON.parse(e.data);
+                updateCounters(data.counters);
+                handler(data);
+                scheduleSync(); // A cópia local recebe a alteração pela sincronização.
+            });
+        };
+
+        onTaskEvent('created', (data) => {
+            if (matchesCurrentList(data.task)) {
+                insertTaskRow(data.row);
+            }
+        });
+        onTaskEvent('updated', (data) => applyTaskEvent(data.task, data.row));
+        onTaskEvent('deleted', (data) => removeTaskItem(data.id));
+        // Lotes pequenos da API (inclusive a fila de alterações de outra aba): só os itens alterados.
+        onTaskEvent('batch', (data) => {
+            data.changed.forEach(item => applyTaskEvent(item.task, item.row));
+            data.deleted.forEach(taskId => removeTaskItem(taskId));
+        });
+        onTaskEvent('bulk', (data) => applyBulkAction(data.action, data.scope));
+        // Alterações em lote ou eventos perdidos: só a sincronização (ou o servidor) sabe o que mudou.
+        onTaskEvent('resync', () => refreshTaskList());
+
+        // O EventSource reconecta sozinho; eventos emitidos enquanto a conexão estava caída se perderam.
+        taskEvents.addEventListener('error', () => {
+            disconnected = true;
+        });
+        taskEvents.addEventListener('open', () => {
+            if (disconnected) {
+                disconnected = false;
+                refreshTaskList();
+            }
+        });
+    }
 });